@@ -5,12 +5,16 @@ import { Pool } from "pg";
 import { DB_CONFIG } from "./db/db_config.js";
 import { APP_CONFIG } from "./app_config.js";
 import { LoginManager } from "./login_manager.js";
+import { SessionStore } from "./session_store.js";
 import { assert } from "./assert.js";
 
 const pool = new Pool(DB_CONFIG);
 const dbController = new DatabaseController(pool);
 const appController = new AppController(dbController);
 const loginManager = new LoginManager(dbController);
+const sessionStore = new SessionStore(APP_CONFIG.SESSION_TTL);
+
+setInterval(() => sessionStore.sweep(), APP_CONFIG.SESSION_SWEEP_INTERVAL).unref();
 
 const PORT = APP_CONFIG.PORT;
 const app = express();
@@ -19,7 +23,8 @@ app.use(express.json());
 app.use((req, res, next) => {
   res.set("Access-Control-Allow-Origin", "*");
   res.set("Access-Control-Allow-Methods", "GET,POST,DELETE");
-  res.set("Access-Control-Allow-Headers", "Content-Type");
+  res.set("Access-Control-Allow-Headers", "Content-Type, If-None-Match");
+  res.set("Access-Control-Expose-Headers", "ETag");
   next();
 });
 
@@ -37,17 +42,33 @@ const try_catch_next_wrapper = async (body, req, res, next) => {
   }
 };
 
+const with_session = (body) => async (req, res) => {
+  const userid = sessionStore.resolve(req.body.token);
+  if (userid === undefined) {
+    res.status(401).json({ success: false });
+    return;
+  }
+  await body(userid, req, res);
+};
+
 app.post("/login", async (req, res, next) => {
   const body = async (req, res) => {
     const { username, password } = req.body;
     assert(username && password, "Wrong auth token in request on login/");
 
-    let id = await loginManager.login(username, password);
+    let library = await loginManager.bootstrap(username, password);
+    if (library === undefined) {
+      res.json({ success: false });
+      return;
+    }
+
     res.json({
       username: username,
-      password: password,
-      userid: id,
-      success: id === undefined ? false : true,
+      userid: library.userid,
+      token: sessionStore.create(library.userid),
+      book_count: library.book_count,
+      keys: library.keys,
+      success: true,
     });
   };
 
@@ -62,8 +83,10 @@ app.post("/register", async (req, res, next) => {
     let id = await loginManager.register(username, password);
     res.json({
       username: username,
-      password: password,
       userid: id,
+      token: id === undefined ? undefined : sessionStore.create(id),
+      book_count: 0,
+      keys: [],
       success: id === undefined ? false : true,
     });
   };
@@ -78,7 +101,11 @@ app.post("/deleteuser", async (req, res, next) => {
       "Wrong auth token in request on deleteuser/",
     );
 
-    let succ = await loginManager.deleteUser(userid, username, password);
+    const id = Number(userid);
+    let succ = await loginManager.deleteUser(id, username, password);
+    if (succ) {
+      sessionStore.revokeUser(id);
+    }
     res.json({
       success: succ,
     });
@@ -86,11 +113,17 @@ app.post("/deleteuser", async (req, res, next) => {
   await try_catch_next_wrapper(body, req, res, next);
 });
 
-app.post("/lib/addbook", async (req, res, next) => {
+app.post("/logout", async (req, res, next) => {
   const body = async (req, res) => {
+    sessionStore.revoke(req.body.token);
+    res.json({ success: true });
+  };
+  await try_catch_next_wrapper(body, req, res, next);
+});
+
+app.post("/lib/addbook", async (req, res, next) => {
+  const body = with_session(async (userid, req, res) => {
     const {
-      userid,
-      password,
       cover_i,
       first_publish_year,
       key,
@@ -99,9 +132,7 @@ app.post("/lib/addbook", async (req, res, next) => {
       author_name,
     } = req.body;
     assert(
-      userid &&
-        password &&
-        cover_i &&
+      cover_i &&
         first_publish_year &&
         key &&
         language &&
@@ -112,7 +143,6 @@ app.post("/lib/addbook", async (req, res, next) => {
 
     let response = await appController.saveBook(
       userid,
-      password,
       cover_i,
       first_publish_year,
       key,
@@ -121,21 +151,36 @@ app.post("/lib/addbook", async (req, res, next) => {
       author_name,
     );
     res.json({ success: true });
-  };
+  });
   await try_catch_next_wrapper(body, req, res, next);
 });
 
 app.post("/lib/removebook", async (req, res, next) => {
-  const body = async (req, res) => {
-    const { userid, password, key } = req.body;
+  const body = with_session(async (userid, req, res) => {
+    const { key } = req.body;
+    assert(key, "Wrong token in request on lib/removebook/");
+
+    let response = await appController.deleteBook(userid, key);
+    res.json({ success: true });
+  });
+  await try_catch_next_wrapper(body, req, res, next);
+});
+
+app.post("/lib/batch", async (req, res, next) => {
+  const body = with_session(async (userid, req, res) => {
+    const add = req.body.add ?? [];
+    const remove = req.body.remove ?? [];
     assert(
-      userid && key && password,
-      "Wrong token in request on lib/removebook/",
+      Array.isArray(add) &&
+        Array.isArray(remove) &&
+        add.length + remove.length > 0 &&
+        add.length + remove.length <= APP_CONFIG.BATCH_LIMIT,
+      "Wrong token in request on lib/batch/",
     );
 
-    let response = await appController.deleteBook(userid, password, key);
+    await appController.applyBatch(userid, add, remove);
     res.json({ success: true });
-  };
+  });
   await try_catch_next_wrapper(body, req, res, next);
 });
 
@@ -143,20 +188,54 @@ app.post("/lib", async (req, res, next) => {
   const removeSpecialChars = (str) => {
     return str.replace(/[.*+?^${}()|[\]\\]/g, "");
   };
-  const body = async (req, res) => {
-    const { userid, password, query } = req.body;
+  const body = with_session(async (userid, req, res) => {
+    const { query } = req.body;
+    assert(query !== undefined, "Wrong auth token in request on /lib");
+
+    const cleanQuery = removeSpecialChars(query);
+    const tag = await appController.getLibraryTag(userid, cleanQuery);
+    if (tag && req.get("If-None-Match") === tag) {
+      res.set("ETag", tag);
+      res.status(304).end();
+      return;
+    }
+
+    let response = await appController.getSavedBooks(userid, cleanQuery);
+    if (tag) {
+      res.set("ETag", tag);
+    }
+    res.json({ books: response, success: response ? true : false });
+  });
+  await try_catch_next_wrapper(body, req, res, next);
+});
+
+app.post("/lib/contains", async (req, res, next) => {
+  const body = with_session(async (userid, req, res) => {
+    const keys = req.body.keys;
     assert(
-      userid && password && query !== undefined,
-      "Wrong auth token in request on /lib",
+      Array.isArray(keys) &&
+        keys.length <= APP_CONFIG.BATCH_LIMIT &&
+        keys.every((key) => typeof key === "string"),
+      "Wrong keys in request on /lib/contains",
     );
 
-    let response = await appController.getSavedBooks(
-      userid,
-      password,
-      removeSpecialChars(query),
+    let present = await appController.getLibraryMembership(userid, keys);
+    res.json({ keys: present, success: true });
+  });
+  await try_catch_next_wrapper(body, req, res, next);
+});
+
+app.post("/lib/changes", async (req, res, next) => {
+  const body = with_session(async (userid, req, res) => {
+    const since = Number(req.body.since ?? req.query.since ?? 0);
+    assert(
+      Number.isInteger(since) && since >= 0,
+      "Wrong auth token in request on /lib/changes",
     );
-    res.json({ books: response, success: response ? true : false });
-  };
+
+    let changes = await appController.getLibraryChanges(userid, since);
+    res.json({ ...changes, success: changes ? true : false });
+  });
   await try_catch_next_wrapper(body, req, res, next);
 });
 
@@ -1,3 +1,6 @@
 export const APP_CONFIG = {
   PORT: process.env.APP_PORT,
+  BATCH_LIMIT: 1000,
+  SESSION_TTL: 30 * 60 * 1000,
+  SESSION_SWEEP_INTERVAL: 60 * 1000,
 };
@@ -15,27 +15,80 @@ export class DatabaseController {
     );
   }
 
-  async getUserBooks(userid, password, search_query) {
-    let q = "";
-    if (search_query != "") {
-      q = search_query + "|" + search_query.replaceAll(" ", "|");
+  async getUserLibraryKeys(username, password) {
+    return await this.db.query(
+      "SELECT u.id, u.book_count, ARRAY(SELECT ce.key FROM collection_entry ce WHERE ce.collection_id = u.id) AS keys FROM users u WHERE u.username = hash_string($1) AND u.password = hash_string($2)",
+      [username, password],
+    );
+  }
+
+  async getUserBooks(userid, search_query) {
+    const words = search_query.toLowerCase().split(/\s+/).filter(Boolean);
+    if (words.length === 0) {
+      return await this.db.query(
+        "SELECT ce.cover_i, ce.first_publish_year, ce.key, ce.language, ce.title, ce.author_name FROM collection_entry ce WHERE ce.collection_id = $1 ORDER BY lower(ce.title)",
+        [userid],
+      );
     }
+
+    const phrase = words.join(" ");
+    const likePhrase = phrase.replace(/[\\%_]/g, "\\$&");
     return await this.db.query(
-      String.raw`select ce.cover_i, ce.first_publish_year, ce.key, ce.language, ce.title, ce.author_name from collection_entry ce LEFT JOIN users u ON u.id = ce.collection_id WHERE ce.collection_id=$1 AND u.password=hash_string($2) AND ce.title ~* $3 ORDER BY
+      String.raw`SELECT ce.cover_i, ce.first_publish_year, ce.key, ce.language, ce.title, ce.author_name
+      FROM collection_entry ce
+      WHERE ce.collection_id = $1 AND ce.search_text ~ $2
+      ORDER BY
       (CASE
-        WHEN title ILIKE $4 THEN 1
-        WHEN title ILIKE $4 THEN 2
-        WHEN title ILIKE $4 THEN 3
+        WHEN lower(ce.title) = $3 THEN 1
+        WHEN lower(ce.title) LIKE $4 THEN 2
+        WHEN lower(ce.title) LIKE $5 THEN 3
         ELSE 4
       END),
-      title`,
-      [userid, password, q, search_query],
+      word_similarity($3, ce.search_text) DESC,
+      lower(ce.title)`,
+      [userid, words.join("|"), phrase, likePhrase + "%", "%" + likePhrase + "%"],
+    );
+  }
+
+  async getLibraryMembership(userid, keys) {
+    return await this.db.query(
+      "SELECT key FROM collection_entry WHERE collection_id = $1 AND key = ANY($2)",
+      [userid, keys],
+    );
+  }
+
+  async getLibraryVersion(userid) {
+    return await this.db.query(
+      "SELECT lib_version, book_count FROM users WHERE id = $1",
+      [userid],
+    );
+  }
+
+  async getLibraryChanges(userid, since) {
+    return await this.db.query(
+      String.raw`SELECT u.lib_version, cc.key, cc.removed, ce.cover_i, ce.first_publish_year, ce.language, ce.title, ce.author_name
+      FROM users u
+      LEFT JOIN collection_change cc ON cc.collection_id = u.id AND cc.version > $2
+      LEFT JOIN collection_entry ce ON ce.collection_id = cc.collection_id AND ce.key = cc.key
+      WHERE u.id = $1
+      ORDER BY cc.version`,
+      [userid, since],
+    );
+  }
+
+  async getLibrarySnapshot(userid) {
+    return await this.db.query(
+      String.raw`SELECT u.lib_version, ce.key, false AS removed, ce.cover_i, ce.first_publish_year, ce.language, ce.title, ce.author_name
+      FROM users u
+      LEFT JOIN collection_entry ce ON ce.collection_id = u.id
+      WHERE u.id = $1
+      ORDER BY ce.key`,
+      [userid],
     );
   }
 
   async appendBook(
     userid,
-    password,
     cover_i,
     fyp,
     key,
@@ -47,8 +100,8 @@ export class DatabaseController {
     let response;
     try {
       response = client.query(
-        "CALL append_book($1, $2, $3, $4, $5, $6, $7, $8)",
-        [userid, password, cover_i, fyp, key, lang, title, author_name],
+        "CALL append_book($1, $2, $3, $4, $5, $6, $7)",
+        [userid, cover_i, fyp, key, lang, title, author_name],
       );
     } finally {
       client.release();
@@ -56,6 +109,19 @@ export class DatabaseController {
     return response;
   }
 
+  async applyBatch(userid, adds, removes) {
+    const client = await this.db.connect();
+    try {
+      return await client.query("CALL apply_batch($1, $2, $3)", [
+        userid,
+        JSON.stringify(adds),
+        removes,
+      ]);
+    } finally {
+      client.release();
+    }
+  }
+
   async addUser(username, password) {
     return await this.db.query(
       "INSERT INTO users (username, password) values (hash_string($1), hash_string($2)) RETURNING id",
@@ -70,15 +136,11 @@ export class DatabaseController {
     );
   }
 
-  async deleteBook(userid, password, key) {
+  async deleteBook(userid, key) {
     const client = await this.db.connect();
     let response;
     try {
-      response = client.query("CALL remove_book($1, $2, $3)", [
-        userid,
-        password,
-        key,
-      ]);
+      response = client.query("CALL remove_book($1, $2)", [userid, key]);
     } finally {
       client.release();
     }
@@ -1,11 +1,25 @@
-const response = await fetch("http://localhost:3030/" + "lib", {
+const host = "http://localhost:3030/";
+
+const session = await fetch(host + "login", {
   method: "POST",
   headers: {
     "Content-Type": "application/json",
   },
   body: JSON.stringify({
-    userid: 559,
+    username: "g",
     password: "g",
+  }),
+}).then((response) => {
+  return response.json();
+});
+
+const response = await fetch(host + "lib", {
+  method: "POST",
+  headers: {
+    "Content-Type": "application/json",
+  },
+  body: JSON.stringify({
+    token: session.token,
     query: "some random",
   }),
 }).then((response) => {
@@ -11,6 +11,16 @@ export class LoginManager {
     return dbResponse.rows ? dbResponse.rows[0].id : undefined;
   }
 
+  async bootstrap(username, password) {
+    let dbResponse = await this.db.getUserLibraryKeys(username, password);
+    if (!dbResponse.rows || dbResponse.rows.length === 0) {
+      return undefined;
+    }
+
+    const { id, book_count, keys } = dbResponse.rows[0];
+    return { userid: id, book_count: book_count, keys: keys };
+  }
+
   async register(username, password) {
     let dbResponse = await this.db.addUser(username, password);
     return dbResponse.rows ? dbResponse.rows[0].id : undefined;
@@ -18,6 +28,6 @@ export class LoginManager {
 
   async deleteUser(userid, username, password) {
     let response = await this.db.deleteUser(userid, username, password);
-    return true;
+    return response.rowCount > 0;
   }
 }
@@ -1,3 +1,4 @@
+import { createHash } from "node:crypto";
 import { assert } from "./assert.js";
 
 export class AppController {
@@ -8,15 +9,74 @@ export class AppController {
     this.db = dbController;
   }
 
-  async getSavedBooks(userid, password, query) {
-    let dbResponse = await this.db.getUserBooks(userid, password, query);
+  async getSavedBooks(userid, query) {
+    let dbResponse = await this.db.getUserBooks(userid, query);
     return dbResponse.rows;
   }
 
-  async saveBook(userid, password, cover, fyp, key, lang, title, author_name) {
+  async getLibraryMembership(userid, keys) {
+    if (keys.length === 0) {
+      return [];
+    }
+    let dbResponse = await this.db.getLibraryMembership(userid, keys);
+    return dbResponse.rows.map((row) => row.key);
+  }
+
+  async getLibraryTag(userid, query) {
+    let dbResponse = await this.db.getLibraryVersion(userid);
+    if (dbResponse.rows.length === 0) {
+      return undefined;
+    }
+
+    const { lib_version, book_count } = dbResponse.rows[0];
+    const queryHash = createHash("sha1").update(query).digest("hex");
+    return `W/"${userid}-${lib_version}-${book_count}-${queryHash.slice(0, 12)}"`;
+  }
+
+  async getLibraryChanges(userid, since) {
+    let dbResponse =
+      since > 0
+        ? await this.db.getLibraryChanges(userid, since)
+        : await this.db.getLibrarySnapshot(userid);
+    if (dbResponse.rows.length === 0) {
+      return undefined;
+    }
+
+    let version = Number(dbResponse.rows[0].lib_version);
+    let reset = since > version;
+    if (reset) {
+      dbResponse = await this.db.getLibrarySnapshot(userid);
+      if (dbResponse.rows.length === 0) {
+        return undefined;
+      }
+      version = Number(dbResponse.rows[0].lib_version);
+    }
+
+    let added = [];
+    let removed = [];
+    for (const row of dbResponse.rows) {
+      if (!row.key) {
+        continue;
+      }
+      if (row.removed) {
+        removed.push(row.key);
+      } else {
+        added.push({
+          cover_i: row.cover_i,
+          first_publish_year: row.first_publish_year,
+          key: row.key,
+          language: row.language,
+          title: row.title,
+          author_name: row.author_name,
+        });
+      }
+    }
+    return { version: version, reset: reset, added: added, removed: removed };
+  }
+
+  async saveBook(userid, cover, fyp, key, lang, title, author_name) {
     await this.db.appendBook(
       userid,
-      password,
       cover,
       fyp,
       key,
@@ -26,7 +86,30 @@ export class AppController {
     );
   }
 
-  async deleteBook(userid, password, key) {
-    await this.db.deleteBook(userid, password, key);
+  async applyBatch(userid, adds, removes) {
+    const books = adds.map((book) => ({
+      cover_i: book.cover_i,
+      first_publish_year: book.first_publish_year,
+      key: book.key,
+      language: book.language,
+      title: book.title,
+      author_name: book.author_name,
+    }));
+    for (const book of books) {
+      assert(
+        book.cover_i &&
+          book.first_publish_year &&
+          book.key &&
+          book.language &&
+          book.title &&
+          book.author_name,
+        "Wrong book in batch",
+      );
+    }
+    await this.db.applyBatch(userid, books, removes);
+  }
+
+  async deleteBook(userid, key) {
+    await this.db.deleteBook(userid, key);
   }
 }
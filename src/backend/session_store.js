@@ -0,0 +1,57 @@
+import { randomBytes } from "node:crypto";
+
+export class SessionStore {
+  constructor(ttl, now = Date.now) {
+    if (!ttl || ttl <= 0) {
+      throw Error("Wrong session ttl in Session Store construction");
+    }
+    this.ttl = ttl;
+    this.now = now;
+    this.sessions = new Map();
+  }
+
+  create(userid) {
+    const token = randomBytes(32).toString("hex");
+    this.sessions.set(token, { userid: userid, expires: this.now() + this.ttl });
+    return token;
+  }
+
+  resolve(token) {
+    if (typeof token !== "string") {
+      return undefined;
+    }
+    const session = this.sessions.get(token);
+    if (session === undefined) {
+      return undefined;
+    }
+
+    const now = this.now();
+    if (session.expires <= now) {
+      this.sessions.delete(token);
+      return undefined;
+    }
+    session.expires = now + this.ttl;
+    return session.userid;
+  }
+
+  revoke(token) {
+    this.sessions.delete(token);
+  }
+
+  revokeUser(userid) {
+    for (const [token, session] of this.sessions) {
+      if (session.userid === userid) {
+        this.sessions.delete(token);
+      }
+    }
+  }
+
+  sweep() {
+    const now = this.now();
+    for (const [token, session] of this.sessions) {
+      if (session.expires <= now) {
+        this.sessions.delete(token);
+      }
+    }
+  }
+}
@@ -8,9 +8,9 @@ echo "creating database..."
 sudo -u postgres psql -f $sql_dir/create_db.sql
 
 echo "doing setup of database..."
-sudo -u postgres psql -d $db_name -f $sql_dir/install_pgcrypto.sql
+sudo -u postgres psql -d $db_name -f $sql_dir/install_pgcrypto.sql -f $sql_dir/install_pg_trgm.sql
 
-sudo -u postgres psql -d $db_name -f $sql_dir/create_tables.sql -f $sql_dir/functions/verify_user.sql -f $sql_dir/procedures/append_book.sql -f $sql_dir/triggers/forbid_more_books.sql
+sudo -u postgres psql -d $db_name -f $sql_dir/create_tables.sql -f $sql_dir/migrate.sql -f $sql_dir/functions/verify_user.sql -f $sql_dir/procedures/append_book.sql -f $sql_dir/triggers/forbid_more_books.sql -f $sql_dir/functions/book_search_text.sql -f $sql_dir/create_search_index.sql
 
 echo "Done..."
 cd "$root_dir"
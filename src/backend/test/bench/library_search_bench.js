@@ -0,0 +1,124 @@
+import { Pool } from "pg";
+import { DB_CONFIG } from "../../db/db_config.js";
+import { DatabaseController } from "../../db/db_controller.js";
+
+const USERS = Number(process.env.BENCH_USERS ?? 200);
+const BOOKS = Number(process.env.BENCH_BOOKS ?? 1000);
+const RUNS = Number(process.env.BENCH_RUNS ?? 200);
+
+const WORDS = [
+  "lord", "rings", "dark", "tower", "night", "river", "shadow", "garden",
+  "winter", "silent", "empire", "stone", "glass", "ocean", "forest", "crown",
+  "city", "storm", "secret", "history", "king", "war", "peace", "mountain",
+  "dragon", "letters", "memory", "island", "summer", "house", "road", "star",
+];
+const AUTHORS = [
+  "tolkien", "le guin", "pratchett", "tolstoy", "dostoevsky", "austen",
+  "orwell", "huxley", "bradbury", "asimov", "herbert", "gaiman", "atwood",
+  "calvino", "borges", "murakami", "eco", "bulgakov", "chekhov", "nabokov",
+];
+const QUERIES = ["lord", "dark tower", "tolkien", "river of", "sto", "zzqx"];
+
+const OLD_QUERY = String.raw`select ce.cover_i, ce.first_publish_year, ce.key, ce.language, ce.title, ce.author_name from collection_entry ce WHERE ce.collection_id=$1 AND ce.title ~* $2 ORDER BY
+      (CASE
+        WHEN title ILIKE $3 THEN 1
+        WHEN title ILIKE $3 THEN 2
+        WHEN title ILIKE $3 THEN 3
+        ELSE 4
+      END),
+      title`;
+
+const oldSearch = async (pool, userid, query) => {
+  const q = query + "|" + query.replaceAll(" ", "|");
+  return await pool.query(OLD_QUERY, [userid, q, query]);
+};
+
+const createCollections = async (pool) => {
+  const client = await pool.connect();
+  try {
+    await client.query("BEGIN");
+    await client.query("SET LOCAL session_replication_role = replica");
+    const users = await client.query(
+      "INSERT INTO users (username, password, book_count) SELECT hash_string('bench_' || g || '_' || $3), hash_string('bench'), $2 FROM generate_series(1, $1) g RETURNING id",
+      [USERS, BOOKS, Date.now()],
+    );
+    const ids = users.rows.map((row) => row.id);
+    await client.query(
+      String.raw`INSERT INTO collection_entry (collection_id, cover_i, first_publish_year, key, language, title, author_name)
+      SELECT u.id, b, 1900 + b % 120, '/works/OLB' || u.id || 'X' || b || 'W', '{eng}',
+        initcap(($3::text[])[1 + (b * 7 + u.id) % cardinality($3::text[])] || ' of the ' ||
+          ($3::text[])[1 + (b * 13 + u.id * 3) % cardinality($3::text[])] || ' ' ||
+          ($3::text[])[1 + (b * 31) % cardinality($3::text[])]),
+        ARRAY[initcap(($4::text[])[1 + (b * 11 + u.id) % cardinality($4::text[])])]
+      FROM unnest($1::int[]) AS u(id), generate_series(1, $2) b`,
+      [ids, BOOKS, WORDS, AUTHORS],
+    );
+    await client.query("COMMIT");
+    await client.query("ANALYZE collection_entry");
+    return ids;
+  } catch (err) {
+    await client.query("ROLLBACK");
+    throw err;
+  } finally {
+    client.release();
+  }
+};
+
+const measure = async (search, ids, query) => {
+  const times = [];
+  let rows = 0;
+  for (let i = 0; i < RUNS; i++) {
+    const userid = ids[i % ids.length];
+    const start = process.hrtime.bigint();
+    const response = await search(userid, query);
+    times.push(Number(process.hrtime.bigint() - start) / 1e6);
+    rows += response.rows.length;
+  }
+  times.sort((a, b) => a - b);
+  return {
+    p50: times[Math.floor(times.length * 0.5)],
+    p95: times[Math.floor(times.length * 0.95)],
+    rows: rows / RUNS,
+  };
+};
+
+const format = (result) =>
+  `p50 ${result.p50.toFixed(2)} ms, p95 ${result.p95.toFixed(2)} ms, rows ${result.rows.toFixed(1)}`;
+
+const pool = new Pool(DB_CONFIG);
+const dbController = new DatabaseController(pool);
+let ids = [];
+try {
+  console.log(`Creating ${USERS} collections of ${BOOKS} books`);
+  ids = await createCollections(pool);
+
+  for (const query of QUERIES) {
+    const before = await measure(
+      (userid, q) => oldSearch(pool, userid, q),
+      ids,
+      query,
+    );
+    const after = await measure(
+      (userid, q) => dbController.getUserBooks(userid, q),
+      ids,
+      query,
+    );
+    console.log(`"${query}"`);
+    console.log(`  regex on title:    ${format(before)}`);
+    console.log(`  trigram index:     ${format(after)}`);
+  }
+
+  const plan = await pool.query(
+    "EXPLAIN ANALYZE SELECT key FROM collection_entry ce WHERE ce.collection_id = $1 AND ce.search_text ~ $2",
+    [ids[0], "tolkien"],
+  );
+  console.log("");
+  for (const row of plan.rows) {
+    console.log(row["QUERY PLAN"]);
+  }
+} finally {
+  if (ids.length > 0) {
+    await pool.query("DELETE FROM users WHERE id = ANY($1)", [ids]);
+  }
+  await pool.end();
+}
@@ -34,7 +34,22 @@ let response2 = await fetch(host + "login", {
 });
 console.log(response2);
 let user = Object(response2);
-console.assert(response2.success, "login");
+console.assert(response2.success && response2.token, "login");
+console.log("");
+
+console.log("Trying lib without session");
+let unauthorized = await fetch(host + "lib", {
+  method: "POST",
+  headers: {
+    "Content-Type": "application/json",
+  },
+  body: JSON.stringify({
+    token: "bad",
+    query: "",
+  }),
+});
+console.log(unauthorized.status);
+console.assert(unauthorized.status === 401, "lib without session");
 console.log("");
 
 console.log("Trying to addbook");
@@ -44,8 +59,7 @@ response2 = await fetch(host + "lib/addbook", {
     "Content-Type": "application/json",
   },
   body: JSON.stringify({
-    userid: user.userid,
-    password: user.password,
+    token: user.token,
     cover_i: 11,
     first_publish_year: 2004,
     key: "/works/OL8065988M",
@@ -67,8 +81,7 @@ response2 = await fetch(host + "lib/addbook", {
     "Content-Type": "application/json",
   },
   body: JSON.stringify({
-    userid: user.userid,
-    password: user.password,
+    token: user.token,
     cover_i: 11,
     first_publish_year: 2004,
     key: "/works/OL8066000M",
@@ -83,6 +96,48 @@ console.log(response2);
 console.assert(response2.success, "addbook2");
 console.log("");
 
+console.log("Trying to login with library keys");
+response2 = await fetch(host + "login", {
+  method: "POST",
+  headers: {
+    "Content-Type": "application/json",
+  },
+  body: JSON.stringify({
+    username: "s",
+    password: "a",
+  }),
+}).then((response) => {
+  return response.json();
+});
+console.log(response2);
+console.assert(
+  response2.book_count === 2 && response2.keys.length === 2,
+  "login library keys",
+);
+console.log("");
+
+console.log("Trying to check membership");
+response2 = await fetch(host + "lib/contains", {
+  method: "POST",
+  headers: {
+    "Content-Type": "application/json",
+  },
+  body: JSON.stringify({
+    token: user.token,
+    keys: ["/works/OL8065988M", "/works/OL0000000M"],
+  }),
+}).then((response) => {
+  return response.json();
+});
+console.log(response2);
+console.assert(
+  response2.success &&
+    response2.keys.length === 1 &&
+    response2.keys[0] === "/works/OL8065988M",
+  "lib contains",
+);
+console.log("");
+
 console.log("Trying to check lib");
 response2 = await fetch(host + "lib", {
   method: "POST",
@@ -90,8 +145,7 @@ response2 = await fetch(host + "lib", {
     "Content-Type": "application/json",
   },
   body: JSON.stringify({
-    userid: user.userid,
-    password: user.password,
+    token: user.token,
     query: "",
   }),
 }).then((response) => {
@@ -101,6 +155,53 @@ console.log(response2);
 console.assert(response2.success, "lib");
 console.log("");
 
+console.log("Trying to search lib by author");
+response2 = await fetch(host + "lib", {
+  method: "POST",
+  headers: {
+    "Content-Type": "application/json",
+  },
+  body: JSON.stringify({
+    token: user.token,
+    query: "manal",
+  }),
+}).then((response) => {
+  return response.json();
+});
+console.log(response2);
+console.assert(
+  response2.success && response2.books.length === 2,
+  "lib search by author",
+);
+console.log("");
+
+console.log("Trying to check lib with a validator");
+let libResponse = await fetch(host + "lib", {
+  method: "POST",
+  headers: {
+    "Content-Type": "application/json",
+  },
+  body: JSON.stringify({
+    token: user.token,
+    query: "",
+  }),
+});
+const etag = libResponse.headers.get("ETag");
+libResponse = await fetch(host + "lib", {
+  method: "POST",
+  headers: {
+    "Content-Type": "application/json",
+    "If-None-Match": etag,
+  },
+  body: JSON.stringify({
+    token: user.token,
+    query: "",
+  }),
+});
+console.log(libResponse.status);
+console.assert(etag && libResponse.status === 304, "lib not modified");
+console.log("");
+
 console.log("Trying to removebook");
 response2 = await fetch(host + "lib/removebook", {
   method: "POST",
@@ -108,8 +209,7 @@ response2 = await fetch(host + "lib/removebook", {
     "Content-Type": "application/json",
   },
   body: JSON.stringify({
-    userid: user.userid,
-    password: user.password,
+    token: user.token,
     key: "/works/OL8065988M",
   }),
 }).then((response) => {
@@ -126,8 +226,7 @@ response2 = await fetch(host + "lib", {
     "Content-Type": "application/json",
   },
   body: JSON.stringify({
-    userid: user.userid,
-    password: user.password,
+    token: user.token,
     query: "",
   }),
 }).then((response) => {
@@ -137,6 +236,29 @@ console.log(response2);
 console.assert(response2.success, "lib2");
 console.log("");
 
+console.log("Trying to check lib changes");
+response2 = await fetch(host + "lib/changes", {
+  method: "POST",
+  headers: {
+    "Content-Type": "application/json",
+  },
+  body: JSON.stringify({
+    token: user.token,
+    since: 0,
+  }),
+}).then((response) => {
+  return response.json();
+});
+console.log(response2);
+console.assert(response2.success, "libchanges");
+console.assert(
+  response2.added.length === 1 &&
+    response2.added[0].key === "/works/OL8066000M" &&
+    response2.removed.length === 0,
+  "libchanges full library",
+);
+console.log("");
+
 console.log("Trying to removebook2");
 response2 = await fetch(host + "lib/removebook", {
   method: "POST",
@@ -144,8 +266,7 @@ response2 = await fetch(host + "lib/removebook", {
     "Content-Type": "application/json",
   },
   body: JSON.stringify({
-    userid: user.userid,
-    password: user.password,
+    token: user.token,
     key: "/works/OL8066000M",
   }),
 }).then((response) => {
@@ -155,6 +276,167 @@ console.log(response2);
 console.assert(response2.success, "removebook2");
 console.log("");
 
+console.log("Trying to get lib version before batch");
+response2 = await fetch(host + "lib/changes", {
+  method: "POST",
+  headers: {
+    "Content-Type": "application/json",
+  },
+  body: JSON.stringify({
+    token: user.token,
+    since: 0,
+  }),
+}).then((response) => {
+  return response.json();
+});
+console.log(response2);
+console.assert(response2.success, "libchanges before batch");
+const batchSince = response2.version;
+console.log("");
+
+console.log("Trying to add books in batch");
+response2 = await fetch(host + "lib/batch", {
+  method: "POST",
+  headers: {
+    "Content-Type": "application/json",
+  },
+  body: JSON.stringify({
+    token: user.token,
+    add: [
+      {
+        cover_i: 12,
+        first_publish_year: 1965,
+        key: "/works/OL893415W",
+        language: ["eng"],
+        title: "dune",
+        author_name: ["Frank Herbert"],
+      },
+      {
+        cover_i: 13,
+        first_publish_year: 1969,
+        key: "/works/OL59863W",
+        language: ["eng"],
+        title: "the left hand of darkness",
+        author_name: ["Ursula K. Le Guin"],
+      },
+    ],
+    remove: [],
+  }),
+}).then((response) => {
+  return response.json();
+});
+console.log(response2);
+console.assert(response2.success, "lib batch add");
+console.log("");
+
+console.log("Trying to login after batch add");
+response2 = await fetch(host + "login", {
+  method: "POST",
+  headers: {
+    "Content-Type": "application/json",
+  },
+  body: JSON.stringify({
+    username: "s",
+    password: "a",
+  }),
+}).then((response) => {
+  return response.json();
+});
+console.log(response2);
+console.assert(
+  response2.book_count === 2 &&
+    response2.keys.includes("/works/OL893415W") &&
+    response2.keys.includes("/works/OL59863W"),
+  "login after batch add",
+);
+console.log("");
+
+console.log("Trying to remove a book in batch");
+response2 = await fetch(host + "lib/batch", {
+  method: "POST",
+  headers: {
+    "Content-Type": "application/json",
+  },
+  body: JSON.stringify({
+    token: user.token,
+    add: [],
+    remove: ["/works/OL893415W"],
+  }),
+}).then((response) => {
+  return response.json();
+});
+console.log(response2);
+console.assert(response2.success, "lib batch remove");
+console.log("");
+
+console.log("Trying to login after batch remove");
+response2 = await fetch(host + "login", {
+  method: "POST",
+  headers: {
+    "Content-Type": "application/json",
+  },
+  body: JSON.stringify({
+    username: "s",
+    password: "a",
+  }),
+}).then((response) => {
+  return response.json();
+});
+console.log(response2);
+console.assert(
+  response2.book_count === 1 &&
+    response2.keys.length === 1 &&
+    response2.keys[0] === "/works/OL59863W",
+  "login after batch remove",
+);
+console.log("");
+
+console.log("Trying to check lib after batch");
+response2 = await fetch(host + "lib", {
+  method: "POST",
+  headers: {
+    "Content-Type": "application/json",
+  },
+  body: JSON.stringify({
+    token: user.token,
+    query: "",
+  }),
+}).then((response) => {
+  return response.json();
+});
+console.log(response2);
+console.assert(
+  response2.success &&
+    response2.books.length === 1 &&
+    response2.books[0].key === "/works/OL59863W",
+  "lib after batch",
+);
+console.log("");
+
+console.log("Trying to check lib changes after batch");
+response2 = await fetch(host + "lib/changes", {
+  method: "POST",
+  headers: {
+    "Content-Type": "application/json",
+  },
+  body: JSON.stringify({
+    token: user.token,
+    since: batchSince,
+  }),
+}).then((response) => {
+  return response.json();
+});
+console.log(response2);
+console.assert(
+  response2.success &&
+    response2.version > batchSince &&
+    response2.added.length === 1 &&
+    response2.added[0].key === "/works/OL59863W" &&
+    response2.removed.includes("/works/OL893415W"),
+  "libchanges after batch",
+);
+console.log("");
+
 console.log("Trying to deleteuser");
 let response3 = await fetch(host + "deleteuser", {
   method: "POST",
@@ -164,13 +446,13 @@ let response3 = await fetch(host + "deleteuser", {
   body: JSON.stringify({
     userid: user.userid,
     username: user.username,
-    password: user.password,
+    password: "a",
   }),
 }).then((response) => {
   return response.json();
 });
 console.log(response3);
-assert(response2.success, "deleteuser");
+assert(response3.success, "deleteuser");
 console.log("");
 
 console.log("TEST COMPLETED");
@@ -40,15 +40,44 @@ describe("DatabaseController", () => {
     });
   });
 
+  describe("getUserLibraryKeys", () => {
+    test("should query user id, count and keys in one statement", async () => {
+      const mockResult = { rows: [{ id: 1, book_count: 0, keys: [] }] };
+      mockPool.query.mockResolvedValue(mockResult);
+
+      const result = await dbController.getUserLibraryKeys("username", "pass");
+      expect(mockPool.query).toHaveBeenCalledTimes(1);
+      expect(mockPool.query.mock.calls[0][1]).toEqual(["username", "pass"]);
+      expect(result).toBe(mockResult);
+    });
+  });
+
   describe("getUserBooks", () => {
     test("should query user books with correct parameters", async () => {
       const mockResult = { rows: [{ title: "Book 1" }] };
       mockPool.query.mockResolvedValue(mockResult);
 
-      const result = await dbController.getUserBooks(123, "password", "");
+      const result = await dbController.getUserBooks(123, "");
       expect(mockPool.query).toHaveBeenCalled();
+      expect(mockPool.query.mock.calls[0][1]).toEqual([123]);
       expect(result).toBe(mockResult);
     });
+
+    test("should match any word over title and authors", async () => {
+      mockPool.query.mockResolvedValue({ rows: [] });
+
+      await dbController.getUserBooks(123, "  Lord  of_Rings ");
+      const [sql, params] = mockPool.query.mock.calls[0];
+      expect(sql).toContain("ce.search_text ~ $2");
+      expect(sql).toContain("word_similarity");
+      expect(params).toEqual([
+        123,
+        "lord|of_rings",
+        "lord of_rings",
+        "lord of\\_rings%",
+        "%lord of\\_rings%",
+      ]);
+    });
   });
 
   describe("addUser", () => {
@@ -81,7 +110,6 @@ describe("DatabaseController", () => {
 
       const result = await dbController.appendBook(
         123,
-        "pass",
         456,
         2020,
         "key123",
@@ -106,7 +134,6 @@ describe("DatabaseController", () => {
       await expect(
         dbController.appendBook(
           123,
-          "pass",
           456,
           2020,
           "key123",
@@ -125,13 +152,90 @@ describe("DatabaseController", () => {
       mockPool.connect.mockResolvedValue(mockClient);
       mockClient.query.mockResolvedValue(mockResult);
 
-      const result = await dbController.deleteBook(123, "pass", "book_key");
+      const result = await dbController.deleteBook(123, "book_key");
+
+      expect(mockClient.query).toHaveBeenCalledWith(
+        "CALL remove_book($1, $2)",
+        [123, "book_key"],
+      );
+      expect(result).toBe(mockResult);
+    });
+  });
+
+  describe("getLibraryChanges", () => {
+    test("should query changes newer than the given version", async () => {
+      const mockResult = { rows: [{ lib_version: "3" }] };
+      mockPool.query.mockResolvedValue(mockResult);
+
+      const result = await dbController.getLibraryChanges(123, 2);
+      expect(mockPool.query.mock.calls[0][1]).toEqual([123, 2]);
+      expect(result).toBe(mockResult);
+    });
+  });
+
+  describe("getLibrarySnapshot", () => {
+    test("should read entries of the user's collection", async () => {
+      const mockResult = { rows: [{ lib_version: "3", key: "/works/OL1W" }] };
+      mockPool.query.mockResolvedValue(mockResult);
+
+      const result = await dbController.getLibrarySnapshot(123);
+      expect(mockPool.query.mock.calls[0][0]).toContain("collection_entry");
+      expect(mockPool.query.mock.calls[0][1]).toEqual([123]);
+      expect(result).toBe(mockResult);
+    });
+  });
+
+  describe("getLibraryMembership", () => {
+    test("should look up only the given keys of the user", async () => {
+      const mockResult = { rows: [{ key: "/works/OL1W" }] };
+      mockPool.query.mockResolvedValue(mockResult);
+
+      const keys = ["/works/OL1W", "/works/OL2W"];
+      const result = await dbController.getLibraryMembership(123, keys);
+      expect(mockPool.query.mock.calls[0][1]).toEqual([123, keys]);
+      expect(result).toBe(mockResult);
+    });
+  });
+
+  describe("getLibraryVersion", () => {
+    test("should query version counters of the user", async () => {
+      const mockResult = { rows: [{ lib_version: "3", book_count: 1 }] };
+      mockPool.query.mockResolvedValue(mockResult);
+
+      const result = await dbController.getLibraryVersion(123);
+      expect(mockPool.query.mock.calls[0][1]).toEqual([123]);
+      expect(result).toBe(mockResult);
+    });
+  });
+
+  describe("applyBatch", () => {
+    test("should call batch procedure on one client", async () => {
+      const mockResult = { rows: [] };
+      mockPool.connect.mockResolvedValue(mockClient);
+      mockClient.query.mockResolvedValue(mockResult);
+
+      const result = await dbController.applyBatch(
+        123,
+        [{ key: "key123" }],
+        ["old_key"],
+      );
 
       expect(mockClient.query).toHaveBeenCalledWith(
-        "CALL remove_book($1, $2, $3)",
-        [123, "pass", "book_key"],
+        "CALL apply_batch($1, $2, $3)",
+        [123, JSON.stringify([{ key: "key123" }]), ["old_key"]],
       );
       expect(result).toBe(mockResult);
+      expect(mockClient.release).toHaveBeenCalled();
+    });
+
+    test("should release client when batch fails", async () => {
+      mockPool.connect.mockResolvedValue(mockClient);
+      mockClient.query.mockRejectedValue(new Error("Cant add more books"));
+
+      await expect(
+        dbController.applyBatch(123, [], ["old_key"]),
+      ).rejects.toThrow("Cant add more books");
+      expect(mockClient.release).toHaveBeenCalled();
     });
   });
 });
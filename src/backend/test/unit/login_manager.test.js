@@ -8,6 +8,7 @@ describe("LoginManager", () => {
   beforeEach(() => {
     mockDbManager = {
       getUser: jest.fn(),
+      getUserLibraryKeys: jest.fn(),
       addUser: jest.fn(),
       deleteUser: jest.fn(),
     };
@@ -57,6 +58,32 @@ describe("LoginManager", () => {
     });
   });
 
+  describe("bootstrap", () => {
+    test("should return user id, book count and library keys", async () => {
+      mockDbManager.getUserLibraryKeys.mockResolvedValue({
+        rows: [{ id: 123, book_count: 2, keys: ["/works/OL1W", "/works/OL2W"] }],
+      });
+
+      const result = await loginManager.bootstrap("user", "pass");
+      expect(result).toEqual({
+        userid: 123,
+        book_count: 2,
+        keys: ["/works/OL1W", "/works/OL2W"],
+      });
+      expect(mockDbManager.getUserLibraryKeys).toHaveBeenCalledWith(
+        "user",
+        "pass",
+      );
+    });
+
+    test("should return undefined on bad credentials", async () => {
+      mockDbManager.getUserLibraryKeys.mockResolvedValue({ rows: [] });
+
+      const result = await loginManager.bootstrap("user", "bad");
+      expect(result).toBeUndefined();
+    });
+  });
+
   describe("register", () => {
     test("should return new user id when registration is successful", async () => {
       const mockResponse = { rows: [{ id: 456 }] };
@@ -70,7 +97,7 @@ describe("LoginManager", () => {
 
   describe("deleteUser", () => {
     test("should call deleteUser on dbManager and return true", async () => {
-      mockDbManager.deleteUser.mockResolvedValue({});
+      mockDbManager.deleteUser.mockResolvedValue({ rowCount: 1 });
 
       const result = await loginManager.deleteUser(123, "user", "pass");
       expect(result).toBe(true);
@@ -80,5 +107,12 @@ describe("LoginManager", () => {
         "pass",
       );
     });
+
+    test("should return false when no user was deleted", async () => {
+      mockDbManager.deleteUser.mockResolvedValue({ rowCount: 0 });
+
+      const result = await loginManager.deleteUser(123, "user", "wrong");
+      expect(result).toBe(false);
+    });
   });
 });
@@ -12,6 +12,11 @@ describe("AppController", () => {
       getUserBooks: jest.fn(),
       appendBook: jest.fn(),
       deleteBook: jest.fn(),
+      getLibraryChanges: jest.fn(),
+      getLibrarySnapshot: jest.fn(),
+      getLibraryVersion: jest.fn(),
+      getLibraryMembership: jest.fn(),
+      applyBatch: jest.fn(),
     };
     appController = new AppController(mockDbController);
     fetch.mockClear();
@@ -37,12 +42,8 @@ describe("AppController", () => {
       const mockResponse = { rows: mockBooks };
       mockDbController.getUserBooks.mockResolvedValue(mockResponse);
 
-      const result = await appController.getSavedBooks(123, "password", "");
-      expect(mockDbController.getUserBooks).toHaveBeenCalledWith(
-        123,
-        "password",
-        "",
-      );
+      const result = await appController.getSavedBooks(123, "");
+      expect(mockDbController.getUserBooks).toHaveBeenCalledWith(123, "");
       expect(result).toEqual(mockBooks);
     });
 
@@ -50,7 +51,7 @@ describe("AppController", () => {
       const mockResponse = { rows: [] };
       mockDbController.getUserBooks.mockResolvedValue(mockResponse);
 
-      const result = await appController.getSavedBooks(123, "password", "");
+      const result = await appController.getSavedBooks(123, "");
       expect(result).toEqual([]);
     });
   });
@@ -61,7 +62,6 @@ describe("AppController", () => {
 
       await appController.saveBook(
         123,
-        "pass",
         456,
         2020,
         "key123",
@@ -71,7 +71,6 @@ describe("AppController", () => {
       );
       expect(mockDbController.appendBook).toHaveBeenCalledWith(
         123,
-        "pass",
         456,
         2020,
         "key123",
@@ -86,12 +85,204 @@ describe("AppController", () => {
     test("should delete book via database controller", async () => {
       mockDbController.deleteBook.mockResolvedValue({});
 
-      await appController.deleteBook(123, "pass", "book_key");
+      await appController.deleteBook(123, "book_key");
       expect(mockDbController.deleteBook).toHaveBeenCalledWith(
         123,
-        "pass",
         "book_key",
       );
     });
   });
+
+  describe("getLibraryChanges", () => {
+    test("should split changes into additions and removals", async () => {
+      mockDbController.getLibraryChanges.mockResolvedValue({
+        rows: [
+          {
+            lib_version: "7",
+            key: "/works/OL1W",
+            removed: false,
+            cover_i: 1,
+            first_publish_year: 2000,
+            language: ["eng"],
+            title: "Book 1",
+            author_name: ["Author"],
+          },
+          { lib_version: "7", key: "/works/OL2W", removed: true },
+        ],
+      });
+
+      const result = await appController.getLibraryChanges(123, 5);
+      expect(mockDbController.getLibraryChanges).toHaveBeenCalledWith(123, 5);
+      expect(result.version).toBe(7);
+      expect(result.reset).toBe(false);
+      expect(result.added.map((book) => book.key)).toEqual(["/works/OL1W"]);
+      expect(result.removed).toEqual(["/works/OL2W"]);
+    });
+
+    test("should return empty delta when nothing changed", async () => {
+      mockDbController.getLibraryChanges.mockResolvedValue({
+        rows: [{ lib_version: "7", key: null, removed: null }],
+      });
+
+      const result = await appController.getLibraryChanges(123, 7);
+      expect(result).toEqual({
+        version: 7,
+        reset: false,
+        added: [],
+        removed: [],
+      });
+    });
+
+    test("should resend everything when client is ahead of server", async () => {
+      mockDbController.getLibraryChanges.mockResolvedValue({
+        rows: [{ lib_version: "2", key: null, removed: null }],
+      });
+      mockDbController.getLibrarySnapshot.mockResolvedValue({
+        rows: [
+          {
+            lib_version: "3",
+            key: "/works/OL1W",
+            removed: false,
+            cover_i: 1,
+            first_publish_year: 2000,
+            language: ["eng"],
+            title: "Book 1",
+            author_name: ["Author"],
+          },
+        ],
+      });
+
+      const result = await appController.getLibraryChanges(123, 10);
+      expect(mockDbController.getLibrarySnapshot).toHaveBeenCalledWith(123);
+      expect(result.reset).toBe(true);
+      expect(result.version).toBe(3);
+      expect(result.added.map((book) => book.key)).toEqual(["/works/OL1W"]);
+    });
+
+    test("should build full library from entries when since is zero", async () => {
+      mockDbController.getLibrarySnapshot.mockResolvedValue({
+        rows: [
+          {
+            lib_version: "0",
+            key: "/works/OL1W",
+            removed: false,
+            cover_i: 1,
+            first_publish_year: 2000,
+            language: ["eng"],
+            title: "Book 1",
+            author_name: ["Author"],
+          },
+        ],
+      });
+
+      const result = await appController.getLibraryChanges(123, 0);
+      expect(mockDbController.getLibraryChanges).not.toHaveBeenCalled();
+      expect(result.version).toBe(0);
+      expect(result.reset).toBe(false);
+      expect(result.added.map((book) => book.key)).toEqual(["/works/OL1W"]);
+      expect(result.removed).toEqual([]);
+    });
+
+    test("should return undefined for unknown user", async () => {
+      mockDbController.getLibrarySnapshot.mockResolvedValue({ rows: [] });
+
+      const result = await appController.getLibraryChanges(123, 0);
+      expect(result).toBeUndefined();
+    });
+  });
+
+  describe("getLibraryMembership", () => {
+    test("should return keys present in the library", async () => {
+      mockDbController.getLibraryMembership.mockResolvedValue({
+        rows: [{ key: "/works/OL2W" }],
+      });
+
+      const result = await appController.getLibraryMembership(123, [
+        "/works/OL1W",
+        "/works/OL2W",
+      ]);
+      expect(mockDbController.getLibraryMembership).toHaveBeenCalledWith(123, [
+        "/works/OL1W",
+        "/works/OL2W",
+      ]);
+      expect(result).toEqual(["/works/OL2W"]);
+    });
+
+    test("should not query database for empty key list", async () => {
+      const result = await appController.getLibraryMembership(123, []);
+      expect(result).toEqual([]);
+      expect(mockDbController.getLibraryMembership).not.toHaveBeenCalled();
+    });
+  });
+
+  describe("getLibraryTag", () => {
+    test("should build tag from library version and query", async () => {
+      mockDbController.getLibraryVersion.mockResolvedValue({
+        rows: [{ lib_version: "4", book_count: 2 }],
+      });
+
+      const tag = await appController.getLibraryTag(123, "dune");
+      const otherQuery = await appController.getLibraryTag(123, "");
+      expect(mockDbController.getLibraryVersion).toHaveBeenCalledWith(123);
+      expect(tag).toMatch(/^W\/"123-4-2-[0-9a-f]{12}"$/);
+      expect(otherQuery).not.toBe(tag);
+    });
+
+    test("should change tag when library changes", async () => {
+      mockDbController.getLibraryVersion
+        .mockResolvedValueOnce({ rows: [{ lib_version: "4", book_count: 2 }] })
+        .mockResolvedValueOnce({ rows: [{ lib_version: "5", book_count: 3 }] });
+
+      const before = await appController.getLibraryTag(123, "");
+      const after = await appController.getLibraryTag(123, "");
+      expect(after).not.toBe(before);
+    });
+
+    test("should return undefined for unknown user", async () => {
+      mockDbController.getLibraryVersion.mockResolvedValue({ rows: [] });
+
+      const tag = await appController.getLibraryTag(123, "");
+      expect(tag).toBeUndefined();
+    });
+  });
+
+  describe("applyBatch", () => {
+    const book = {
+      cover_i: 456,
+      first_publish_year: 2020,
+      key: "key123",
+      language: ["en"],
+      title: "Title",
+      author_name: ["JA manal"],
+      extra: "ignored",
+    };
+
+    test("should send additions and removals in one call", async () => {
+      mockDbController.applyBatch.mockResolvedValue({});
+
+      await appController.applyBatch(123, [book], ["old_key"]);
+      expect(mockDbController.applyBatch).toHaveBeenCalledTimes(1);
+
+      const [userid, adds, removes] = mockDbController.applyBatch.mock.calls[0];
+      expect(userid).toBe(123);
+      expect(adds).toEqual([
+        {
+          cover_i: 456,
+          first_publish_year: 2020,
+          key: "key123",
+          language: ["en"],
+          title: "Title",
+          author_name: ["JA manal"],
+        },
+      ]);
+      expect(removes).toEqual(["old_key"]);
+    });
+
+    test("should reject incomplete books", async () => {
+      await expect(
+        appController.applyBatch(123, [{ key: "key123" }], []),
+      ).rejects.toThrow("Wrong book in batch");
+      expect(mockDbController.applyBatch).not.toHaveBeenCalled();
+    });
+  });
 });
@@ -0,0 +1,95 @@
+import { expect, jest, test, describe, beforeEach } from "@jest/globals";
+import { SessionStore } from "../../session_store.js";
+
+describe("SessionStore", () => {
+  let now;
+  let store;
+
+  beforeEach(() => {
+    now = jest.fn(() => 1000);
+    store = new SessionStore(100, now);
+  });
+
+  describe("constructor", () => {
+    test("should throw error when ttl is missing or not positive", () => {
+      expect(() => new SessionStore(undefined)).toThrow(
+        "Wrong session ttl in Session Store construction",
+      );
+      expect(() => new SessionStore(0)).toThrow(
+        "Wrong session ttl in Session Store construction",
+      );
+    });
+  });
+
+  describe("create", () => {
+    test("should issue distinct tokens resolving to user id", () => {
+      const first = store.create(123);
+      const second = store.create(123);
+
+      expect(first).toMatch(/^[0-9a-f]{64}$/);
+      expect(second).not.toBe(first);
+      expect(store.resolve(first)).toBe(123);
+      expect(store.resolve(second)).toBe(123);
+    });
+  });
+
+  describe("resolve", () => {
+    test("should return undefined for unknown or missing tokens", () => {
+      expect(store.resolve("unknown")).toBeUndefined();
+      expect(store.resolve(undefined)).toBeUndefined();
+      expect(store.resolve(["token"])).toBeUndefined();
+    });
+
+    test("should expire sessions after ttl", () => {
+      const token = store.create(123);
+
+      now.mockReturnValue(1100);
+      expect(store.resolve(token)).toBeUndefined();
+      expect(store.sessions.size).toBe(0);
+    });
+
+    test("should extend session on use", () => {
+      const token = store.create(123);
+
+      now.mockReturnValue(1090);
+      expect(store.resolve(token)).toBe(123);
+      now.mockReturnValue(1180);
+      expect(store.resolve(token)).toBe(123);
+    });
+  });
+
+  describe("revoke", () => {
+    test("should drop a single session", () => {
+      const token = store.create(123);
+      const other = store.create(123);
+
+      store.revoke(token);
+      expect(store.resolve(token)).toBeUndefined();
+      expect(store.resolve(other)).toBe(123);
+    });
+
+    test("should drop all sessions of a user", () => {
+      const token = store.create(123);
+      const other = store.create(123);
+      const foreign = store.create(456);
+
+      store.revokeUser(123);
+      expect(store.resolve(token)).toBeUndefined();
+      expect(store.resolve(other)).toBeUndefined();
+      expect(store.resolve(foreign)).toBe(456);
+    });
+  });
+
+  describe("sweep", () => {
+    test("should remove only expired sessions", () => {
+      store.create(123);
+      now.mockReturnValue(1050);
+      const fresh = store.create(456);
+
+      now.mockReturnValue(1120);
+      store.sweep();
+      expect(store.sessions.size).toBe(1);
+      expect(store.resolve(fresh)).toBe(456);
+    });
+  });
+});
@@ -0,0 +1,2 @@
+ALTER TABLE collection_entry ADD COLUMN IF NOT EXISTS search_text text GENERATED ALWAYS AS (book_search_text(title, author_name)) STORED;
+CREATE INDEX IF NOT EXISTS collection_entry_search ON collection_entry USING gin (collection_id, search_text gin_trgm_ops);
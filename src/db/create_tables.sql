@@ -2,7 +2,8 @@ CREATE TABLE users (
   id INTEGER PRIMARY KEY GENERATED ALWAYS AS IDENTITY,
   username CHAR(256) UNIQUE NOT NULL,
   password CHAR(256) NOT NULL,
-  book_count INTEGER DEFAULT 0
+  book_count INTEGER DEFAULT 0,
+  lib_version BIGINT NOT NULL DEFAULT 0
 );
 
 CREATE TABLE collection_entry (
@@ -18,3 +19,14 @@ CREATE TABLE collection_entry (
 
 ALTER TABLE collection_entry ADD CONSTRAINT fk_collection_id FOREIGN KEY (collection_id) REFERENCES users (id) ON DELETE CASCADE;
 
+CREATE TABLE collection_change (
+  collection_id INTEGER NOT NULL,
+  key text NOT NULL,
+  version BIGINT NOT NULL,
+  removed BOOLEAN NOT NULL,
+  PRIMARY KEY (collection_id, key)
+);
+
+ALTER TABLE collection_change ADD CONSTRAINT fk_change_collection_id FOREIGN KEY (collection_id) REFERENCES users (id) ON DELETE CASCADE;
+
+CREATE INDEX collection_change_version ON collection_change (collection_id, version);
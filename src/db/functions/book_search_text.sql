@@ -0,0 +1,8 @@
+CREATE OR REPLACE FUNCTION book_search_text(title text, authors TEXT[])
+RETURNS text
+LANGUAGE sql
+IMMUTABLE PARALLEL SAFE
+AS
+$$
+  SELECT lower(title || ' ' || array_to_string(authors, ' '));
+$$;
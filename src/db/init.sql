@@ -2,6 +2,10 @@ CREATE DATABASE libralib;
 
 \c libralib;
 \i /create_tables.sql
+\i /migrate.sql
 \i /procedures/append_book.sql
 \i /functions/verify_user.sql
 \i /install_pgcrypto.sql
+\i /install_pg_trgm.sql
+\i /functions/book_search_text.sql
+\i /create_search_index.sql
@@ -0,0 +1,16 @@
+ALTER TABLE users ADD COLUMN IF NOT EXISTS lib_version BIGINT NOT NULL DEFAULT 0;
+
+CREATE TABLE IF NOT EXISTS collection_change (
+  collection_id INTEGER NOT NULL,
+  key text NOT NULL,
+  version BIGINT NOT NULL,
+  removed BOOLEAN NOT NULL,
+  PRIMARY KEY (collection_id, key),
+  CONSTRAINT fk_change_collection_id FOREIGN KEY (collection_id) REFERENCES users (id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS collection_change_version ON collection_change (collection_id, version);
+
+DROP PROCEDURE IF EXISTS append_book(INTEGER, text, INTEGER, SMALLINT, text, CHAR(3)[], text, TEXT[]);
+DROP PROCEDURE IF EXISTS remove_book(INTEGER, text, text);
+DROP PROCEDURE IF EXISTS apply_batch(INTEGER, text, jsonb, text[]);
@@ -1,25 +1,62 @@
-CREATE OR REPLACE PROCEDURE append_book(uid INTEGER, pswd text, cov INTEGER, fyp SMALLINT, k text, lang CHAR(3)[], t text, auth_name TEXT[]) LANGUAGE plpgsql AS $$
+CREATE OR REPLACE PROCEDURE record_change(uid INTEGER, k text, is_removed BOOLEAN) LANGUAGE plpgsql AS $$
   BEGIN
-    IF (NOT verify_user_identity(uid, pswd)) THEN
-      RAISE EXCEPTION 'Bad auth token';
-    END IF;
+    INSERT INTO collection_change (collection_id, key, version, removed)
+      SELECT uid, k, lib_version, is_removed FROM users WHERE id = uid
+    ON CONFLICT (collection_id, key) DO UPDATE SET version = EXCLUDED.version, removed = EXCLUDED.removed;
+  END;
+  $$;
 
+CREATE OR REPLACE PROCEDURE append_book(uid INTEGER, cov INTEGER, fyp SMALLINT, k text, lang CHAR(3)[], t text, auth_name TEXT[]) LANGUAGE plpgsql AS $$
+  BEGIN
     INSERT INTO collection_entry (collection_id, cover_i, first_publish_year, key, language, title, author_name) VALUES (uid, cov, fyp, k, lang, t, auth_name);
-    UPDATE users SET book_count = book_count + 1 WHERE id = uid;
+    UPDATE users SET book_count = book_count + 1, lib_version = lib_version + 1 WHERE id = uid;
+    CALL record_change(uid, k, FALSE);
 
   COMMIT;
   END;
   $$;
 
-CREATE OR REPLACE PROCEDURE remove_book(uid INTEGER, pswd text, k text) LANGUAGE plpgsql AS $$
+CREATE OR REPLACE PROCEDURE remove_book(uid INTEGER, k text) LANGUAGE plpgsql AS $$
   BEGIN
-    IF (NOT verify_user_identity(uid, pswd)) THEN
-      RAISE EXCEPTION 'Bad auth token';
-    END IF;
-
     DELETE FROM collection_entry WHERE collection_id = uid AND key = k;
-    UPDATE users SET book_count = book_count - 1 WHERE id = uid;
+    UPDATE users SET book_count = book_count - 1, lib_version = lib_version + 1 WHERE id = uid;
+    CALL record_change(uid, k, TRUE);
   COMMIT;
   END;
   $$;
 
+CREATE OR REPLACE PROCEDURE apply_batch(uid INTEGER, adds jsonb, removes text[]) LANGUAGE plpgsql AS $$
+  DECLARE
+    added_keys text[];
+    removed_keys text[];
+  BEGIN
+    WITH deleted AS (
+      DELETE FROM collection_entry WHERE collection_id = uid AND key = ANY(removes) RETURNING key
+    ) SELECT COALESCE(array_agg(key), '{}') INTO removed_keys FROM deleted;
+
+    WITH inserted AS (
+      INSERT INTO collection_entry (collection_id, cover_i, first_publish_year, key, language, title, author_name)
+        SELECT uid, b.cover_i, b.first_publish_year, b.key, b.language, b.title, b.author_name
+        FROM jsonb_to_recordset(adds) AS b(cover_i INTEGER, first_publish_year SMALLINT, key text, language CHAR(3)[], title text, author_name TEXT[])
+      ON CONFLICT (collection_id, key) DO NOTHING
+      RETURNING key
+    ) SELECT COALESCE(array_agg(key), '{}') INTO added_keys FROM inserted;
+
+    UPDATE users SET book_count = book_count + cardinality(added_keys) - cardinality(removed_keys), lib_version = lib_version + 1 WHERE id = uid;
+
+    IF ((SELECT book_count FROM users WHERE id = uid) > 1000) THEN
+      RAISE EXCEPTION 'Cant add more books';
+    END IF;
+
+    INSERT INTO collection_change (collection_id, key, version, removed)
+      SELECT uid, c.key, u.lib_version, c.removed
+      FROM users u, (
+        SELECT unnest(added_keys) AS key, FALSE AS removed
+        UNION ALL
+        SELECT k, TRUE FROM unnest(removed_keys) AS k WHERE NOT k = ANY(added_keys)
+      ) c
+      WHERE u.id = uid
+    ON CONFLICT (collection_id, key) DO UPDATE SET version = EXCLUDED.version, removed = EXCLUDED.removed;
+  COMMIT;
+  END;
+  $$;
@@ -4,7 +4,7 @@ AS $$
 DECLARE
   book_number INTEGER := 1000;
 BEGIN
-  IF ( (SELECT u.book_count FROM collection_entry ce JOIN users u ON ce.collection_id = u.id AND NEW.collection_id = ce.collection_id) >= book_number) THEN
+  IF ( (SELECT book_count FROM users WHERE id = NEW.collection_id) >= book_number) THEN
     RAISE EXCEPTION 'Cant add more books';
   END IF;
 
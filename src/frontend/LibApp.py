@@ -1,16 +1,84 @@
+import asyncio
 import json
+import multiprocessing
 import os
-import requests
+import threading
+import time
+
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
 
 from textual.app import App, ComposeResult
 from textual.widgets import Input, Static
 from textual.containers import Vertical, Container, VerticalScroll
 from textual.binding import Binding
+from textual.message import Message
 from inputSection import InputSection
 from booksContainer import BookContainer
 from userContainer import UserInfoContainer
-from LoginForm import LoginForm
-from ScreenPop import ScreenPop
+from backendClient import BackendClient, CancelToken
+from searchCache import SearchCache
+from resultsPane import ResultsPane
+from libraryIndex import LibraryIndex
+from mutationQueue import MutationQueue
+from sessionSnapshot import SessionSnapshot
+from coverLoader import CoverLoader, cover_support_available
+from bookRecords import SEARCH_FIELDS, is_complete_book, make_book, library_entry, normalize_book
+
+
+class BooksLoaded(Message):
+    def __init__(
+            self,
+            books: Optional[list],
+            generation: int = 0,
+            pending: bool = False,
+            page: int = 1,
+            total: Optional[int] = None
+    ) -> None:
+        super().__init__()
+        self.books = books
+        self.generation = generation
+        self.pending = pending
+        self.page = page
+        self.total = total
+
+
+class LibraryChanged(Message):
+    def __init__(self, changes: Optional[dict], version: int = 0) -> None:
+        super().__init__()
+        self.changes = changes
+        self.version = version
+
+
+class LibraryMembershipChecked(Message):
+    def __init__(self, keys: list, present: Optional[list], version: int = 0) -> None:
+        super().__init__()
+        self.keys = keys
+        self.present = present
+        self.version = version
+
+
+class LibraryBatchMutated(Message):
+    def __init__(self, added: list, removed: list, success: bool, batch: int) -> None:
+        super().__init__()
+        self.added = added
+        self.removed = removed
+        self.success = success
+        self.batch = batch
+
+
+class AutoLoginFinished(Message):
+    def __init__(self, success: bool) -> None:
+        super().__init__()
+        self.success = success
+
+
+class CoverLoaded(Message):
+    def __init__(self, cover_i: int, cover) -> None:
+        super().__init__()
+        self.cover_i = cover_i
+        self.cover = cover
 
 
 class MainGridContainer(Container):
@@ -29,16 +97,14 @@ class MainGridContainer(Container):
                 id="section2"
             )
 
-        with VerticalScroll(id="right-pane"):
-            books = []
-            for number in range(len(books)):
-                book_container = BookContainer(
-                    books[number],
-                    add_to_lib=self.app.add_book_to_library,
-                    rem_in_lib=self.app.remove_book_from_library
-                )
-                self.app.book_containers.append(book_container)
-                yield book_container
+        yield ResultsPane(
+            add_to_lib=self.app.add_book_to_library,
+            rem_in_lib=self.app.remove_book_from_library,
+            focus_handler=self.app._on_book_focused,
+            cover_handler=self.app.request_cover if self.app.covers_enabled else None,
+            rows=self.app.book_containers,
+            id="right-pane"
+        )
 
         yield UserInfoContainer(
             self.app.current_user,
@@ -62,6 +128,7 @@ class LibApp(App):
 
         Binding("ctrl+down", "focus_next_book", "Следующая книга", show=True),
         Binding("ctrl+up", "focus_previous_book", "Предыдущая книга", show=True),
+        Binding("ctrl+b", "commit_selection", "Применить выбранные", show=True),
     ]
 
     def __init__(self):
@@ -71,6 +138,9 @@ class LibApp(App):
         self.user_books_count = 0
         self.userid = None
         self.password = None
+        self.session_token = None
+        self.session_lock = threading.Lock()
+        self.login_bootstrap = None
         self.last_focused_book = None
         self.book_containers = []
         self.main_container = None
@@ -80,9 +150,87 @@ class LibApp(App):
         self.config_file = "user_config.json"
 
         self.base_url = "http://localhost:8080"
-        self.search_api = "http://openlibrary.org/search.json"
+        self.search_api = "http://openlibrary.org"
+        self.search_endpoint = "/search.json"
+        self.search_fields = list(SEARCH_FIELDS)
+
+        self.pool_size = 4
+        self.backend = BackendClient(
+            self.base_url,
+            pool_size=self.pool_size,
+            timeouts={
+                "/login": 5,
+                "/register": 5,
+                "/logout": 5,
+                "/lib": 10,
+                "/lib/changes": 10,
+                "/lib/contains": 10,
+                "/lib/batch": 15,
+            }
+        )
+        self.search_client = BackendClient(
+            self.search_api,
+            pool_size=self.pool_size,
+            timeouts={self.search_endpoint: 15}
+        )
+        self.search_cache = SearchCache(
+            "search_cache.db",
+            ttl=60 * 60,
+            max_bytes=32 * 1024 * 1024
+        )
+        self.search_generation = 0
+        self.search_cancel_token = None
+        self.search_query = ""
+        self.search_source = ""
+        self.search_page_size = 20
+        self.search_page = 0
+        self.search_total = None
+        self.prefetched_pages = {}
+        self.pages_in_flight = set()
+        self.page_wanted = False
+        self.display_queue = deque()
+        self.display_timer = None
+        self.display_frame_interval = 1 / 60
+        self.display_frame_budget = 0.008
+        self.session_snapshot = SessionSnapshot("session_snapshot.json")
+        self.restored_generation = None
+        self.revalidating_generation = None
+        self.results_pane = None
+
+        self.library_index = LibraryIndex()
+        self.library_loaded = False
+        self.library_keys_known = False
+        self.library_query_cache = {}
+        self.library_query_cache_size = 32
+        self.library_owner = None
+        self.library_synced_version = 0
+        self.library_version = 0
+        self.library_sync_interval = 25
+        self.mutations_since_sync = 0
+        self.mutation_queue = MutationQueue("pending_mutations.json")
+        self.mutation_flush_delay = 0.5
+        self.mutation_retry_delay = 5.0
+        self.mutation_batch_limit = 1000
+        self.mutation_flush_timer = None
+        self.membership_batch_limit = 1000
+        self.io_executor = ThreadPoolExecutor(
+            max_workers=self.pool_size,
+            thread_name_prefix="libapp-io"
+        )
+
+        self.covers_api = CoverLoader.DEFAULT_BASE_URL
+        self.covers_enabled = cover_support_available()
+        self.covers = OrderedDict()
+        self.covers_size = 128
+        self.covers_in_flight = set()
+        self.cover_loader = None
+        self.cover_executor = None
+        self.cover_io_executor = None
 
     def show_login_screen(self) -> None:
+        from LoginForm import LoginForm
+        from ScreenPop import ScreenPop
+
         login_form = LoginForm(
             on_login=self._handle_login_backend,
             on_register=self._handle_register_backend
@@ -99,7 +247,7 @@ class LibApp(App):
     def _on_login_close(self) -> None:
         self.showMainContainer()
         if self.current_user != "Гость":
-            self._update_library_keys_full()
+            self._apply_login_bootstrap()
             self.update_user_info_display()
 
     def compose(self) -> ComposeResult:
@@ -108,102 +256,562 @@ class LibApp(App):
         yield self.main_container
 
     def on_mount(self) -> None:
-        for book_container in self.book_containers:
-            book_container.set_focus_handler(self._on_book_focused)
+        self.warm_up_clients()
         self.showMainContainer()
+        try:
+            self.results_pane = self.query_one("#right-pane", ResultsPane)
+        except Exception as e:
+            pass
+        self.restore_snapshot()
 
         if self.has_saved_user():
             self.attempt_auto_login()
 
-    def search_personal_library(self, query: str) -> None:
-        if not self.userid or not self.password:
+    def warm_up_clients(self) -> None:
+        self.backend.warm_up_async()
+        self.search_client.warm_up_async()
+
+    def on_unmount(self) -> None:
+        self.save_snapshot()
+        self.flush_mutations_now()
+        self.io_executor.shutdown(wait=False)
+        self.backend.close()
+        self.search_client.close()
+        if self.cover_loader is not None:
+            self.cover_io_executor.shutdown(wait=False)
+            self.cover_executor.shutdown(wait=False)
+            self.cover_loader.client.close()
+
+    async def run_io(self, function: Callable, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.io_executor, function, *args)
+
+    def get_cover_loader(self) -> CoverLoader:
+        if self.cover_loader is None:
+            from concurrent.futures import ProcessPoolExecutor
+            from coverCache import CoverCache
+
+            self.cover_io_executor = ThreadPoolExecutor(
+                max_workers=2,
+                thread_name_prefix="libapp-covers"
+            )
+            self.cover_executor = ProcessPoolExecutor(
+                max_workers=2,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            self.cover_loader = CoverLoader(
+                BackendClient(self.covers_api, pool_size=2, default_timeout=10),
+                CoverCache("cover_cache.db"),
+                width=BookContainer.COVER_WIDTH,
+                height=BookContainer.COVER_HEIGHT,
+                decode_executor=self.cover_executor
+            )
+        return self.cover_loader
+
+    def request_cover(self, cover_i: int):
+        if cover_i in self.covers:
+            self.covers.move_to_end(cover_i)
+            return self.covers[cover_i]
+        if cover_i not in self.covers_in_flight:
+            self.covers_in_flight.add(cover_i)
+            self.run_worker(
+                self._cover_task(cover_i),
+                group="covers",
+                exit_on_error=False
+            )
+        return None
+
+    async def _cover_task(self, cover_i: int) -> None:
+        loader = self.get_cover_loader()
+        loop = asyncio.get_running_loop()
+        cover = await loop.run_in_executor(self.cover_io_executor, loader.load, cover_i)
+        self.post_message(CoverLoaded(cover_i, cover))
+
+    def on_cover_loaded(self, message: CoverLoaded) -> None:
+        self.covers_in_flight.discard(message.cover_i)
+        self.covers[message.cover_i] = message.cover
+        while len(self.covers) > self.covers_size:
+            self.covers.popitem(last=False)
+        if message.cover is None:
+            return
+        try:
+            right_pane = self.query_one("#right-pane", ResultsPane)
+            right_pane.set_cover(message.cover_i, message.cover)
+        except Exception as e:
+            pass
+
+    def set_results_loading(self, loading: bool) -> None:
+        try:
+            right_pane = self.query_one("#right-pane", VerticalScroll)
+            right_pane.loading = loading
+        except Exception as e:
+            pass
+
+    def search_personal_library(self, query: str, show_loading: bool = True) -> None:
+        if not self.userid or not self.session_token:
+            return
+        self.search_source = "library"
+        self._start_search(self._search_library_task, query, show_loading)
+
+    def search_books(self, query: str, show_loading: bool = True) -> None:
+        if not query:
+            return
+        self.search_source = "search"
+        self._start_search(self._search_books_task, query, show_loading)
+
+    def _start_search(self, task: Callable, query: str, show_loading: bool = True) -> None:
+        if self.search_cancel_token is not None:
+            self.search_cancel_token.cancel()
+        self.workers.cancel_group(self, "pages")
+        self.cancel_display()
+        self.search_generation += 1
+        self.search_cancel_token = CancelToken()
+
+        self.search_query = query
+        self.search_page = 0
+        self.search_total = None
+        self.prefetched_pages.clear()
+        self.pages_in_flight.clear()
+        self.page_wanted = False
+        self.revalidating_generation = None if show_loading else self.search_generation
+
+        if show_loading:
+            self.set_results_loading(True)
+        self.run_worker(
+            task(query, self.search_generation, self.search_cancel_token),
+            group="search",
+            exclusive=True,
+            exit_on_error=False
+        )
+
+    async def _search_library_task(self, query: str, generation: int, cancel_token: CancelToken) -> None:
+        self._reset_library_copy_if_needed()
+        if not self.library_loaded:
+            version = self.library_version
+            changes = await self.run_io(self.fetch_library_changes, self.library_synced_version, cancel_token)
+            if changes is not None:
+                self.on_library_changed(LibraryChanged(changes, version))
+
+        if self.library_loaded:
+            self.post_message(BooksLoaded(self.library_index.search(query), generation))
+            return
+
+        books_data = await self.run_io(self.fetch_personal_library, query, cancel_token)
+        self.post_message(BooksLoaded(books_data, generation))
+
+    async def _search_books_task(self, query: str, generation: int, cancel_token: CancelToken) -> None:
+        await self._load_books_page(query, 1, generation, cancel_token)
+
+    async def _load_books_page(self, query: str, page: int, generation: int, cancel_token: CancelToken) -> None:
+        cached = await self.run_io(
+            self.search_cache.get,
+            query,
+            page,
+            self.search_fields,
+            self.search_page_size
+        )
+        if cached is not None:
+            cached_result, fresh = cached
+            self.post_message(BooksLoaded(
+                cached_result['docs'],
+                generation,
+                pending=not fresh,
+                page=page,
+                total=cached_result['numFound']
+            ))
+            if fresh:
+                return
+
+        result = await self.run_io(self.fetch_books, query, cancel_token, page)
+        books_data = None
+        total = None
+        if result is not None:
+            await self.run_io(
+                self.search_cache.put,
+                query,
+                result,
+                page,
+                self.search_fields,
+                self.search_page_size
+            )
+            if cached is None or result != cached[0]:
+                books_data = result['docs']
+                total = result['numFound']
+        self.post_message(BooksLoaded(books_data, generation, page=page, total=total))
+
+    def on_books_loaded(self, message: BooksLoaded) -> None:
+        if message.generation != self.search_generation:
+            return
+
+        if message.total is not None:
+            self.search_total = message.total
+
+        if message.page == 1:
+            self.set_results_loading(False)
+            if message.books is not None and self.search_page <= 1:
+                if not self._is_revalidated(message):
+                    self.display_books(message.books)
+                self.search_page = 1
+                self.prefetch_page(2)
+            return
+
+        if not message.pending:
+            self.pages_in_flight.discard(message.page)
+        if message.books is None or message.page <= self.search_page:
+            return
+        self.prefetched_pages[message.page] = message.books
+        self._append_ready_pages()
+
+    def _is_revalidated(self, message: BooksLoaded) -> bool:
+        if message.generation != self.revalidating_generation:
+            return False
+        try:
+            right_pane = self.query_one("#right-pane", ResultsPane)
+        except Exception as e:
+            return False
+        books = [self.make_book(book_data) for book_data in message.books]
+        return books == right_pane.books
+
+    def restore_snapshot(self) -> None:
+        snapshot = self.session_snapshot.load()
+        if snapshot is None:
+            return
+        credentials = self.get_saved_credentials()
+        username = credentials[0] if credentials else None
+        if snapshot.get("username") != username:
+            return
+
+        if username:
+            self.current_user = username
+            self.library_owner = snapshot.get("userid")
+            self.mutation_queue.load(self.library_owner)
+            self._update_library_keys([{'key': key} for key in snapshot.get("library_keys", [])])
+            self._overlay_pending_mutations()
+            self.set_books_count(len(self.library_keys))
+
+        books = snapshot.get("books", [])
+        query = snapshot.get("query", "")
+        if not books:
+            return
+        try:
+            right_pane = self.query_one("#right-pane", ResultsPane)
+            right_pane.set_books(books, [self.is_book_in_library(book) for book in books])
+        except Exception as e:
+            return
+        self.search_query = query
+        self.search_source = snapshot.get("source", "")
+        self.restored_generation = self.search_generation
+        if self.search_source == "search":
+            self.search_books(query, show_loading=False)
+
+    def save_snapshot(self) -> None:
+        books = self.results_pane.books if self.results_pane is not None else []
+        owner = self.userid or self.library_owner
+        logged_in = owner is not None and self.current_user != "Гость"
+        self.session_snapshot.save(
+            self.current_user if logged_in else None,
+            owner if logged_in else None,
+            self.search_source,
+            self.search_query,
+            books,
+            list(self.library_keys) if logged_in else [],
+            self.user_books_count if logged_in else 0
+        )
+
+    def has_more_pages(self) -> bool:
+        if self.search_total is None:
+            return False
+        return self.search_page * self.search_page_size < self.search_total
+
+    def prefetch_page(self, page: int) -> None:
+        if self.search_total is None or (page - 1) * self.search_page_size >= self.search_total:
+            return
+        if page in self.pages_in_flight or page in self.prefetched_pages:
             return
+
+        self.pages_in_flight.add(page)
+        self.run_worker(
+            self._load_books_page(self.search_query, page, self.search_generation, self.search_cancel_token),
+            group="pages",
+            exit_on_error=False
+        )
+
+    def load_next_page(self) -> None:
+        if not self.has_more_pages():
+            return
+        self.page_wanted = True
+        self._append_ready_pages()
+        if self.page_wanted:
+            self.prefetch_page(self.search_page + 1)
+
+    def _append_ready_pages(self) -> None:
+        while self.page_wanted and self.search_page + 1 in self.prefetched_pages:
+            page = self.search_page + 1
+            self.append_books(self.prefetched_pages.pop(page))
+            self.search_page = page
+            self.page_wanted = False
+            self.prefetch_page(page + 1)
+
+    def on_results_pane_near_end(self, message: ResultsPane.NearEnd) -> None:
+        self.load_next_page()
+
+    def fetch_personal_library(self, query: str, cancel_token: Optional[CancelToken] = None) -> Optional[list]:
         try:
-            url = f"{self.base_url}/lib"
             data = {
-                "userid": self.userid,
-                "password": self.password,
                 "query": query
             }
 
-            response = requests.post(url, json=data)
+            cached = self.library_query_cache.get(query)
+            headers = {"If-None-Match": cached[0]} if cached else None
+            response = self.post_session("/lib", data, cancel_token=cancel_token, headers=headers)
+            if response.status_code == 304 and cached:
+                return cached[1]
             if response.status_code == 200:
                 result = response.json()
                 if result.get('success'):
-                    books_data = result.get('books', [])
-                    self.display_books(books_data)
+                    books = result.get('books', [])
+                    self._remember_library_query(query, response.headers.get("ETag"), books)
+                    return books
         except Exception as e:
             pass
+        return None
 
-    def search_books(self, query: str) -> None:
-        if not query:
+    def _remember_library_query(self, query: str, etag: Optional[str], books: list) -> None:
+        self.library_query_cache.pop(query, None)
+        if not etag:
             return
+        self.library_query_cache[query] = (etag, books)
+        while len(self.library_query_cache) > self.library_query_cache_size:
+            self.library_query_cache.pop(next(iter(self.library_query_cache)))
 
+    def fetch_library_changes(self, since: int, cancel_token: Optional[CancelToken] = None) -> Optional[dict]:
         try:
-            response = requests.get(self.search_api + "?q=" + query.strip().replace(" ", "+"))
+            data = {
+                "since": since
+            }
+
+            response = self.post_session("/lib/changes", data, cancel_token=cancel_token)
             if response.status_code == 200:
                 result = response.json()
-                self.display_books(result['docs'])
+                if result.get('success'):
+                    return result
         except Exception as e:
             pass
+        return None
 
-    def display_books(self, books_data: list) -> None:
-        right_pane = self.query_one("#right-pane", VerticalScroll)
-
-        for container in self.book_containers:
-            container.remove()
-        self.book_containers.clear()
-
-        for book_data in books_data:
-            book = {
-                'title': book_data.get('title', 'Без названия'),
-                'author': book_data.get('author_name', ['Неизвестен']),
-                'year': book_data.get('first_publish_year', 'Неизвестен'),
-                'cover_i': book_data.get('cover_i', 0),
-                'key': book_data.get('key', ''),
-                'language': book_data.get('language', '')
+    def fetch_library_membership(self, keys: list, cancel_token: Optional[CancelToken] = None) -> Optional[list]:
+        try:
+            data = {
+                "keys": keys
             }
 
-            book_container = BookContainer(
-                book,
-                add_to_lib=self.app.add_book_to_library,
-                rem_in_lib=self.app.remove_book_from_library,
-                is_added=self.is_book_in_library(book),
+            response = self.post_session("/lib/contains", data, cancel_token=cancel_token)
+            if response.status_code == 200:
+                result = response.json()
+                if result.get('success'):
+                    return result.get('keys', [])
+        except Exception as e:
+            pass
+        return None
+
+    def fetch_books(
+            self,
+            query: str,
+            cancel_token: Optional[CancelToken] = None,
+            page: int = 1
+    ) -> Optional[dict]:
+        try:
+            response = self.search_client.get(
+                self.search_endpoint,
+                params={
+                    "q": query.strip(),
+                    "fields": ",".join(self.search_fields),
+                    "limit": self.search_page_size,
+                    "page": page
+                },
+                cancel_token=cancel_token
             )
+            if response.status_code == 200:
+                result = response.json()
+                return {
+                    'docs': self.normalize_books(result['docs']),
+                    'numFound': result.get('numFound', len(result['docs']))
+                }
+        except Exception as e:
+            pass
+        return None
+
+    def normalize_books(self, books_data: list) -> list:
+        return [normalize_book(book_data, self.search_fields) for book_data in books_data]
 
-            book_container.set_focus_handler(self.app._on_book_focused)
-            self.app.book_containers.append(book_container)
-            right_pane.mount(book_container)
+    def make_book(self, book_data: dict) -> dict:
+        return make_book(book_data)
+
+    def display_books(self, books_data: list) -> None:
+        right_pane = self.query_one("#right-pane", ResultsPane)
+        self.cancel_display()
+        self.display_queue.extend(books_data)
+        first_screen = right_pane.visible_rows() + 2 * ResultsPane.OVERSCAN
+        right_pane.set_books(*self._take_display_chunk(limit=first_screen))
+        self._schedule_display()
+        if self.search_source == "search" and not self.library_keys_known:
+            self.check_results_membership(books_data)
+
+    def append_books(self, books_data: list) -> None:
+        if self.search_source == "search" and not self.library_keys_known:
+            self.check_results_membership(books_data)
+        if self.display_queue:
+            self.display_queue.extend(books_data)
+            return
+        right_pane = self.query_one("#right-pane", ResultsPane)
+        books = [self.make_book(book_data) for book_data in books_data]
+        right_pane.append_books(books, [self.is_book_in_library(book) for book in books])
+
+    def _take_display_chunk(self, limit: Optional[int] = None, deadline: Optional[float] = None) -> tuple:
+        books = []
+        while self.display_queue and (limit is None or len(books) < limit):
+            if deadline is not None and books and time.perf_counter() >= deadline:
+                break
+            books.append(self.make_book(self.display_queue.popleft()))
+        return books, [self.is_book_in_library(book) for book in books]
+
+    def _schedule_display(self) -> None:
+        if self.display_queue and self.display_timer is None:
+            self.display_timer = self.set_timer(self.display_frame_interval, self._display_next_chunk)
+
+    def _display_next_chunk(self) -> None:
+        self.display_timer = None
+        books, added = self._take_display_chunk(deadline=time.perf_counter() + self.display_frame_budget)
+        if books:
+            right_pane = self.query_one("#right-pane", ResultsPane)
+            right_pane.append_books(books, added)
+        self._schedule_display()
+
+    def cancel_display(self) -> None:
+        self.display_queue.clear()
+        if self.display_timer is not None:
+            self.display_timer.stop()
+            self.display_timer = None
 
     def is_book_in_library(self, book) -> bool:
         return book.get("key") in self.library_keys
 
     def _update_library_keys_full(self) -> None:
-        try:
-            url = f"{self.base_url}/lib"
-            data = {
-                "userid": self.userid,
-                "password": self.password,
-                "query": ""
-            }
+        self._reset_library_copy_if_needed()
+        if len(self.mutation_queue):
+            self.schedule_mutation_flush()
+        self.run_worker(
+            self._refresh_library_task(),
+            group="library",
+            exit_on_error=False
+        )
 
-            response = requests.post(url, json=data)
-            if response.status_code == 200:
-                result = response.json()
-                if result.get('success'):
-                    books_data = result.get('books', [])
-                    self._update_library_keys(books_data)
-            self.update_user_info_display()
-        except Exception as e:
-            pass
+    async def _refresh_library_task(self) -> None:
+        version = self.library_version
+        changes = await self.run_io(self.fetch_library_changes, self.library_synced_version)
+        self.post_message(LibraryChanged(changes, version))
 
-    def _update_library_keys(self, books_data: list) -> None:
-        self.library_keys.clear()
+    def check_results_membership(self, books_data: list) -> None:
+        if not self.userid or not self.session_token or self.library_loaded:
+            return
+        keys = list(dict.fromkeys(book.get('key') for book in books_data if book.get('key')))
+        for start in range(0, len(keys), self.membership_batch_limit):
+            self.run_worker(
+                self._membership_task(keys[start:start + self.membership_batch_limit], self.library_version),
+                group="membership",
+                exit_on_error=False
+            )
+
+    async def _membership_task(self, keys: list, version: int) -> None:
+        present = await self.run_io(self.fetch_library_membership, keys)
+        self.post_message(LibraryMembershipChecked(keys, present, version))
+
+    def on_library_membership_checked(self, message: LibraryMembershipChecked) -> None:
+        if message.present is None or message.version != self.library_version:
+            return
+        self.mutations_since_sync = 0
+        present = set(message.present)
+        pending = self.mutation_queue.effective()
+        for book_key in message.keys:
+            if book_key not in pending:
+                self._set_library_key(book_key, book_key in present)
+        self.set_books_count(len(self.library_keys))
+
+    def on_library_changed(self, message: LibraryChanged) -> None:
+        if message.changes is not None and message.version == self.library_version:
+            self.mutations_since_sync = 0
+            self._apply_library_changes(message.changes)
+        self.update_user_info_display()
+
+    def _apply_login_bootstrap(self) -> None:
+        bootstrap = self.login_bootstrap
+        self.login_bootstrap = None
+        if bootstrap is None:
+            self._update_library_keys_full()
+            return
+
+        self._reset_library_copy_if_needed()
+        if self.library_loaded:
+            self._update_library_keys_full()
+            return
+        self._update_library_keys([{'key': key} for key in bootstrap["keys"]])
+        self.library_keys_known = True
+        self._overlay_pending_mutations()
+        if len(self.mutation_queue):
+            self.set_books_count(len(self.library_keys))
+        else:
+            self.set_books_count(bootstrap["book_count"])
+
+    def _reset_library_copy_if_needed(self) -> None:
+        if self.library_owner != self.userid:
+            self._clear_library_copy()
+            self.library_owner = self.userid
+            self.mutation_queue.load(self.userid)
+            if len(self.mutation_queue):
+                self._overlay_pending_mutations()
+                self.schedule_mutation_flush()
+
+    def _clear_library_copy(self) -> None:
+        self.library_index.clear()
+        self.library_loaded = False
+        self.library_keys_known = False
+        self.library_query_cache.clear()
+        self._update_library_keys([])
+        self.library_synced_version = 0
+        self.library_owner = None
+
+    def _apply_library_changes(self, changes: dict) -> None:
+        if changes.get('reset'):
+            self.library_index.clear()
+        for book in changes.get('added', []):
+            self.library_index.add(book)
+        for book_key in changes.get('removed', []):
+            self.library_index.remove(book_key)
+        self.library_synced_version = changes.get('version', self.library_synced_version)
+        self.library_loaded = True
+        self._overlay_pending_mutations()
+        self._update_library_keys(list(self.library_index.books.values()))
+
+    def _overlay_pending_mutations(self) -> None:
+        for book_key, (added, book) in self.mutation_queue.effective().items():
+            if added:
+                self.library_index.add(self.library_entry(book))
+            else:
+                self.library_index.remove(book_key)
+            self._set_library_key(book_key, added)
 
+    def _update_library_keys(self, books_data: list) -> None:
+        keys = {}
         for book in books_data:
             book_key = book.get('key')
             if book_key:
-                self.library_keys[book_key] = True
+                keys[book_key] = True
+
+        changes = {book_key: False for book_key in self.library_keys if book_key not in keys}
+        changes.update((book_key, True) for book_key in keys if book_key not in self.library_keys)
+        self.library_keys.clear()
+        self.library_keys.update(keys)
+        self._set_results_membership(changes)
 
         self.user_books_count = len(self.library_keys)
         self.update_user_info_display()
@@ -211,18 +819,19 @@ class LibApp(App):
 
     def _handle_login_backend(self, username: str, password: str) -> bool:
         try:
-            url = f"{self.base_url}/login"
             data = {
                 "username": username,
                 "password": password
             }
-            response = requests.post(url, json=data)
+            response = self.backend.post("/login", data)
             if response.status_code == 200:
                 result = response.json()
                 if result.get('success'):
                     self.current_user = username
                     self.userid = result.get('userid')
                     self.password = password
+                    self.session_token = result.get('token')
+                    self.login_bootstrap = self.make_login_bootstrap(result)
 
                     return True
             return False
@@ -231,25 +840,70 @@ class LibApp(App):
 
     def _handle_register_backend(self, username: str, password: str) -> bool:
         try:
-            url = f"{self.base_url}/register"
             data = {
                 "username": username,
                 "password": password
             }
 
-            response = requests.post(url, json=data)
+            response = self.backend.post("/register", data)
             if response.status_code == 200:
                 result = response.json()
                 if result.get('success'):
                     self.current_user = username
                     self.userid = result.get('userid')
                     self.password = password
+                    self.session_token = result.get('token')
+                    self.login_bootstrap = self.make_login_bootstrap(result)
+
+                    return True
+            return False
+        except Exception as e:
+            return False
+
+    @staticmethod
+    def make_login_bootstrap(result: dict) -> Optional[dict]:
+        keys = result.get('keys')
+        if not isinstance(keys, list):
+            return None
+        return {
+            "keys": keys,
+            "book_count": result.get('book_count', len(keys))
+        }
 
+    def renew_session(self) -> bool:
+        if not self.userid or not self.password:
+            return False
+        try:
+            data = {
+                "username": self.current_user,
+                "password": self.password
+            }
+            response = self.backend.post("/login", data)
+            if response.status_code == 200:
+                result = response.json()
+                if result.get('success') and result.get('userid') == self.userid:
+                    self.session_token = result.get('token')
                     return True
             return False
         except Exception as e:
             return False
 
+    def post_session(self, endpoint: str, data: dict, **kwargs):
+        token = self.session_token
+        response = self.backend.post(endpoint, {"token": token, **data}, **kwargs)
+        if response.status_code == 401:
+            with self.session_lock:
+                if self.session_token == token and not self.renew_session():
+                    return response
+            response = self.backend.post(endpoint, {"token": self.session_token, **data}, **kwargs)
+        return response
+
+    def end_session(self, token: str) -> None:
+        try:
+            self.backend.post("/logout", {"token": token})
+        except Exception as e:
+            pass
+
 
     def has_saved_user(self) -> bool:
         return os.path.exists(self.config_file)
@@ -293,14 +947,30 @@ class LibApp(App):
     def attempt_auto_login(self) -> None:
         self.auto_login_attempted = True
         credentials = self.get_saved_credentials()
-        success = False
-        if credentials:
-            username, saved_password = credentials
-            success = self._handle_login_backend(username, saved_password)
-        if success:
-            self.curremr_user = username
-            self.password = saved_password
-            self._update_library_keys_full()
+        if not credentials:
+            self.showMainContainer()
+            self.update_user_info_display()
+            return
+        self.run_worker(
+            self._auto_login_task(*credentials),
+            group="login",
+            exclusive=True,
+            exit_on_error=False
+        )
+
+    async def _auto_login_task(self, username: str, password: str) -> None:
+        success = await self.run_io(self._handle_login_backend, username, password)
+        self.post_message(AutoLoginFinished(success))
+
+    def on_auto_login_finished(self, message: AutoLoginFinished) -> None:
+        if message.success:
+            self._apply_login_bootstrap()
+            if self.search_source == "library" and self.restored_generation == self.search_generation:
+                self.search_personal_library(self.search_query, show_loading=False)
+        elif not self.userid and self.library_owner is not None:
+            self.current_user = "Гость"
+            self._clear_library_copy()
+            self.set_books_count(0)
         self.showMainContainer()
         self.update_user_info_display()
 
@@ -315,39 +985,12 @@ class LibApp(App):
         return False
 
     def action_focus_next_book(self) -> None:
-        if not self.book_containers:
-            return
-
-        if not self.is_focus_on_books():
-            if self.last_focused_book and self.last_focused_book in self.book_containers:
-                self.last_focused_book.focus()
-            else:
-                self.book_containers[0].focus()
-        else:
-            current_index = self.get_current_book_index()
-            next_index = (current_index + 1) % len(self.book_containers)
-            self.book_containers[next_index].focus()
+        right_pane = self.query_one("#right-pane", ResultsPane)
+        right_pane.focus_step(1, self.is_focus_on_books())
 
     def action_focus_previous_book(self) -> None:
-        if not self.book_containers:
-            return
-
-        if not self.is_focus_on_books():
-            if self.last_focused_book and self.last_focused_book in self.book_containers:
-                self.last_focused_book.focus()
-            else:
-                self.book_containers[0].focus()
-        else:
-            current_index = self.get_current_book_index()
-            prev_index = (current_index - 1) % len(self.book_containers)
-            self.book_containers[prev_index].focus()
-
-    def get_current_book_index(self) -> int:
-        if self.is_focus_on_books():
-            return self.book_containers.index(self.focused)
-        elif self.last_focused_book and self.last_focused_book in self.book_containers:
-            return self.book_containers.index(self.last_focused_book)
-        return 0
+        right_pane = self.query_one("#right-pane", ResultsPane)
+        right_pane.focus_step(-1, self.is_focus_on_books())
 
     def action_scroll_down(self) -> None:
         right_pane = self.query_one("#right-pane", VerticalScroll)
@@ -388,11 +1031,18 @@ class LibApp(App):
             pass
 
     def logout(self) -> None:
+        self.cancel_mutation_flush()
+        self.mutation_queue.detach()
+        if self.session_token:
+            self.io_executor.submit(self.end_session, self.session_token)
         self.clear_config()
         self.current_user = "Гость"
         self.user_books_count = 0
         self.userid = None
         self.password = None
+        self.session_token = None
+        self.login_bootstrap = None
+        self._clear_library_copy()
         self.update_user_info_display()
 
         self.hideMainContainer()
@@ -413,61 +1063,168 @@ class LibApp(App):
 
 
     def add_book_to_library(self, book: dict) -> bool:
-        if not self.userid or not self.password:
+        if not self.userid or not self.session_token:
+            return False
+        if not self.can_store_book(book):
+            self.notify_incomplete_books(1)
             return False
+        self._apply_library_mutation(book, True)
+        self.mutation_queue.enqueue(book, True)
+        self.schedule_mutation_flush()
+        return True
 
-        try:
-            url = f"{self.base_url}/lib/addbook"
-            data = {
-                "userid": self.userid,
-                "password": self.password,
-                "cover_i": book.get('cover_i', 0),
-                "first_publish_year": book.get('year', 0),
-                "key": book.get('key', ''),
-                "language": book.get('language', 'ru'),
-                "title": book.get('title', ''),
-                "author_name": book.get('author', ['Неизвестен'])
-            }
+    def remove_book_from_library(self, book: dict) -> None:
+        if not self.userid or not self.session_token:
+            return
+        self._apply_library_mutation(book, False)
+        self.mutation_queue.enqueue(book, False)
+        self.schedule_mutation_flush()
 
-            response = requests.post(url, json=data, timeout=10)
+    def _apply_library_mutation(self, book: dict, added: bool) -> None:
+        book_key = book.get('key')
+        if not book_key:
+            return
+        if added:
+            self.library_index.add(self.library_entry(book))
+        else:
+            self.library_index.remove(book_key)
+        self._set_library_key(book_key, added)
+        self.library_version += 1
+        self.set_books_count(len(self.library_keys))
 
-            if response.status_code == 200:
-                result = response.json()
-                success = result.get('success', False)
+    def library_entry(self, book: dict) -> dict:
+        return library_entry(book)
 
-                if success:
-                    self._update_library_keys_full()
-                    self.update_user_info_display()
-                    return True
-                else:
-                    return False
+    def can_store_book(self, book: dict) -> bool:
+        return is_complete_book(self.library_entry(book))
+
+    def notify_incomplete_books(self, count: int) -> None:
+        self.notify(
+            f"Нельзя добавить книг без обложки, года или языка: {count}",
+            severity="warning"
+        )
+
+    def action_commit_selection(self) -> None:
+        right_pane = self.query_one("#right-pane", ResultsPane)
+        if not self.userid or not self.session_token:
+            return
+        books = right_pane.take_selection()
+        if not books:
+            return
+
+        added = [book for book in books if not self.is_book_in_library(book)]
+        removed = [book for book in books if self.is_book_in_library(book)]
+        rejected = [book for book in added if not self.can_store_book(book)]
+        if rejected:
+            added = [book for book in added if self.can_store_book(book)]
+            self.notify_incomplete_books(len(rejected))
+        for book in added:
+            self._apply_library_mutation(book, True)
+            self.mutation_queue.enqueue(book, True)
+            right_pane.set_added(book.get('key'), True)
+        for book in removed:
+            self._apply_library_mutation(book, False)
+            self.mutation_queue.enqueue(book, False)
+            right_pane.set_added(book.get('key'), False)
+
+        self.flush_mutations()
+
+    def schedule_mutation_flush(self, delay: Optional[float] = None) -> None:
+        if self.mutation_flush_timer is not None:
+            return
+        self.mutation_flush_timer = self.set_timer(
+            self.mutation_flush_delay if delay is None else delay,
+            self.flush_mutations
+        )
+
+    def cancel_mutation_flush(self) -> None:
+        if self.mutation_flush_timer is not None:
+            self.mutation_flush_timer.stop()
+            self.mutation_flush_timer = None
+
+    def flush_mutations(self) -> None:
+        self.cancel_mutation_flush()
+        if not self.userid or not self.session_token:
+            return
+
+        added, removed = self.mutation_queue.take(self.mutation_batch_limit)
+        if not added and not removed:
+            return
+        self.run_worker(
+            self._library_batch_task(added, removed, self.mutation_queue.batch),
+            group="library",
+            exit_on_error=False
+        )
+
+    def flush_mutations_now(self) -> None:
+        if not self.userid or not self.session_token:
+            return
+        added, removed = self.mutation_queue.take(self.mutation_batch_limit)
+        if not added and not removed:
+            return
+        if self.request_batch(added, removed):
+            self.mutation_queue.complete()
+        else:
+            self.mutation_queue.fail()
+
+    async def _library_batch_task(self, added: list, removed: list, batch: int) -> None:
+        success = await self.run_io(self.request_batch, added, removed)
+        self.post_message(LibraryBatchMutated(added, removed, success, batch))
+
+    def on_library_batch_mutated(self, message: LibraryBatchMutated) -> None:
+        if message.batch != self.mutation_queue.batch or not self.mutation_queue.in_flight:
+            return
+        if not message.success:
+            for entry in self.mutation_queue.fail():
+                self._apply_library_mutation(entry["book"], not entry["added"])
+            if len(self.mutation_queue):
+                self.schedule_mutation_flush(self.mutation_retry_delay)
+            return
+
+        self.mutation_queue.complete()
+        if len(self.mutation_queue):
+            self.schedule_mutation_flush()
+
+        self.mutations_since_sync += 1
+        if self.mutations_since_sync >= self.library_sync_interval:
+            if self.library_loaded or self.results_pane is None:
+                self._update_library_keys_full()
             else:
-                return False
+                self.check_results_membership(self.results_pane.books)
+
+    def _set_library_key(self, book_key: str, added: bool) -> None:
+        if added == (book_key in self.library_keys):
+            return
+        if added:
+            self.library_keys[book_key] = True
+        else:
+            self.library_keys.pop(book_key, None)
+        self._set_results_membership({book_key: added})
 
+    def _set_results_membership(self, changes: dict) -> None:
+        if not changes:
+            return
+        try:
+            right_pane = self.query_one("#right-pane", ResultsPane)
+            right_pane.update_membership(changes)
         except Exception as e:
+            pass
+
+    def request_batch(self, added: list, removed: list) -> bool:
+        if not self.userid or not self.session_token:
             return False
 
-    def remove_book_from_library(self, book: dict) -> bool:
         try:
-            url = f"{self.base_url}/lib/removebook"
             data = {
-                "userid": self.userid,
-                "password": self.password,
-                "key": book.get('key', '')
+                "add": [self.library_entry(book) for book in added],
+                "remove": [book.get('key', '') for book in removed]
             }
-            response = requests.post(url, json=data, timeout=10)
+            response = self.post_session("/lib/batch", data)
 
             if response.status_code == 200:
                 result = response.json()
-                success = result.get('success', False)
-                if success:
-                    self._update_library_keys_full()
-                    self.update_user_info_display()
-                    return True
-                else:
-                    return False
-            else:
-                return False
+                return result.get('success', False)
+            return False
 
         except Exception as e:
             return False
@@ -3,9 +3,11 @@ from textual.containers import Container, Vertical
 from textual.widgets import Header, Footer, Input, Button, Static, Label
 from textual.validation import Validator, ValidationResult, Length, Function
 from textual.reactive import reactive
+from textual.message import Message
 from textual import events
 import json
 import os
+from functools import partial
 from typing import Callable, Optional
 
 
@@ -37,6 +39,14 @@ class LoginForm(Container):
     username_valid = reactive(False)
     password_valid = reactive(False)
 
+    class Finished(Message):
+        def __init__(self, action: str, username: str, password: str, success: bool) -> None:
+            super().__init__()
+            self.action = action
+            self.username = username
+            self.password = password
+            self.success = success
+
     def __init__(
         self,
         on_login: Optional[Callable[[str, str], bool]] = None,
@@ -46,6 +56,7 @@ class LoginForm(Container):
         self.users_file = "users.json"
         self.on_login_callback = on_login
         self.on_register_callback = on_register
+        self.pending = False
 
     def on_mount(self) -> None:
         self.update_button_styles()
@@ -95,10 +106,10 @@ class LoginForm(Container):
         login_btn = self.query_one("#login-btn", Button)
         register_btn = self.query_one("#register-btn", Button)
 
-        login_enabled = self.username_valid and self.password_valid
+        login_enabled = self.username_valid and self.password_valid and not self.pending
         login_btn.disabled = not login_enabled
 
-        register_enabled = self.username_valid and self.password_valid
+        register_enabled = self.username_valid and self.password_valid and not self.pending
         register_btn.disabled = not register_enabled
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
@@ -113,18 +124,7 @@ class LoginForm(Container):
             message.update("[red]Заполните все поля[/red]")
             return
 
-        success = False
-        if self.on_login_callback:
-            success = self.on_login_callback(self.username, self.password)
-
-        if success:
-            message.update("[green]Успешный вход![/green]")
-            self.app.update_user_info_display()
-            self.app.save_config(self.username, self.password)
-            self.close_popup()
-            self.app.showMainContainer()
-        else:
-            message.update("[red]Неверное имя пользователя или пароль.[/red]")
+        self.submit("login", self.on_login_callback)
 
     def register(self) -> None:
         message = self.query_one("#message", Static)
@@ -133,17 +133,51 @@ class LoginForm(Container):
             message.update("[red]Исправьте ошибки в форме[/red]")
             return
 
-        success = False
+        self.submit("register", self.on_register_callback)
 
-        if self.on_register_callback:
-            success = self.on_register_callback(self.username, self.password)
+    def submit(self, action: str, callback: Optional[Callable[[str, str], bool]]) -> None:
+        if self.pending:
+            return
+        if not callback:
+            self.show_result(action, False)
+            return
 
-        if success:
-            message.update("[green]Аккаунт успешно создан[/green]")
+        self.pending = True
+        self.update_button_styles()
+        self.query_one("#message", Static).update("Подождите...")
+        self.run_worker(
+            partial(self._submit_task, action, callback, self.username, self.password),
+            group="login",
+            thread=True,
+            exit_on_error=False
+        )
+
+    def _submit_task(self, action: str, callback: Callable[[str, str], bool], username: str, password: str) -> None:
+        try:
+            success = callback(username, password)
+        except Exception as e:
+            success = False
+        self.post_message(self.Finished(action, username, password, success))
+
+    def on_login_form_finished(self, message: Finished) -> None:
+        self.pending = False
+        self.update_button_styles()
+        if message.success:
             self.app.update_user_info_display()
-            self.app.save_config(self.username, self.password)
+            self.app.save_config(message.username, message.password)
+        self.show_result(message.action, message.success)
+
+    def show_result(self, action: str, success: bool) -> None:
+        message = self.query_one("#message", Static)
+        if success:
+            if action == "login":
+                message.update("[green]Успешный вход![/green]")
+            else:
+                message.update("[green]Аккаунт успешно создан[/green]")
             self.close_popup()
             self.app.showMainContainer()
+        elif action == "login":
+            message.update("[red]Неверное имя пользователя или пароль.[/red]")
         else:
             message.update("[red]Ошибка при регистрации[/red]")
 
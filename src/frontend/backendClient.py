@@ -0,0 +1,155 @@
+import threading
+
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Optional
+
+if TYPE_CHECKING:
+    import requests
+
+
+class RequestCancelled(Exception):
+    pass
+
+
+class CancelToken:
+    def __init__(self):
+        self.cancelled = False
+        self.responses = []
+        self.lock = threading.Lock()
+
+    def attach(self, response: "requests.Response") -> None:
+        with self.lock:
+            self.responses.append(response)
+            cancelled = self.cancelled
+        if cancelled:
+            response.close()
+            raise RequestCancelled()
+
+    def cancel(self) -> None:
+        with self.lock:
+            self.cancelled = True
+            responses = list(self.responses)
+        for response in responses:
+            response.close()
+
+
+class BackendClient:
+    DEFAULT_TIMEOUT = 10
+    DEFAULT_POOL_SIZE = 4
+
+    def __init__(
+            self,
+            base_url: str,
+            pool_size: int = DEFAULT_POOL_SIZE,
+            timeouts: Optional[Dict[str, float]] = None,
+            default_timeout: float = DEFAULT_TIMEOUT
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = pool_size
+        self.timeouts = dict(timeouts or {})
+        self.default_timeout = default_timeout
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self) -> "requests.Session":
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=1,
+                        pool_maxsize=self.pool_size,
+                        pool_block=False
+                    )
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self._session = session
+        return self._session
+
+    def url(self, endpoint: str) -> str:
+        return self.base_url + endpoint
+
+    def timeout_for(self, endpoint: str) -> float:
+        return self.timeouts.get(endpoint, self.default_timeout)
+
+    def post(
+            self,
+            endpoint: str,
+            data: dict,
+            cancel_token: Optional[CancelToken] = None,
+            headers: Optional[Dict[str, str]] = None
+    ) -> "requests.Response":
+        if cancel_token is not None:
+            return self._send_cancellable(
+                self.session.post, endpoint, cancel_token, json=data, headers=headers
+            )
+        return self.session.post(
+            self.url(endpoint),
+            json=data,
+            headers=headers,
+            timeout=self.timeout_for(endpoint)
+        )
+
+    def get(
+            self,
+            endpoint: str,
+            params: Optional[dict] = None,
+            cancel_token: Optional[CancelToken] = None
+    ) -> "requests.Response":
+        if cancel_token is not None:
+            return self._send_cancellable(self.session.get, endpoint, cancel_token, params=params)
+        return self.session.get(
+            self.url(endpoint),
+            params=params,
+            timeout=self.timeout_for(endpoint)
+        )
+
+    def _send_cancellable(
+            self,
+            send: Callable[..., "requests.Response"],
+            endpoint: str,
+            cancel_token: CancelToken,
+            **kwargs
+    ) -> "requests.Response":
+        if cancel_token.cancelled:
+            raise RequestCancelled()
+
+        response = send(
+            self.url(endpoint),
+            timeout=self.timeout_for(endpoint),
+            stream=True,
+            **kwargs
+        )
+        cancel_token.attach(response)
+        try:
+            response.content
+        except Exception as e:
+            if cancel_token.cancelled:
+                raise RequestCancelled()
+            raise
+        if cancel_token.cancelled:
+            raise RequestCancelled()
+        return response
+
+    def warm_up(self, endpoints: Iterable[str] = ("/",)) -> None:
+        for endpoint in endpoints:
+            try:
+                self.session.head(self.url(endpoint), timeout=self.timeout_for(endpoint))
+            except Exception as e:
+                pass
+
+    def warm_up_async(self, endpoints: Iterable[str] = ("/",)) -> threading.Thread:
+        thread = threading.Thread(
+            target=self.warm_up,
+            args=(tuple(endpoints),),
+            daemon=True
+        )
+        thread.start()
+        return thread
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
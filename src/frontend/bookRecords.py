@@ -0,0 +1,48 @@
+SEARCH_FIELDS = [
+    "key",
+    "title",
+    "author_name",
+    "first_publish_year",
+    "cover_i",
+    "language",
+]
+
+YEAR_MIN = -32768
+YEAR_MAX = 32767
+
+
+def normalize_book(book_data: dict, fields: list = SEARCH_FIELDS) -> dict:
+    return {field: book_data[field] for field in fields if field in book_data}
+
+
+def make_book(book_data: dict) -> dict:
+    return {
+        'title': book_data.get('title', 'Без названия'),
+        'author': book_data.get('author_name', ['Неизвестен']),
+        'year': book_data.get('first_publish_year', 'Неизвестен'),
+        'cover_i': book_data.get('cover_i', 0),
+        'key': book_data.get('key', ''),
+        'language': book_data.get('language', '')
+    }
+
+
+def library_entry(book: dict) -> dict:
+    return {
+        "cover_i": book.get('cover_i', 0),
+        "first_publish_year": book.get('year', 0),
+        "key": book.get('key', ''),
+        "language": book.get('language', 'ru'),
+        "title": book.get('title', ''),
+        "author_name": book.get('author', ['Неизвестен'])
+    }
+
+
+def is_complete_book(book_data: dict) -> bool:
+    if not all(book_data.get(field) for field in SEARCH_FIELDS):
+        return False
+    year = book_data['first_publish_year']
+    cover = book_data['cover_i']
+    return (
+        isinstance(year, int) and YEAR_MIN <= year <= YEAR_MAX
+        and isinstance(cover, int)
+    )
@@ -1,9 +1,20 @@
-from textual.app import ComposeResult
-from textual.widgets import Static
-from textual.containers import Container, Vertical
+from rich.text import Text
+from textual.geometry import Region
+from textual.widget import Widget
 from typing import Callable, Optional
 
-class BookContainer(Container):
+class BookContainer(Widget):
+    COMPONENT_CLASSES = {
+        "book-title",
+        "book-author",
+        "book-year",
+        "book-status_notAdded",
+        "book-status_added",
+    }
+    STATUS_LINE = 6
+    COVER_WIDTH = 10
+    COVER_HEIGHT = 8
+
     DEFAULT_CSS = """
     BookContainer {
         width: 100%;
@@ -12,7 +23,8 @@ class BookContainer(Container):
         padding: 1;
         border: round $accent;
         background: $panel;
-        layout: vertical;
+        text-wrap: nowrap;
+        text-overflow: ellipsis;
     }
 
     BookContainer:focus {
@@ -21,31 +33,35 @@ class BookContainer(Container):
         outline: heavy $accent;
     }
 
-    .book-title {
+    BookContainer.book-selected {
+        border: round $warning;
+    }
+
+    BookContainer.book-selected:focus {
+        border: double $warning;
+    }
+
+    BookContainer > .book-title {
         text-style: bold;
         color: $text;
-        margin-bottom: 1;
     }
 
-    .book-author {
+    BookContainer > .book-author {
         color: $text-muted;
-        margin-bottom: 1;
     }
 
-    .book-year {
+    BookContainer > .book-year {
         color: $success;
     }
 
-    .book-status_notAdded {
+    BookContainer > .book-status_notAdded {
         color: $warning;
         text-style: italic;
-        margin-top: 1;
     }
 
-    .book-status_added {
+    BookContainer > .book-status_added {
         color: $success;
         text-style: italic;
-        margin-top: 1;
     }
     """
 
@@ -54,31 +70,106 @@ class BookContainer(Container):
                  add_to_lib: Callable[[dict], None],
                  rem_in_lib: Callable[[dict], None],
                  is_added: bool = False,
+                 show_cover: bool = False,
                  *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.book = book
         self.add_to_lib = add_to_lib
         self.rem_in_lib = rem_in_lib
         self.is_added = is_added
+        self.show_cover = show_cover
+        self.cover = None
+        self.index = None
+        self.is_selected = False
         self.focus_handler = None
+        self.status_handler = None
+        self.selection_handler = None
         self.can_focus = True
+        self._body = None
+        self._status = None
+
+    def status_text(self) -> str:
+        return "Статус: Добавлена в библиотеку" if self.is_added else "Статус: Не добавлена"
+
+    def body_lines(self) -> list:
+        return [
+            (self.book.get('title', ''), "book-title"),
+            (f"Автор: {', '.join(self.book.get('author', []))}", "book-author"),
+            (f"Год: {self.book.get('year', '')}", "book-year"),
+        ]
+
+    def render(self) -> Text:
+        if self._body is None:
+            self._body = Text()
+            for line, component in self.body_lines():
+                self._body.append(line, style=self.get_component_rich_style(component))
+                self._body.append("\n\n")
+        if self._status is None:
+            component = "book-status_added" if self.is_added else "book-status_notAdded"
+            self._status = Text(self.status_text(), style=self.get_component_rich_style(component))
+        text = Text.assemble(self._body, self._status)
+        if not self.show_cover:
+            return text
+        return self._with_cover(text)
+
+    def _with_cover(self, text: Text) -> Text:
+        if self.cover is not None:
+            cover = self.cover.lines()
+        else:
+            cover = [Text(" " * self.COVER_WIDTH)] * self.COVER_HEIGHT
+        lines = text.split("\n", allow_blank=True)
+
+        rows = []
+        for y in range(max(len(cover), len(lines))):
+            row = Text()
+            row.append_text(cover[y] if y < len(cover) else Text(" " * self.COVER_WIDTH))
+            row.append(" ")
+            if y < len(lines):
+                row.append_text(lines[y])
+            rows.append(row)
+        return Text("\n").join(rows)
 
-    def compose(self) -> ComposeResult:
-        status_text = "Статус: Добавлена в библиотеку" if self.is_added else "Статус: Не добавлена"
-        status_class = "book-status_added" if self.is_added else "book-status_notAdded"
+    def set_cover(self, cover) -> None:
+        if cover is self.cover:
+            return
+        self.cover = cover
+        self.refresh()
 
-        yield Container(
-            Vertical(
-                Static(self.book['title'], classes="book-title"),
-                Static(f"Автор: {', '.join(self.book['author'])}", classes="book-author"),
-                Static(f"Год: {self.book['year']}", classes="book-year"),
-                Static(status_text, classes=status_class, id="book-status_notAdded"),
-            ),
-        )
+    def notify_style_update(self) -> None:
+        super().notify_style_update()
+        self._body = None
+        self._status = None
+
+    def bind(self, book: dict, is_added: bool, index: Optional[int] = None, is_selected: bool = False) -> None:
+        self.index = index
+        if is_selected != self.is_selected:
+            self.is_selected = is_selected
+            self.set_class(is_selected, "book-selected")
+        if book == self.book:
+            if is_added != self.is_added:
+                self.is_added = is_added
+                self._update_status()
+            return
+        self.book = book
+        self.is_added = is_added
+        self.cover = None
+        self._body = None
+        self._status = None
+        self.refresh()
+
+    def _update_status(self) -> None:
+        self._status = None
+        self.refresh(Region(0, self.STATUS_LINE, self.size.width, 1))
 
     def set_focus_handler(self, handler: Callable) -> None:
         self.focus_handler = handler
 
+    def set_status_handler(self, handler: Callable) -> None:
+        self.status_handler = handler
+
+    def set_selection_handler(self, handler: Callable) -> None:
+        self.selection_handler = handler
+
     def on_focus(self) -> None:
         if self.focus_handler:
             self.focus_handler(self)
@@ -87,20 +178,30 @@ class BookContainer(Container):
         if event.key == "enter":
             self._handle_save()
             event.stop()
+        elif event.key == "space":
+            self._toggle_selection()
+            event.stop()
         return False
 
     def _handle_save(self) -> None:
-        status_widget = self.query_one("#book-status_notAdded", Static)
-
-        if not self.is_added:
-            self.is_added = True
-            status_widget.update("Статус: Добавлена в библиотеку")
-            status_widget.remove_class("book-status_notAdded")
-            status_widget.add_class("book-status_added")
-            self.add_to_lib(self.book)
+        self.is_added = not self.is_added
+        self._update_status()
+
+        if self.is_added:
+            accepted = self.add_to_lib(self.book)
         else:
-            self.is_added = False
-            status_widget.update("Статус: Не добавлена")
-            status_widget.remove_class("book-status_added")
-            status_widget.add_class("book-status_notAdded")
-            self.rem_in_lib(self.book)
+            accepted = self.rem_in_lib(self.book)
+        if accepted is False:
+            self.is_added = not self.is_added
+            self._update_status()
+            return
+
+        if self.status_handler:
+            self.status_handler(self)
+
+    def _toggle_selection(self) -> None:
+        self.is_selected = not self.is_selected
+        self.set_class(self.is_selected, "book-selected")
+
+        if self.selection_handler:
+            self.selection_handler(self)
@@ -0,0 +1,26 @@
+from typing import Optional
+
+from lruStore import LruStore
+
+
+class CoverCache:
+    DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.store = LruStore(path, "cover_cache", max_bytes)
+
+    @staticmethod
+    def make_key(cover_i: int, width: int, height: int) -> str:
+        return f"{cover_i}|{width}x{height}"
+
+    def get(self, cover_i: int, width: int, height: int) -> Optional[bytes]:
+        row = self.store.get(self.make_key(cover_i, width, height))
+        if row is None:
+            return None
+        return row[0]
+
+    def put(self, cover_i: int, width: int, height: int, data: bytes) -> None:
+        self.store.put(self.make_key(cover_i, width, height), data)
+
+    def clear(self) -> None:
+        self.store.clear()
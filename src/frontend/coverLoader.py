@@ -0,0 +1,109 @@
+import importlib.util
+
+from concurrent.futures import Executor
+from io import BytesIO
+from typing import List, Optional
+
+from rich.color import Color
+from rich.style import Style
+from rich.text import Text
+from backendClient import BackendClient
+from coverCache import CoverCache
+
+
+def cover_support_available() -> bool:
+    return importlib.util.find_spec("PIL") is not None
+
+
+def decode_thumbnail(data: bytes, width: int, height: int) -> bytes:
+    from PIL import Image
+
+    with Image.open(BytesIO(data)) as image:
+        thumbnail = image.convert("RGB").resize((width, height * 2), Image.BILINEAR)
+        return thumbnail.tobytes()
+
+
+class CoverThumbnail:
+    HALF_BLOCK = "▀"
+
+    def __init__(self, width: int, height: int, pixels: bytes):
+        self.width = width
+        self.height = height
+        self.pixels = pixels
+        self._lines = None
+
+    def pixel(self, x: int, y: int) -> Color:
+        offset = (y * self.width + x) * 3
+        return Color.from_rgb(*self.pixels[offset:offset + 3])
+
+    def lines(self) -> List[Text]:
+        if self._lines is None:
+            self._lines = []
+            for y in range(self.height):
+                line = Text()
+                for x in range(self.width):
+                    line.append(
+                        self.HALF_BLOCK,
+                        Style(color=self.pixel(x, 2 * y), bgcolor=self.pixel(x, 2 * y + 1))
+                    )
+                self._lines.append(line)
+        return self._lines
+
+
+class CoverLoader:
+    DEFAULT_BASE_URL = "https://covers.openlibrary.org"
+    DEFAULT_WIDTH = 10
+    DEFAULT_HEIGHT = 8
+
+    def __init__(
+            self,
+            client: BackendClient,
+            cache: CoverCache,
+            width: int = DEFAULT_WIDTH,
+            height: int = DEFAULT_HEIGHT,
+            decode_executor: Optional[Executor] = None
+    ):
+        self.client = client
+        self.cache = cache
+        self.width = width
+        self.height = height
+        self.decode_executor = decode_executor
+
+    @staticmethod
+    def cover_endpoint(cover_i: int) -> str:
+        return f"/b/id/{cover_i}-S.jpg"
+
+    def fetch(self, cover_i: int) -> Optional[bytes]:
+        try:
+            response = self.client.get(self.cover_endpoint(cover_i))
+            if response.status_code == 200 and response.content:
+                return response.content
+        except Exception as e:
+            pass
+        return None
+
+    def decode(self, data: bytes) -> Optional[bytes]:
+        try:
+            if self.decode_executor is None:
+                pixels = decode_thumbnail(data, self.width, self.height)
+            else:
+                pixels = self.decode_executor.submit(
+                    decode_thumbnail, data, self.width, self.height
+                ).result()
+        except Exception as e:
+            return None
+        if len(pixels) != self.width * self.height * 2 * 3:
+            return None
+        return pixels
+
+    def load(self, cover_i: int) -> Optional[CoverThumbnail]:
+        pixels = self.cache.get(cover_i, self.width, self.height)
+        if pixels is None:
+            data = self.fetch(cover_i)
+            if data is None:
+                return None
+            pixels = self.decode(data)
+            if pixels is None:
+                return None
+            self.cache.put(cover_i, self.width, self.height, pixels)
+        return CoverThumbnail(self.width, self.height, pixels)
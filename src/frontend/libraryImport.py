@@ -0,0 +1,393 @@
+import argparse
+import csv
+import itertools
+import json
+import os
+import re
+import sys
+import time
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterator, Optional
+from backendClient import BackendClient
+from bookRecords import SEARCH_FIELDS, is_complete_book, library_entry, make_book, normalize_book
+
+
+class ImportProgress:
+    def __init__(self, rows: int = 0):
+        self.rows = rows
+        self.imported = 0
+        self.skipped = 0
+        self.failed = 0
+
+    def __str__(self) -> str:
+        return (
+            f"Обработано строк: {self.rows}, добавлено: {self.imported}, "
+            f"пропущено: {self.skipped}, ошибок: {self.failed}"
+        )
+
+
+class LibraryImporter:
+    DEFAULT_BATCH_SIZE = 100
+    DEFAULT_CONCURRENCY = 4
+    DEFAULT_ATTEMPTS = 3
+    DEFAULT_RETRY_DELAY = 1.0
+    JSON_CHUNK_SIZE = 1 << 16
+    ISBN_PATTERN = re.compile(r"[^0-9Xx]")
+
+    def __init__(
+            self,
+            backend: BackendClient,
+            search_client: BackendClient,
+            userid,
+            token: str,
+            batch_size: int = DEFAULT_BATCH_SIZE,
+            concurrency: int = DEFAULT_CONCURRENCY,
+            attempts: int = DEFAULT_ATTEMPTS,
+            retry_delay: float = DEFAULT_RETRY_DELAY,
+            state_path: Optional[str] = None,
+            progress_handler: Optional[Callable[[ImportProgress], None]] = None
+    ):
+        self.backend = backend
+        self.search_client = search_client
+        self.userid = userid
+        self.token = token
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.attempts = max(1, attempts)
+        self.retry_delay = retry_delay
+        self.state_path = state_path
+        self.progress_handler = progress_handler
+
+    @staticmethod
+    def read_rows(path: str) -> Iterator[dict]:
+        extension = os.path.splitext(path)[1].lower()
+        if extension == ".csv":
+            with open(path, "r", encoding="utf-8-sig", newline="") as f:
+                for row in csv.DictReader(f):
+                    yield row
+        elif extension == ".json":
+            with open(path, "r", encoding="utf-8") as f:
+                for doc in LibraryImporter.read_json_docs(f):
+                    yield doc if isinstance(doc, dict) else {}
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        doc = json.loads(line)
+                    except ValueError:
+                        doc = {}
+                    yield doc if isinstance(doc, dict) else {}
+
+    @staticmethod
+    def read_json_docs(f, chunk_size: int = JSON_CHUNK_SIZE) -> Iterator:
+        decoder = json.JSONDecoder()
+        buffer = ""
+        position = 0
+        eof = False
+
+        def fill() -> bool:
+            nonlocal buffer, position, eof
+            chunk = "" if eof else f.read(chunk_size)
+            if not chunk:
+                eof = True
+                return False
+            buffer = buffer[position:] + chunk
+            position = 0
+            return True
+
+        def peek() -> str:
+            nonlocal position
+            while True:
+                while position < len(buffer) and buffer[position].isspace():
+                    position += 1
+                if position < len(buffer):
+                    return buffer[position]
+                if not fill():
+                    return ""
+
+        def value():
+            nonlocal position
+            peek()
+            while True:
+                try:
+                    result, end = decoder.raw_decode(buffer, position)
+                    if end < len(buffer) or eof:
+                        position = end
+                        return result
+                except ValueError:
+                    if eof:
+                        raise
+                fill()
+
+        def items() -> Iterator:
+            nonlocal position
+            while True:
+                char = peek()
+                if char in ("]", ""):
+                    return
+                if char == ",":
+                    position += 1
+                    continue
+                yield value()
+
+        char = peek()
+        if char == "[":
+            position += 1
+            yield from items()
+        elif char == "{":
+            position += 1
+            while peek() not in ("}", ""):
+                if peek() == ",":
+                    position += 1
+                    continue
+                key = value()
+                if peek() != ":":
+                    raise ValueError("Ожидалось ':' после ключа JSON")
+                position += 1
+                if key == "docs" and peek() == "[":
+                    position += 1
+                    yield from items()
+                    return
+                value()
+
+    @staticmethod
+    def row_value(row: dict, *names: str) -> str:
+        for name in names:
+            value = row.get(name)
+            if isinstance(value, str):
+                value = value.strip().lstrip("=").strip('"')
+            if value:
+                return str(value)
+        return ""
+
+    def lookup_params(self, row: dict) -> Optional[dict]:
+        isbn = self.ISBN_PATTERN.sub("", self.row_value(row, "ISBN13", "ISBN", "isbn"))
+        if isbn:
+            return {"isbn": isbn}
+
+        title = self.row_value(row, "Title", "title")
+        if not title:
+            return None
+        params = {"title": title}
+        author = self.row_value(row, "Author", "author")
+        if author:
+            params["author"] = author
+        return params
+
+    def resolve(self, row: dict) -> Optional[dict]:
+        key = row.get("key")
+        if isinstance(key, str) and key.startswith("/works/"):
+            doc = normalize_book(row)
+            if is_complete_book(doc):
+                return doc
+            return self.search({"q": f"key:{key}"})
+
+        params = self.lookup_params(row)
+        if params is None:
+            return None
+        return self.search(params)
+
+    def search(self, params: dict) -> Optional[dict]:
+        params = dict(params, fields=",".join(SEARCH_FIELDS), limit=1)
+        try:
+            response = self.search_client.get("/search.json", params=params)
+            if response.status_code == 200:
+                docs = response.json().get("docs", [])
+                if docs:
+                    return normalize_book(docs[0])
+        except Exception as e:
+            pass
+        return None
+
+    def make_entry(self, row: dict) -> Optional[dict]:
+        doc = self.resolve(row)
+        if doc is None or not is_complete_book(doc):
+            return None
+        return library_entry(make_book(doc))
+
+    def write_batch(self, entries: list) -> bool:
+        data = {
+            "token": self.token,
+            "add": entries,
+            "remove": []
+        }
+        for attempt in range(self.attempts):
+            if attempt:
+                time.sleep(self.retry_delay * attempt)
+            try:
+                response = self.backend.post("/lib/batch", data)
+                if response.status_code == 200 and response.json().get('success'):
+                    return True
+            except Exception as e:
+                pass
+        return False
+
+    def load_state(self, path: str) -> int:
+        if not self.state_path:
+            return 0
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("source") == os.path.abspath(path) and state.get("userid") == self.userid:
+                return max(0, int(state.get("rows", 0)))
+        except Exception as e:
+            pass
+        return 0
+
+    def save_state(self, path: str, rows: int) -> None:
+        if not self.state_path:
+            return
+        try:
+            temp_path = self.state_path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"source": os.path.abspath(path), "userid": self.userid, "rows": rows}, f)
+            os.replace(temp_path, self.state_path)
+        except Exception as e:
+            pass
+
+    def clear_state(self) -> None:
+        if self.state_path and os.path.exists(self.state_path):
+            try:
+                os.remove(self.state_path)
+            except Exception as e:
+                pass
+
+    def run(self, path: str) -> ImportProgress:
+        done = self.load_state(path)
+        progress = ImportProgress(done)
+        rows = itertools.islice(self.read_rows(path), done, None)
+        position = done
+        in_flight = deque()
+        resumable = True
+
+        def finish(end: int, count: int, future: Optional[Future]) -> None:
+            nonlocal resumable
+            if future is None or future.result():
+                progress.imported += count
+                if resumable:
+                    self.save_state(path, end)
+            else:
+                progress.failed += count
+                resumable = False
+            progress.rows = end
+            if self.progress_handler:
+                self.progress_handler(progress)
+
+        with ThreadPoolExecutor(self.concurrency) as resolver, \
+                ThreadPoolExecutor(self.concurrency) as writer:
+            while True:
+                chunk = list(itertools.islice(rows, self.batch_size))
+                if not chunk:
+                    break
+                position += len(chunk)
+
+                entries = [entry for entry in resolver.map(self.make_entry, chunk) if entry is not None]
+                progress.skipped += len(chunk) - len(entries)
+                future = writer.submit(self.write_batch, entries) if entries else None
+                in_flight.append((position, len(entries), future))
+
+                while len(in_flight) >= self.concurrency:
+                    finish(*in_flight.popleft())
+
+            while in_flight:
+                finish(*in_flight.popleft())
+
+        if resumable:
+            self.clear_state()
+        return progress
+
+
+def login(backend: BackendClient, username: str, password: str):
+    try:
+        response = backend.post("/login", {"username": username, "password": password})
+        if response.status_code == 200:
+            result = response.json()
+            if result.get('success') and result.get('token'):
+                return result.get('userid'), result.get('token')
+    except Exception as e:
+        pass
+    return None
+
+
+def logout(backend: BackendClient, token: str) -> None:
+    try:
+        backend.post("/logout", {"token": token})
+    except Exception as e:
+        pass
+
+
+def load_credentials(config_file: str) -> dict:
+    try:
+        with open(config_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        return {}
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Импорт книг в личную библиотеку из CSV или JSONL")
+    parser.add_argument("path", help="CSV (экспорт Goodreads), JSONL или books.json")
+    parser.add_argument("--username")
+    parser.add_argument("--password")
+    parser.add_argument("--config", default="user_config.json")
+    parser.add_argument("--backend", default="http://localhost:8080")
+    parser.add_argument("--search-api", default="http://openlibrary.org")
+    parser.add_argument("--batch-size", type=int, default=LibraryImporter.DEFAULT_BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=LibraryImporter.DEFAULT_CONCURRENCY)
+    parser.add_argument("--state", help="Файл с позицией для продолжения импорта")
+    parser.add_argument("--restart", action="store_true", help="Начать импорт сначала")
+    args = parser.parse_args(argv)
+
+    config = load_credentials(args.config)
+    username = args.username or config.get("username")
+    password = args.password or config.get("password")
+    if not username or not password:
+        print("Укажите логин и пароль", file=sys.stderr)
+        return 2
+
+    backend = BackendClient(
+        args.backend,
+        pool_size=args.concurrency,
+        timeouts={"/login": 5, "/logout": 5, "/lib/batch": 30}
+    )
+    search_client = BackendClient(
+        args.search_api,
+        pool_size=args.concurrency,
+        timeouts={"/search.json": 15}
+    )
+    try:
+        session = login(backend, username, password)
+        if session is None:
+            print("Не удалось войти", file=sys.stderr)
+            return 1
+
+        userid, token = session
+        importer = LibraryImporter(
+            backend,
+            search_client,
+            userid,
+            token,
+            batch_size=args.batch_size,
+            concurrency=args.concurrency,
+            state_path=args.state or args.path + ".import-state.json",
+            progress_handler=lambda progress: print(progress, file=sys.stderr)
+        )
+        if args.restart:
+            importer.clear_state()
+        progress = importer.run(args.path)
+        logout(backend, token)
+    finally:
+        backend.close()
+        search_client.close()
+
+    print(progress)
+    return 0 if progress.failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+import re
+
+from typing import Iterable, List, Set
+
+
+class LibraryIndex:
+    GRAM_SIZE = 3
+    TOKEN_PATTERN = re.compile(r"\w+")
+
+    def __init__(self):
+        self.books = {}
+        self.book_tokens = {}
+        self.token_keys = {}
+        self.gram_tokens = {}
+
+    def __len__(self) -> int:
+        return len(self.books)
+
+    @classmethod
+    def tokenize(cls, text: str) -> List[str]:
+        return cls.TOKEN_PATTERN.findall(text.lower())
+
+    @classmethod
+    def grams(cls, token: str) -> Set[str]:
+        size = cls.GRAM_SIZE
+        return set(token[i:i + size] for i in range(len(token) - size + 1))
+
+    @staticmethod
+    def authors(book: dict) -> Iterable[str]:
+        authors = book.get('author_name', [])
+        if isinstance(authors, str):
+            return [authors]
+        return authors or []
+
+    def book_text_tokens(self, book: dict) -> Set[str]:
+        tokens = set(self.tokenize(book.get('title', '')))
+        for author in self.authors(book):
+            tokens.update(self.tokenize(author))
+        return tokens
+
+    def add(self, book: dict) -> None:
+        book_key = book.get('key')
+        if not book_key:
+            return
+        if book_key in self.books:
+            self.remove(book_key)
+
+        tokens = self.book_text_tokens(book)
+        self.books[book_key] = book
+        self.book_tokens[book_key] = tokens
+        for token in tokens:
+            keys = self.token_keys.get(token)
+            if keys is None:
+                keys = self.token_keys[token] = set()
+                for gram in self.grams(token):
+                    self.gram_tokens.setdefault(gram, set()).add(token)
+            keys.add(book_key)
+
+    def remove(self, book_key: str) -> None:
+        if self.books.pop(book_key, None) is None:
+            return
+
+        for token in self.book_tokens.pop(book_key, ()):
+            keys = self.token_keys.get(token)
+            if keys is None:
+                continue
+            keys.discard(book_key)
+            if keys:
+                continue
+            del self.token_keys[token]
+            for gram in self.grams(token):
+                tokens = self.gram_tokens.get(gram)
+                if tokens is not None:
+                    tokens.discard(token)
+                    if not tokens:
+                        del self.gram_tokens[gram]
+
+    def clear(self) -> None:
+        self.books.clear()
+        self.book_tokens.clear()
+        self.token_keys.clear()
+        self.gram_tokens.clear()
+
+    def matching_tokens(self, word: str) -> Set[str]:
+        grams = self.grams(word)
+        if not grams:
+            return set(token for token in self.token_keys if word in token)
+
+        candidates = None
+        for gram in grams:
+            tokens = self.gram_tokens.get(gram)
+            if not tokens:
+                return set()
+            candidates = set(tokens) if candidates is None else candidates & tokens
+        return set(token for token in candidates if word in token)
+
+    def search(self, query: str) -> List[dict]:
+        words = self.tokenize(query)
+        if not words:
+            return sorted(self.books.values(), key=self.title_key)
+
+        keys = set()
+        for word in set(words):
+            for token in self.matching_tokens(word):
+                keys.update(self.token_keys[token])
+
+        phrase = " ".join(words)
+        return sorted(
+            (self.books[book_key] for book_key in keys),
+            key=lambda book: (self.rank(book, phrase), self.title_key(book))
+        )
+
+    def rank(self, book: dict, phrase: str) -> int:
+        title = " ".join(self.tokenize(book.get('title', '')))
+        if title == phrase:
+            return 1
+        if title.startswith(phrase):
+            return 2
+        if phrase in title:
+            return 3
+        return 4
+
+    @staticmethod
+    def title_key(book: dict) -> str:
+        return book.get('title', '').lower()
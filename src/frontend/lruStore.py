@@ -0,0 +1,115 @@
+import sqlite3
+import time
+
+from typing import Optional, Tuple
+
+
+class LruStore:
+    COLUMNS = ["key", "data", "size", "stored_at", "accessed_at"]
+
+    def __init__(self, path: str, table: str, max_bytes: int):
+        self.path = path
+        self.table = table
+        self.max_bytes = max_bytes
+        self.initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        if not self.initialized:
+            connection.execute("PRAGMA journal_mode=WAL")
+            columns = [row[1] for row in connection.execute(f"PRAGMA table_info({self.table})")]
+            if columns and columns != self.COLUMNS:
+                connection.execute(f"DROP TABLE {self.table}")
+            connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                " key TEXT PRIMARY KEY,"
+                " data BLOB NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " stored_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            connection.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.table}_accessed_at"
+                f" ON {self.table} (accessed_at)"
+            )
+            self.initialized = True
+        return connection
+
+    def get(self, key: str) -> Optional[Tuple[bytes, float]]:
+        try:
+            connection = self._connect()
+            try:
+                row = connection.execute(
+                    f"SELECT data, stored_at FROM {self.table} WHERE key = ?",
+                    (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                connection.execute(
+                    f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?",
+                    (time.time(), key)
+                )
+            finally:
+                connection.close()
+            return bytes(row[0]), row[1]
+        except Exception as e:
+            return None
+
+    def put(self, key: str, data: bytes) -> None:
+        now = time.time()
+        try:
+            connection = self._connect()
+            try:
+                connection.execute("BEGIN IMMEDIATE")
+                connection.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, data, size, stored_at, accessed_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (key, data, len(data), now, now)
+                )
+                self._evict(connection, key)
+                connection.execute("COMMIT")
+            except Exception as e:
+                connection.execute("ROLLBACK")
+                raise
+            finally:
+                connection.close()
+        except Exception as e:
+            pass
+
+    def delete(self, key: str) -> None:
+        try:
+            connection = self._connect()
+            try:
+                connection.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            finally:
+                connection.close()
+        except Exception as e:
+            pass
+
+    def _evict(self, connection: sqlite3.Connection, keep_key: str) -> None:
+        total = connection.execute(
+            f"SELECT COALESCE(SUM(size), 0) FROM {self.table}"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        expired_keys = []
+        for key, size in connection.execute(
+                f"SELECT key, size FROM {self.table} WHERE key != ? ORDER BY accessed_at",
+                (keep_key,)
+        ):
+            if total <= self.max_bytes:
+                break
+            expired_keys.append((key,))
+            total -= size
+        connection.executemany(f"DELETE FROM {self.table} WHERE key = ?", expired_keys)
+
+    def clear(self) -> None:
+        try:
+            connection = self._connect()
+            try:
+                connection.execute(f"DELETE FROM {self.table}")
+            finally:
+                connection.close()
+        except Exception as e:
+            pass
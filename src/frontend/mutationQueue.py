@@ -0,0 +1,110 @@
+import json
+import os
+
+from typing import Dict, List, Optional, Tuple
+
+
+class MutationQueue:
+    DEFAULT_MAX_ATTEMPTS = 3
+
+    def __init__(self, path: str, max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.owner = None
+        self.pending = {}
+        self.in_flight = {}
+        self.batch = 0
+
+    def __len__(self) -> int:
+        return len(self.pending) + len(self.in_flight)
+
+    def load(self, owner) -> None:
+        self.owner = owner
+        self.pending = {}
+        self.in_flight = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("owner") != owner:
+                return
+            for entry in data.get("pending", []):
+                book_key = entry["book"].get("key")
+                if book_key:
+                    self.pending[book_key] = entry
+        except Exception as e:
+            pass
+
+    def save(self) -> None:
+        entries = list(self.in_flight.values()) + list(self.pending.values())
+        try:
+            if not entries:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+                return
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"owner": self.owner, "pending": entries}, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            pass
+
+    def enqueue(self, book: dict, added: bool) -> None:
+        book_key = book.get('key')
+        if not book_key:
+            return
+
+        entry = self.pending.get(book_key)
+        if entry is not None and entry["added"] != added:
+            del self.pending[book_key]
+        else:
+            self.pending[book_key] = {"added": added, "book": book, "attempts": 0}
+        self.save()
+
+    def take(self, limit: Optional[int] = None) -> Tuple[List[dict], List[dict]]:
+        if self.in_flight or not self.pending:
+            return [], []
+
+        keys = list(self.pending)[:limit]
+        for book_key in keys:
+            self.in_flight[book_key] = self.pending.pop(book_key)
+        self.batch += 1
+
+        added = [entry["book"] for entry in self.in_flight.values() if entry["added"]]
+        removed = [entry["book"] for entry in self.in_flight.values() if not entry["added"]]
+        return added, removed
+
+    def complete(self) -> None:
+        self.in_flight.clear()
+        self.save()
+
+    def fail(self) -> List[dict]:
+        dropped = []
+        for book_key, entry in self.in_flight.items():
+            newer = self.pending.get(book_key)
+            if newer is not None:
+                if newer["added"] != entry["added"]:
+                    del self.pending[book_key]
+                continue
+
+            entry["attempts"] += 1
+            if entry["attempts"] >= self.max_attempts:
+                dropped.append(entry)
+            else:
+                self.pending[book_key] = entry
+        self.in_flight.clear()
+        self.save()
+        return dropped
+
+    def detach(self) -> None:
+        self.pending = {**self.in_flight, **self.pending}
+        self.in_flight = {}
+        self.save()
+        self.owner = None
+        self.pending = {}
+
+    def effective(self) -> Dict[str, Tuple[bool, dict]]:
+        result = {}
+        for entries in (self.in_flight, self.pending):
+            for book_key, entry in entries.items():
+                result[book_key] = (entry["added"], entry["book"])
+        return result
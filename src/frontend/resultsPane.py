@@ -0,0 +1,252 @@
+from textual.app import ComposeResult
+from textual.containers import VerticalScroll
+from textual.message import Message
+from textual.widget import Widget
+from typing import Callable, Dict, List, Optional
+from booksContainer import BookContainer
+
+
+class ResultsPane(VerticalScroll):
+    ROW_HEIGHT = 13
+    OVERSCAN = 2
+    DEFAULT_VISIBLE_ROWS = 4
+
+    DEFAULT_CSS = """
+    ResultsPane > .results-spacer {
+        width: 100%;
+        height: 0;
+        margin: 0;
+        padding: 0;
+    }
+    """
+
+    class NearEnd(Message):
+        pass
+
+    def __init__(
+            self,
+            add_to_lib: Optional[Callable[[dict], None]] = None,
+            rem_in_lib: Optional[Callable[[dict], None]] = None,
+            focus_handler: Optional[Callable] = None,
+            cover_handler: Optional[Callable[[int], Optional[object]]] = None,
+            rows: Optional[List[BookContainer]] = None,
+            near_end_margin: int = 26,
+            *args, **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        self.add_to_lib = add_to_lib
+        self.rem_in_lib = rem_in_lib
+        self.focus_handler = focus_handler
+        self.cover_handler = cover_handler
+        self.rows = rows if rows is not None else []
+        self.near_end_margin = near_end_margin
+
+        self.books = []
+        self.added = []
+        self.book_indexes = {}
+        self.selected = {}
+        self.first_index = 0
+        self.focused_index = None
+
+        self.top_spacer = Widget(classes="results-spacer")
+        self.bottom_spacer = Widget(classes="results-spacer")
+
+    def compose(self) -> ComposeResult:
+        yield self.top_spacer
+        yield self.bottom_spacer
+
+    def set_books(self, books: list, added: List[bool]) -> None:
+        self.books = list(books)
+        self.added = list(added)
+        self.book_indexes = {}
+        self._index_books(0)
+        self.focused_index = None
+        self.first_index = 0
+        self.scroll_to(y=0, animate=False, immediate=True)
+        self.refresh_window(force=True)
+
+    def append_books(self, books: list, added: List[bool]) -> None:
+        start = len(self.books)
+        self.books.extend(books)
+        self.added.extend(added)
+        self._index_books(start)
+        self.refresh_window(force=True)
+
+    def _index_books(self, start: int) -> None:
+        for index in range(start, len(self.books)):
+            book_key = self.books[index].get('key')
+            if book_key:
+                self.book_indexes.setdefault(book_key, []).append(index)
+
+    def visible_rows(self) -> int:
+        height = self.size.height or self.DEFAULT_VISIBLE_ROWS * self.ROW_HEIGHT
+        return -(-height // self.ROW_HEIGHT) + 1
+
+    def window(self) -> range:
+        first = max(0, int(self.scroll_y) // self.ROW_HEIGHT - self.OVERSCAN)
+        last = min(len(self.books), first + self.visible_rows() + 2 * self.OVERSCAN)
+        first = max(0, min(first, last - self.visible_rows() - 2 * self.OVERSCAN))
+        return range(first, last)
+
+    def refresh_window(self, force: bool = False) -> None:
+        window = self.window()
+        if not force and window.start == self.first_index and len(window) == len(self.rows):
+            return
+
+        focus_on_rows = self.screen.focused in self.rows if self.is_attached else False
+        self.first_index = window.start
+        self._resize_pool(len(window))
+
+        self._reconcile_rows(window)
+
+        self.top_spacer.styles.height = window.start * self.ROW_HEIGHT
+        self.bottom_spacer.styles.height = (len(self.books) - window.stop) * self.ROW_HEIGHT
+
+        if focus_on_rows:
+            row = self.row_for_index(self.focused_index)
+            if row is not None:
+                row.focus(scroll_visible=False)
+            else:
+                self.focus(scroll_visible=False)
+
+    def _resize_pool(self, size: int) -> None:
+        while len(self.rows) < size:
+            row = BookContainer(
+                {},
+                add_to_lib=self.add_to_lib,
+                rem_in_lib=self.rem_in_lib,
+                show_cover=self.cover_handler is not None
+            )
+            row.set_focus_handler(self._on_row_focused)
+            row.set_status_handler(self._on_row_status_changed)
+            row.set_selection_handler(self._on_row_selection_changed)
+            self.rows.append(row)
+            self.mount(row, before=self.bottom_spacer)
+        while len(self.rows) > size:
+            self.rows.pop().remove()
+
+    def _reconcile_rows(self, window: range) -> None:
+        rows_by_key = {}
+        for row in self.rows:
+            key = row.book.get('key') if row.book else None
+            if key and key not in rows_by_key:
+                rows_by_key[key] = row
+
+        ordered = []
+        for index in window:
+            ordered.append(rows_by_key.pop(self.books[index].get('key'), None))
+
+        kept = set(id(row) for row in ordered if row is not None)
+        spare = [row for row in self.rows if id(row) not in kept]
+        ordered = [row if row is not None else spare.pop(0) for row in ordered]
+
+        if ordered != self.rows:
+            for row in ordered:
+                self.move_child(row, before=self.bottom_spacer)
+            self.rows[:] = ordered
+
+        for row, index in zip(self.rows, window):
+            row.bind(self.books[index], self.added[index], index, self.is_selected(self.books[index]))
+            if self.cover_handler is not None and row.cover is None:
+                cover_i = row.book.get('cover_i')
+                if cover_i:
+                    row.set_cover(self.cover_handler(cover_i))
+
+    def set_cover(self, cover_i: int, cover) -> None:
+        for row in self.rows:
+            if row.book.get('cover_i') == cover_i:
+                row.set_cover(cover)
+
+    def set_added(self, key: Optional[str], added: bool) -> None:
+        if not key:
+            return
+        for index in self.book_indexes.get(key, ()):
+            if self.added[index] == added:
+                continue
+            self.added[index] = added
+            row = self.row_for_index(index)
+            if row is not None:
+                book = self.books[index]
+                row.bind(book, added, index, self.is_selected(book))
+
+    def update_membership(self, changes: Dict[str, bool]) -> None:
+        for key, added in changes.items():
+            self.set_added(key, added)
+
+    def is_selected(self, book: dict) -> bool:
+        return book.get('key') in self.selected
+
+    def take_selection(self) -> List[dict]:
+        books = list(self.selected.values())
+        self.selected.clear()
+        for row in self.rows:
+            if row.index is not None and row.index < len(self.books):
+                row.bind(row.book, row.is_added, row.index, False)
+        return books
+
+    def row_for_index(self, index: Optional[int]) -> Optional[BookContainer]:
+        if index is None:
+            return None
+        offset = index - self.first_index
+        if 0 <= offset < len(self.rows):
+            return self.rows[offset]
+        return None
+
+    def _on_row_focused(self, row: BookContainer) -> None:
+        self.focused_index = row.index
+        if self.focus_handler:
+            self.focus_handler(row)
+
+    def _on_row_status_changed(self, row: BookContainer) -> None:
+        if row.index is not None and row.index < len(self.added):
+            self.added[row.index] = row.is_added
+
+    def _on_row_selection_changed(self, row: BookContainer) -> None:
+        book_key = row.book.get('key')
+        if not book_key:
+            return
+        if row.is_selected:
+            self.selected[book_key] = row.book
+        else:
+            self.selected.pop(book_key, None)
+
+    def scroll_to_index(self, index: int) -> None:
+        top = index * self.ROW_HEIGHT
+        bottom = top + self.ROW_HEIGHT
+        if top < self.scroll_y:
+            self.scroll_to(y=top, animate=False, immediate=True)
+        elif bottom > self.scroll_y + self.size.height:
+            self.scroll_to(y=bottom - self.size.height, animate=False, immediate=True)
+
+    def focus_index(self, index: int) -> None:
+        if not self.books:
+            return
+        self.focused_index = index
+        self.scroll_to_index(index)
+        self.refresh_window()
+        row = self.row_for_index(index)
+        if row is not None:
+            row.focus(scroll_visible=False)
+
+    def focus_step(self, step: int, focus_on_rows: bool) -> None:
+        if not self.books:
+            return
+        if not focus_on_rows or self.focused_index is None:
+            if self.focused_index is not None and self.focused_index < len(self.books):
+                self.focus_index(self.focused_index)
+            else:
+                self.focus_index(0)
+        else:
+            self.focus_index((self.focused_index + step) % len(self.books))
+
+    def is_near_end(self) -> bool:
+        return self.scroll_y >= self.max_scroll_y - self.near_end_margin
+
+    def on_resize(self) -> None:
+        self.refresh_window()
+
+    def watch_scroll_y(self, old_value: float, new_value: float) -> None:
+        super().watch_scroll_y(old_value, new_value)
+        self.refresh_window()
+        if new_value > old_value and self.is_near_end():
+            self.post_message(self.NearEnd())
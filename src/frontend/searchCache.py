@@ -0,0 +1,72 @@
+import json
+import time
+import zlib
+
+from typing import Any, Optional, Sequence, Tuple
+
+from lruStore import LruStore
+
+
+class SearchCache:
+    DEFAULT_TTL = 60 * 60
+    DEFAULT_STALE_TTL = 60 * 60 * 24 * 7
+    DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+    def __init__(
+            self,
+            path: str,
+            ttl: float = DEFAULT_TTL,
+            stale_ttl: float = DEFAULT_STALE_TTL,
+            max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.store = LruStore(path, "search_cache", max_bytes)
+
+    @staticmethod
+    def make_key(query: str, page: int = 1, fields: Sequence[str] = (), page_size: int = 0) -> str:
+        normalized = " ".join(query.lower().split())
+        return f"{normalized}|{page}|{page_size}|{','.join(sorted(fields))}"
+
+    def get(
+            self,
+            query: str,
+            page: int = 1,
+            fields: Sequence[str] = (),
+            page_size: int = 0
+    ) -> Optional[Tuple[Any, bool]]:
+        key = self.make_key(query, page, fields, page_size)
+        row = self.store.get(key)
+        if row is None:
+            return None
+
+        data, stored_at = row
+        age = time.time() - stored_at
+        if age >= self.stale_ttl:
+            self.store.delete(key)
+            return None
+        try:
+            value = json.loads(zlib.decompress(data).decode("utf-8"))
+        except Exception as e:
+            return None
+        return value, age < self.ttl
+
+    def put(
+            self,
+            query: str,
+            value: Any,
+            page: int = 1,
+            fields: Sequence[str] = (),
+            page_size: int = 0
+    ) -> None:
+        key = self.make_key(query, page, fields, page_size)
+        try:
+            data = zlib.compress(
+                json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            )
+        except Exception as e:
+            return
+        self.store.put(key, data)
+
+    def clear(self) -> None:
+        self.store.clear()
@@ -0,0 +1,58 @@
+import json
+import os
+
+from typing import Optional
+
+
+class SessionSnapshot:
+    DEFAULT_MAX_BOOKS = 100
+    VERSION = 1
+
+    def __init__(self, path: str, max_books: int = DEFAULT_MAX_BOOKS):
+        self.path = path
+        self.max_books = max_books
+
+    def load(self) -> Optional[dict]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != self.VERSION:
+                return None
+            return data
+        except Exception as e:
+            return None
+
+    def save(
+            self,
+            username: Optional[str],
+            userid,
+            source: str,
+            query: str,
+            books: list,
+            library_keys: list,
+            books_count: int
+    ) -> None:
+        data = {
+            "version": self.VERSION,
+            "username": username,
+            "userid": userid,
+            "source": source,
+            "query": query,
+            "books": books[:self.max_books],
+            "library_keys": library_keys,
+            "books_count": books_count
+        }
+        try:
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            pass
+
+    def clear(self) -> None:
+        try:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+        except Exception as e:
+            pass
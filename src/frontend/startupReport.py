@@ -0,0 +1,99 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from typing import List, Optional, Tuple
+
+
+def parse_import_times(output: str) -> List[Tuple[str, int, int]]:
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us = int(parts[0])
+            cumulative_us = int(parts[1])
+        except ValueError:
+            continue
+        rows.append((parts[2].strip(), self_us, cumulative_us))
+    return rows
+
+
+def measure_imports(module: str = "LibApp") -> List[Tuple[str, int, int]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True
+    )
+    return parse_import_times(result.stderr)
+
+
+def measure_first_frame(size: Tuple[int, int] = (120, 40)) -> Tuple[float, float]:
+    started = time.perf_counter()
+    from LibApp import LibApp
+    imported = time.perf_counter()
+
+    first_frame = []
+
+    async def record_first_frame(pilot) -> None:
+        first_frame.append(time.perf_counter())
+        pilot.app.exit()
+
+    class StartupReportApp(LibApp):
+
+        def warm_up_clients(self) -> None:
+            pass
+
+        def has_saved_user(self) -> bool:
+            return False
+
+        def save_snapshot(self) -> None:
+            pass
+
+        def flush_mutations_now(self) -> None:
+            pass
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            app = StartupReportApp()
+            app.run(headless=True, size=size, auto_pilot=record_first_frame)
+        finally:
+            os.chdir(cwd)
+    return imported - started, first_frame[0] - started
+
+
+def format_report(imports: List[Tuple[str, int, int]], import_time: float, first_frame: float, top: int) -> str:
+    lines = [
+        f"Импорт LibApp: {import_time * 1000:.0f} мс",
+        f"Первый кадр: {first_frame * 1000:.0f} мс",
+        "",
+        "Самые долгие импорты (суммарно, мс):",
+    ]
+    for name, self_us, cumulative_us in sorted(imports, key=lambda row: row[2], reverse=True)[:top]:
+        lines.append(f"{cumulative_us / 1000:8.1f}  {self_us / 1000:7.1f}  {name}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Время импорта и время до первого кадра LibApp")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args(argv)
+
+    imports = measure_imports()
+    import_time, first_frame = measure_first_frame()
+    print(format_report(imports, import_time, first_frame, args.top))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,6 +5,17 @@ pytest . \
     --cov=inputSection \
     --cov=userContainer \
     --cov=ScreenPop \
-    --cov=LibApp
+    --cov=LibApp \
+    --cov=backendClient \
+    --cov=searchCache \
+    --cov=resultsPane \
+    --cov=libraryIndex \
+    --cov=mutationQueue \
+    --cov=bookRecords \
+    --cov=libraryImport \
+    --cov=coverCache \
+    --cov=coverLoader \
+    --cov=startupReport \
+    --cov=sessionSnapshot
 
 find . -type d -name "__pycache__" -exec rm -rf {} + 2>/dev/null
@@ -129,42 +129,74 @@ class TestLoginFormMethods:
             call_arg = message_widget.update.call_args[0][0]
             assert "заполните все поля" in call_arg.lower()
     
-    def test_login_with_callback_success(self):
+    def test_login_runs_callback_in_worker(self):
         callback = Mock(return_value=True)
         form = LoginForm(on_login=callback)
         form.username = "user"
         form.password = "pass123"
         
+        with patch.object(form, 'query_one'), patch.object(form, 'run_worker') as mock_run_worker:
+            form.login()
+            
+            assert form.pending is True
+            callback.assert_not_called()
+            assert mock_run_worker.call_args[1]['thread'] is True
+            
+            with patch.object(form, 'post_message') as mock_post:
+                mock_run_worker.call_args[0][0]()
+            
+            callback.assert_called_once_with("user", "pass123")
+            message = mock_post.call_args[0][0]
+            assert isinstance(message, LoginForm.Finished)
+            assert (message.action, message.username, message.password, message.success) == ("login", "user", "pass123", True)
+    
+    def test_submit_ignored_while_pending(self):
+        form = LoginForm(on_login=Mock())
+        form.username = "user"
+        form.password = "pass123"
+        form.pending = True
+        
+        with patch.object(form, 'query_one'), patch.object(form, 'run_worker') as mock_run_worker:
+            form.login()
+            
+            mock_run_worker.assert_not_called()
+    
+    def test_callback_error_is_failure(self):
+        form = LoginForm()
+        
+        with patch.object(form, 'post_message') as mock_post:
+            form._submit_task("login", Mock(side_effect=OSError("offline")), "user", "pass123")
+            
+            assert mock_post.call_args[0][0].success is False
+    
+    def test_login_finished_success(self):
+        form = LoginForm()
+        form.pending = True
+        
         with patch.object(form, 'query_one') as mock_query:
             message_widget = Mock()
             mock_query.return_value = message_widget
             
             mock_app = Mock()
-            mock_app.update_user_info_display = Mock()
-            mock_app.save_config = Mock()
-            mock_app.showMainContainer = Mock()
             
             with patch.object(LoginForm, 'app', new_callable=PropertyMock) as mock_app_prop:
                 mock_app_prop.return_value = mock_app
                 
-                with patch.object(form, 'close_popup'):
-                    form.login()
-                    
-                    callback.assert_called_once_with("user", "pass123")
+                with patch.object(form, 'close_popup') as mock_close:
+                    form.on_login_form_finished(LoginForm.Finished("login", "user", "pass123", True))
                     
-                    assert message_widget.update.called
+                    assert form.pending is False
                     call_arg = message_widget.update.call_args[0][0]
                     assert "успешный вход" in call_arg.lower()
                     
+                    mock_close.assert_called_once()
                     mock_app.update_user_info_display.assert_called_once()
                     mock_app.save_config.assert_called_once_with("user", "pass123")
                     mock_app.showMainContainer.assert_called_once()
     
-    def test_login_with_callback_failure(self):
-        callback = Mock(return_value=False)
-        form = LoginForm(on_login=callback)
-        form.username = "user"
-        form.password = "wrong"
+    def test_login_finished_failure(self):
+        form = LoginForm()
+        form.pending = True
         
         with patch.object(form, 'query_one') as mock_query:
             message_widget = Mock()
@@ -175,14 +207,14 @@ class TestLoginFormMethods:
             with patch.object(LoginForm, 'app', new_callable=PropertyMock) as mock_app_prop:
                 mock_app_prop.return_value = mock_app
                 
-                form.login()
+                form.on_login_form_finished(LoginForm.Finished("login", "user", "wrong", False))
                 
-                callback.assert_called_once_with("user", "wrong")
-                assert message_widget.update.called
+                assert form.pending is False
                 call_arg = message_widget.update.call_args[0][0]
-                assert "неверное" in call_arg.lower() or "ошибка" in call_arg.lower()
+                assert "неверное" in call_arg.lower()
+                mock_app.save_config.assert_not_called()
     
-    def test_register_success(self):
+    def test_register_runs_callback_in_worker(self):
         callback = Mock(return_value=True)
         form = LoginForm(on_register=callback)
         form.username = "newuser"
@@ -190,47 +222,44 @@ class TestLoginFormMethods:
         form.username_valid = True
         form.password_valid = True
         
+        with patch.object(form, 'query_one'), patch.object(form, 'run_worker') as mock_run_worker:
+            form.register()
+            
+            with patch.object(form, 'post_message') as mock_post:
+                mock_run_worker.call_args[0][0]()
+            
+            callback.assert_called_once_with("newuser", "newpass")
+            assert mock_post.call_args[0][0].action == "register"
+    
+    def test_register_finished_success(self):
+        form = LoginForm()
+        
         with patch.object(form, 'query_one') as mock_query:
             message_widget = Mock()
             mock_query.return_value = message_widget
             
             mock_app = Mock()
-            mock_app.update_user_info_display = Mock()
-            mock_app.save_config = Mock()
-            mock_app.showMainContainer = Mock()
             
             with patch.object(LoginForm, 'app', new_callable=PropertyMock) as mock_app_prop:
                 mock_app_prop.return_value = mock_app
                 
                 with patch.object(form, 'close_popup'):
-                    form.register()
+                    form.on_login_form_finished(LoginForm.Finished("register", "newuser", "newpass", True))
                     
-                    callback.assert_called_once_with("newuser", "newpass")
-                    assert message_widget.update.called
                     call_arg = message_widget.update.call_args[0][0]
                     assert "аккаунт успешно создан" in call_arg.lower()
+                    mock_app.save_config.assert_called_once_with("newuser", "newpass")
     
-    def test_register_failed(self):
-        callback = Mock(return_value=False)
-        form = LoginForm(on_register=callback)
-        form.username = "user"
-        form.password = "pass"
-        form.username_valid = True
-        form.password_valid = True
+    def test_register_finished_failure(self):
+        form = LoginForm()
         
         with patch.object(form, 'query_one') as mock_query:
             message_widget = Mock()
             mock_query.return_value = message_widget
             
-            mock_app = Mock()
-            
-            with patch.object(LoginForm, 'app', new_callable=PropertyMock) as mock_app_prop:
-                mock_app_prop.return_value = mock_app
-                
-                form.register()
+            with patch.object(LoginForm, 'app', new_callable=PropertyMock):
+                form.on_login_form_finished(LoginForm.Finished("register", "user", "pass", False))
                 
-                callback.assert_called_once_with("user", "pass")
-                assert message_widget.update.called
                 call_arg = message_widget.update.call_args[0][0]
                 assert "ошибка при регистрации" in call_arg.lower()
     
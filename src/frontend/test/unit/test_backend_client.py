@@ -0,0 +1,173 @@
+import pytest
+from unittest.mock import Mock, patch
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+try:
+    from backendClient import BackendClient, CancelToken, RequestCancelled
+except ImportError as e:
+    print(f"Ошибка импорта: {e}")
+    raise
+
+
+class TestBackendClientInitialization:
+
+    def test_client_init_defaults(self):
+        client = BackendClient("http://localhost:8080/")
+
+        assert client.base_url == "http://localhost:8080"
+        assert client.pool_size == BackendClient.DEFAULT_POOL_SIZE
+        assert client.default_timeout == BackendClient.DEFAULT_TIMEOUT
+        assert client.timeouts == {}
+
+    def test_client_pool_size(self):
+        client = BackendClient("http://localhost:8080", pool_size=8)
+
+        adapter = client.session.get_adapter("http://localhost:8080/lib")
+        assert adapter._pool_maxsize == 8
+        assert client.session.get_adapter("https://example.org") is adapter
+
+    def test_session_created_on_first_use(self):
+        client = BackendClient("http://localhost:8080")
+
+        assert client._session is None
+        session = client.session
+        assert client.session is session
+
+    def test_close_without_session(self):
+        client = BackendClient("http://localhost:8080")
+
+        client.close()
+
+        assert client._session is None
+
+    def test_timeout_for_endpoint(self):
+        client = BackendClient(
+            "http://localhost:8080",
+            timeouts={"/login": 3},
+            default_timeout=7
+        )
+
+        assert client.timeout_for("/login") == 3
+        assert client.timeout_for("/lib") == 7
+
+
+class TestBackendClientRequests:
+
+    def test_post_uses_session(self):
+        client = BackendClient("http://localhost:8080", timeouts={"/lib": 4})
+
+        with patch.object(client.session, 'post') as mock_post:
+            client.post("/lib", {"query": ""})
+
+            mock_post.assert_called_once_with(
+                "http://localhost:8080/lib",
+                json={"query": ""},
+                headers=None,
+                timeout=4
+            )
+
+    def test_post_passes_headers(self):
+        client = BackendClient("http://localhost:8080")
+
+        with patch.object(client.session, 'post') as mock_post:
+            client.post("/lib", {"query": ""}, headers={"If-None-Match": "tag"})
+
+            assert mock_post.call_args[1]['headers'] == {"If-None-Match": "tag"}
+
+    def test_get_uses_session(self):
+        client = BackendClient("http://openlibrary.org", timeouts={"/search.json": 15})
+
+        with patch.object(client.session, 'get') as mock_get:
+            client.get("/search.json", params={"q": "dune"})
+
+            mock_get.assert_called_once_with(
+                "http://openlibrary.org/search.json",
+                params={"q": "dune"},
+                timeout=15
+            )
+
+    def test_get_with_cancel_token_streams(self):
+        client = BackendClient("http://openlibrary.org", timeouts={"/search.json": 15})
+        token = CancelToken()
+
+        with patch.object(client.session, 'get') as mock_get:
+            response = client.get("/search.json", params={"q": "dune"}, cancel_token=token)
+
+            mock_get.assert_called_once_with(
+                "http://openlibrary.org/search.json",
+                timeout=15,
+                stream=True,
+                params={"q": "dune"}
+            )
+            assert response is mock_get.return_value
+            assert token.responses == [response]
+
+    def test_cancelled_token_skips_request(self):
+        client = BackendClient("http://localhost:8080")
+        token = CancelToken()
+        token.cancel()
+
+        with patch.object(client.session, 'post') as mock_post:
+            with pytest.raises(RequestCancelled):
+                client.post("/lib", {"query": ""}, cancel_token=token)
+
+            mock_post.assert_not_called()
+
+    def test_cancel_closes_attached_response(self):
+        token = CancelToken()
+        response = Mock()
+
+        token.attach(response)
+        token.cancel()
+
+        assert token.cancelled is True
+        response.close.assert_called_once()
+
+    def test_cancel_during_body_read(self):
+        client = BackendClient("http://localhost:8080")
+        token = CancelToken()
+        response = Mock()
+
+        def read_body(*args, **kwargs):
+            token.cancel()
+            return response
+
+        with patch.object(client.session, 'post', side_effect=read_body):
+            with pytest.raises(RequestCancelled):
+                client.post("/lib", {"query": ""}, cancel_token=token)
+
+    def test_warm_up_ignores_errors(self):
+        client = BackendClient("http://localhost:8080")
+
+        with patch.object(client.session, 'head') as mock_head:
+            mock_head.side_effect = Exception("Connection refused")
+
+            client.warm_up(("/", "/lib"))
+
+            assert mock_head.call_count == 2
+
+    def test_warm_up_async(self):
+        client = BackendClient("http://localhost:8080")
+
+        with patch.object(client, 'warm_up') as mock_warm_up:
+            thread = client.warm_up_async(["/"])
+            thread.join(timeout=1)
+
+            mock_warm_up.assert_called_once_with(("/",))
+            assert thread.daemon is True
+
+    def test_close(self):
+        client = BackendClient("http://localhost:8080")
+
+        with patch.object(client.session, 'close') as mock_close:
+            client.close()
+
+            mock_close.assert_called_once()
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,49 @@
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+try:
+    from bookRecords import SEARCH_FIELDS, normalize_book, make_book, library_entry, is_complete_book
+except ImportError as e:
+    print(f"Ошибка импорта: {e}")
+    raise
+
+
+DOC = {
+    'key': '/works/OL1W',
+    'title': 'Book',
+    'author_name': ['Author'],
+    'first_publish_year': 2000,
+    'cover_i': 42,
+    'language': ['eng']
+}
+
+
+class TestBookRecords:
+
+    def test_normalize_book_drops_extra_fields(self):
+        doc = normalize_book(dict(DOC, ratings_count=10))
+
+        assert set(doc) == set(SEARCH_FIELDS)
+
+    def test_make_book_defaults(self):
+        book = make_book({})
+
+        assert book['title'] == 'Без названия'
+        assert book['author'] == ['Неизвестен']
+        assert book['key'] == ''
+
+    def test_library_entry_round_trip(self):
+        entry = library_entry(make_book(DOC))
+
+        assert entry == DOC
+
+    def test_is_complete_book(self):
+        assert is_complete_book(DOC)
+        assert not is_complete_book(dict(DOC, cover_i=None))
+        assert not is_complete_book({'key': '/works/OL1W'})
+        assert not is_complete_book(dict(DOC, first_publish_year='Неизвестен'))
+        assert not is_complete_book(dict(DOC, first_publish_year=40000))
+        assert not is_complete_book(dict(DOC, language=''))
@@ -7,6 +7,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../.
 
 try:
     from booksContainer import BookContainer
+    from rich.text import Text
 except ImportError as e:
     print(f"Ошибка импорта: {e}")
     raise
@@ -65,9 +66,9 @@ class TestBookContainerInitialization:
         assert '.book-status_added' in BookContainer.DEFAULT_CSS
 
 
-class TestBookContainerComposition:
+class TestBookContainerContent:
     
-    def test_compose_not_added(self):
+    def test_content_not_added(self):
         mock_book = {'title': 'Test', 'author': 'Author', 'year': '2023'}
         mock_add = Mock()
         mock_remove = Mock()
@@ -79,13 +80,10 @@ class TestBookContainerComposition:
             is_added=False
         )
         
-        compose_result = container.compose()
-        
-        assert compose_result is not None
-        
+        assert container.status_text() == "Статус: Не добавлена"
         assert container.is_added is False
     
-    def test_compose_added(self):
+    def test_content_added(self):
         mock_book = {'title': 'Test', 'author': 'Author', 'year': '2023'}
         mock_add = Mock()
         mock_remove = Mock()
@@ -97,11 +95,23 @@ class TestBookContainerComposition:
             is_added=True
         )
         
-        compose_result = container.compose()
-        
-        assert compose_result is not None
-        
+        assert container.status_text() == "Статус: Добавлена в библиотеку"
         assert container.is_added is True
+    
+    def test_body_lines(self):
+        book = {'title': 'Dune', 'author': ['Frank Herbert'], 'year': 1965}
+        container = BookContainer(book=book, add_to_lib=Mock(), rem_in_lib=Mock())
+        
+        assert container.body_lines() == [
+            ('Dune', 'book-title'),
+            ('Автор: Frank Herbert', 'book-author'),
+            ('Год: 1965', 'book-year'),
+        ]
+    
+    def test_component_classes(self):
+        assert 'book-title' in BookContainer.COMPONENT_CLASSES
+        assert 'book-status_added' in BookContainer.COMPONENT_CLASSES
+        assert 'book-status_notAdded' in BookContainer.COMPONENT_CLASSES
 
 
 class TestBookContainerFocusHandling:
@@ -174,24 +184,18 @@ class TestBookContainerKeyHandling:
             is_added=False
         )
         
-        mock_status_widget = Mock()
-        
         mock_event = Mock()
         mock_event.key = "enter"
         mock_event.stop = Mock()
         
-        with patch.object(container, 'query_one') as mock_query:
-            mock_query.return_value = mock_status_widget
-            
+        with patch.object(container, 'refresh') as mock_refresh:
             result = container.on_key(mock_event)
             
             assert result is False
             
             assert container.is_added is True
-            
-            mock_status_widget.update.assert_called_once_with("Статус: Добавлена в библиотеку")
-            mock_status_widget.remove_class.assert_called_once_with("book-status_notAdded")
-            mock_status_widget.add_class.assert_called_once_with("book-status_added")
+            assert container.status_text() == "Статус: Добавлена в библиотеку"
+            mock_refresh.assert_called_once()
             
             mock_add.assert_called_once_with(mock_book)
             mock_remove.assert_not_called()
@@ -210,24 +214,18 @@ class TestBookContainerKeyHandling:
             is_added=True
         )
         
-        mock_status_widget = Mock()
-        
         mock_event = Mock()
         mock_event.key = "enter"
         mock_event.stop = Mock()
         
-        with patch.object(container, 'query_one') as mock_query:
-            mock_query.return_value = mock_status_widget
-            
+        with patch.object(container, 'refresh') as mock_refresh:
             result = container.on_key(mock_event)
             
             assert result is False
             
             assert container.is_added is False
-            
-            mock_status_widget.update.assert_called_once_with("Статус: Не добавлена")
-            mock_status_widget.remove_class.assert_called_once_with("book-status_added")
-            mock_status_widget.add_class.assert_called_once_with("book-status_notAdded")
+            assert container.status_text() == "Статус: Не добавлена"
+            mock_refresh.assert_called_once()
             
             mock_remove.assert_called_once_with(mock_book)
             mock_add.assert_not_called()
@@ -247,7 +245,7 @@ class TestBookContainerKeyHandling:
         )
         
         mock_event = Mock()
-        mock_event.key = "space"
+        mock_event.key = "a"
         mock_event.stop = Mock()
         
         result = container.on_key(mock_event)
@@ -257,6 +255,38 @@ class TestBookContainerKeyHandling:
         mock_event.stop.assert_not_called()
 
 
+class TestBookContainerSelection:
+    
+    def test_on_key_space_toggles_selection(self):
+        container = BookContainer(book={'key': 'k'}, add_to_lib=Mock(), rem_in_lib=Mock())
+        mock_handler = Mock()
+        container.set_selection_handler(mock_handler)
+        
+        mock_event = Mock()
+        mock_event.key = "space"
+        
+        container.on_key(mock_event)
+        
+        assert container.is_selected is True
+        assert container.has_class("book-selected")
+        mock_handler.assert_called_once_with(container)
+        mock_event.stop.assert_called_once()
+        
+        container.on_key(mock_event)
+        
+        assert container.is_selected is False
+        assert not container.has_class("book-selected")
+    
+    def test_bind_applies_selection(self):
+        book = {'key': 'k'}
+        container = BookContainer(book=book, add_to_lib=Mock(), rem_in_lib=Mock())
+        
+        container.bind(book, False, 0, True)
+        
+        assert container.is_selected is True
+        assert container.has_class("book-selected")
+
+
 class TestBookContainerSaveHandling:
     
     def test_handle_save_add_book(self):
@@ -271,22 +301,44 @@ class TestBookContainerSaveHandling:
             is_added=False
         )
         
-        mock_status_widget = Mock()
+        container._body = Mock()
+        container._status = Mock()
+        body = container._body
         
-        with patch.object(container, 'query_one') as mock_query:
-            mock_query.return_value = mock_status_widget
-            
+        with patch.object(container, 'refresh') as mock_refresh:
             container._handle_save()
             
             assert container.is_added is True
             
-            mock_status_widget.update.assert_called_once_with("Статус: Добавлена в библиотеку")
-            mock_status_widget.remove_class.assert_called_once_with("book-status_notAdded")
-            mock_status_widget.add_class.assert_called_once_with("book-status_added")
+            assert container._status is None
+            assert container._body is body
+            region = mock_refresh.call_args[0][0]
+            assert region.y == BookContainer.STATUS_LINE
+            assert region.height == 1
             
             mock_add.assert_called_once_with(mock_book)
             mock_remove.assert_not_called()
     
+    def test_handle_save_reverts_rejected_add(self):
+        mock_book = {'title': 'Test', 'author': 'Author', 'year': '2023'}
+        mock_add = Mock(return_value=False)
+        status_handler = Mock()
+        
+        container = BookContainer(
+            book=mock_book,
+            add_to_lib=mock_add,
+            rem_in_lib=Mock(),
+            is_added=False
+        )
+        container.set_status_handler(status_handler)
+        
+        with patch.object(container, '_update_status'):
+            container._handle_save()
+            
+            assert container.is_added is False
+            mock_add.assert_called_once_with(mock_book)
+            status_handler.assert_not_called()
+    
     def test_handle_save_remove_book(self):
         mock_book = {'title': 'Test', 'author': 'Author', 'year': '2023'}
         mock_add = Mock()
@@ -299,23 +351,138 @@ class TestBookContainerSaveHandling:
             is_added=True
         )
         
-        mock_status_widget = Mock()
+        container._body = Mock()
+        container._status = Mock()
+        body = container._body
         
-        with patch.object(container, 'query_one') as mock_query:
-            mock_query.return_value = mock_status_widget
-            
+        with patch.object(container, 'refresh') as mock_refresh:
             container._handle_save()
             
             assert container.is_added is False
             
-            mock_status_widget.update.assert_called_once_with("Статус: Не добавлена")
-            mock_status_widget.remove_class.assert_called_once_with("book-status_added")
-            mock_status_widget.add_class.assert_called_once_with("book-status_notAdded")
+            assert container._status is None
+            assert container._body is body
+            region = mock_refresh.call_args[0][0]
+            assert region.y == BookContainer.STATUS_LINE
+            assert region.height == 1
             
             mock_remove.assert_called_once_with(mock_book)
             mock_add.assert_not_called()
 
 
+class TestBookContainerBinding:
+    
+    def test_bind_updates_fields(self):
+        container = BookContainer(book={}, add_to_lib=Mock(), rem_in_lib=Mock())
+        new_book = {'title': 'Dune', 'author': ['Frank Herbert'], 'year': 1965}
+        
+        container._body = Mock()
+        container._status = Mock()
+        
+        with patch.object(container, 'refresh') as mock_refresh:
+            container.bind(new_book, True, 5)
+            
+            assert container.book is new_book
+            assert container.is_added is True
+            assert container.index == 5
+            assert container._body is None
+            assert container._status is None
+            assert container.body_lines()[0] == ('Dune', 'book-title')
+            assert container.status_text() == 'Статус: Добавлена в библиотеку'
+            mock_refresh.assert_called_once_with()
+    
+    def test_bind_same_book_skips_update(self):
+        book = {'title': 'Dune', 'author': ['Frank Herbert'], 'year': 1965}
+        container = BookContainer(book=book, add_to_lib=Mock(), rem_in_lib=Mock())
+        
+        with patch.object(container, 'refresh') as mock_refresh:
+            container.bind(book, False, 3)
+            
+            assert container.index == 3
+            mock_refresh.assert_not_called()
+    
+    def test_bind_equal_book_skips_update(self):
+        book = {'title': 'Dune', 'author': ['Frank Herbert'], 'year': 1965}
+        container = BookContainer(book=book, add_to_lib=Mock(), rem_in_lib=Mock(), is_added=True)
+        
+        with patch.object(container, 'refresh') as mock_refresh:
+            container.bind(dict(book), True, 0)
+            
+            mock_refresh.assert_not_called()
+    
+    def test_bind_status_change_keeps_body(self):
+        book = {'title': 'Dune', 'author': ['Frank Herbert'], 'year': 1965}
+        container = BookContainer(book=book, add_to_lib=Mock(), rem_in_lib=Mock())
+        body = container._body = Mock()
+        container._status = Mock()
+        
+        with patch.object(container, 'refresh') as mock_refresh:
+            container.bind(dict(book), True, 0)
+            
+            assert container.is_added is True
+            assert container._body is body
+            assert container._status is None
+            assert mock_refresh.call_args[0][0].y == BookContainer.STATUS_LINE
+    
+    def test_handle_save_notifies_status_handler(self):
+        container = BookContainer(book={'title': 'Test'}, add_to_lib=Mock(), rem_in_lib=Mock())
+        mock_handler = Mock()
+        container.set_status_handler(mock_handler)
+        
+        with patch.object(container, 'refresh'):
+            container._handle_save()
+            
+            mock_handler.assert_called_once_with(container)
+
+
+class TestBookContainerCover:
+    
+    def test_text_without_cover_column(self):
+        container = BookContainer(book={}, add_to_lib=Mock(), rem_in_lib=Mock())
+        
+        assert container.show_cover is False
+        assert container.cover is None
+    
+    def test_cover_column_reserved_while_loading(self):
+        container = BookContainer(book={}, add_to_lib=Mock(), rem_in_lib=Mock(), show_cover=True)
+        
+        lines = container._with_cover(Text("title\n\nauthor")).plain.split("\n")
+        
+        assert len(lines) == BookContainer.COVER_HEIGHT
+        assert lines[0] == " " * BookContainer.COVER_WIDTH + " title"
+        assert lines[2] == " " * BookContainer.COVER_WIDTH + " author"
+    
+    def test_cover_lines_prefix_text(self):
+        container = BookContainer(book={}, add_to_lib=Mock(), rem_in_lib=Mock(), show_cover=True)
+        cover = Mock()
+        cover.lines.return_value = [Text("▀▀")] * 2
+        container.cover = cover
+        
+        lines = container._with_cover(Text("title")).plain.split("\n")
+        
+        assert lines == ["▀▀ title", "▀▀ "]
+    
+    def test_set_cover_refreshes_once(self):
+        container = BookContainer(book={}, add_to_lib=Mock(), rem_in_lib=Mock(), show_cover=True)
+        cover = Mock()
+        
+        with patch.object(container, 'refresh') as mock_refresh:
+            container.set_cover(cover)
+            container.set_cover(cover)
+            
+            assert container.cover is cover
+            mock_refresh.assert_called_once_with()
+    
+    def test_bind_new_book_drops_cover(self):
+        container = BookContainer(book={'key': 'a'}, add_to_lib=Mock(), rem_in_lib=Mock(), show_cover=True)
+        container.cover = Mock()
+        
+        with patch.object(container, 'refresh'):
+            container.bind({'key': 'b'}, False, 0)
+            
+            assert container.cover is None
+
+
 class TestBookContainerEdgeCases:
     
     def test_empty_book_data(self):
@@ -0,0 +1,43 @@
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+try:
+    from coverCache import CoverCache
+except ImportError as e:
+    print(f"Ошибка импорта: {e}")
+    raise
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CoverCache(str(tmp_path / "cover_cache.db"))
+
+
+class TestCoverCache:
+
+    def test_make_key_includes_size(self):
+        assert CoverCache.make_key(1, 10, 8) != CoverCache.make_key(1, 20, 8)
+
+    def test_get_missing(self, cache):
+        assert cache.get(1, 10, 8) is None
+
+    def test_uses_own_table_and_limit(self, tmp_path):
+        cache = CoverCache(str(tmp_path / "cover_cache.db"), max_bytes=20)
+
+        assert cache.store.table == "cover_cache"
+        assert cache.store.max_bytes == 20
+
+    def test_put_and_get(self, cache):
+        cache.put(1, 10, 8, b"\x01\x02\x03")
+
+        assert cache.get(1, 10, 8) == b"\x01\x02\x03"
+        assert cache.get(1, 5, 4) is None
+
+    def test_clear(self, cache):
+        cache.put(1, 10, 8, b"a")
+        cache.clear()
+
+        assert cache.get(1, 10, 8) is None
@@ -0,0 +1,136 @@
+import pytest
+import sys
+import os
+import threading
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+try:
+    from coverLoader import CoverLoader, CoverThumbnail, decode_thumbnail
+    from coverCache import CoverCache
+    from backendClient import BackendClient
+except ImportError as e:
+    print(f"Ошибка импорта: {e}")
+    raise
+
+
+WIDTH = 2
+HEIGHT = 1
+PIXELS = bytes([255, 0, 0, 0, 255, 0, 0, 0, 255, 255, 255, 255])
+
+
+class CoverHandler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        CoverHandler.requests.append(self.path)
+        if self.path == "/b/id/42-S.jpg":
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", "4")
+            self.end_headers()
+            self.wfile.write(b"jpeg")
+        else:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def image_server():
+    CoverHandler.requests = []
+    server = HTTPServer(("127.0.0.1", 0), CoverHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CoverCache(str(tmp_path / "cover_cache.db"))
+
+
+class TestCoverThumbnail:
+
+    def test_lines_use_half_blocks(self):
+        thumbnail = CoverThumbnail(WIDTH, HEIGHT, PIXELS)
+
+        lines = thumbnail.lines()
+
+        assert len(lines) == 1
+        assert lines[0].plain == "▀▀"
+        first = lines[0].spans[0].style
+        assert first.color.triplet == (255, 0, 0)
+        assert first.bgcolor.triplet == (0, 0, 255)
+
+    def test_lines_are_cached(self):
+        thumbnail = CoverThumbnail(WIDTH, HEIGHT, PIXELS)
+
+        assert thumbnail.lines() is thumbnail.lines()
+
+
+class TestCoverLoader:
+
+    def test_fetch_from_local_server(self, image_server, cache):
+        loader = CoverLoader(BackendClient(image_server), cache, WIDTH, HEIGHT)
+
+        assert loader.fetch(42) == b"jpeg"
+        assert loader.fetch(7) is None
+        assert CoverHandler.requests == ["/b/id/42-S.jpg", "/b/id/7-S.jpg"]
+
+    def test_load_decodes_and_caches(self, image_server, cache):
+        decode_executor = Mock()
+        decode_executor.submit.return_value.result.return_value = PIXELS
+        loader = CoverLoader(BackendClient(image_server), cache, WIDTH, HEIGHT, decode_executor)
+
+        thumbnail = loader.load(42)
+
+        assert thumbnail.pixels == PIXELS
+        decode_executor.submit.assert_called_once_with(decode_thumbnail, b"jpeg", WIDTH, HEIGHT)
+        assert cache.get(42, WIDTH, HEIGHT) == PIXELS
+
+    def test_load_uses_cache_before_network(self, cache):
+        client = Mock()
+        cache.put(42, WIDTH, HEIGHT, PIXELS)
+        loader = CoverLoader(client, cache, WIDTH, HEIGHT)
+
+        assert loader.load(42).pixels == PIXELS
+        client.get.assert_not_called()
+
+    def test_load_missing_cover(self, image_server, cache):
+        loader = CoverLoader(BackendClient(image_server), cache, WIDTH, HEIGHT, Mock())
+
+        assert loader.load(7) is None
+
+    def test_decode_rejects_wrong_size(self, cache):
+        decode_executor = Mock()
+        decode_executor.submit.return_value.result.return_value = b"short"
+        loader = CoverLoader(Mock(), cache, WIDTH, HEIGHT, decode_executor)
+
+        assert loader.decode(b"jpeg") is None
+
+    def test_decode_failure(self, cache):
+        decode_executor = Mock()
+        decode_executor.submit.return_value.result.side_effect = OSError("broken image")
+        loader = CoverLoader(Mock(), cache, WIDTH, HEIGHT, decode_executor)
+
+        assert loader.decode(b"jpeg") is None
+
+    def test_decode_thumbnail_with_pillow(self):
+        Image = pytest.importorskip("PIL.Image")
+        from io import BytesIO
+
+        buffer = BytesIO()
+        Image.new("RGB", (40, 60), (10, 20, 30)).save(buffer, format="PNG")
+
+        pixels = decode_thumbnail(buffer.getvalue(), WIDTH, HEIGHT)
+
+        assert pixels == bytes([10, 20, 30]) * WIDTH * HEIGHT * 2
@@ -1,18 +1,28 @@
 import pytest
 from unittest.mock import Mock, patch, PropertyMock, MagicMock, call
+import asyncio
 import sys
 import os
 import json
+import threading
+from collections import deque
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 try:
-    from LibApp import LibApp, MainGridContainer
+    from LibApp import LibApp, MainGridContainer, BooksLoaded, LibraryChanged, LibraryBatchMutated, LibraryMembershipChecked, CoverLoaded, AutoLoginFinished
+    from mutationQueue import MutationQueue
+    from resultsPane import ResultsPane
+    from sessionSnapshot import SessionSnapshot
 except ImportError as e:
     print(f"Ошибка импорта: {e}")
     raise
 
 
+def make_stored_book(key):
+    return {'key': key, 'title': 'Book', 'author': ['A'], 'year': 2000, 'cover_i': 1, 'language': ['eng']}
+
+
 class TestLibAppComposeAndMount:
     
     def test_compose(self):
@@ -30,13 +40,8 @@ class TestLibAppComposeAndMount:
     
     def test_on_mount(self):
         app = LibApp()
-        
-        mock_book1 = Mock()
-        mock_book1.set_focus_handler = Mock()
-        mock_book2 = Mock()
-        mock_book2.set_focus_handler = Mock()
-        
-        app.book_containers = [mock_book1, mock_book2]
+        app.backend = Mock()
+        app.search_client = Mock()
         
         with patch.object(app, 'showMainContainer') as mock_show:
             with patch.object(app, 'has_saved_user') as mock_has_user:
@@ -44,13 +49,14 @@ class TestLibAppComposeAndMount:
                 
                 app.on_mount()
                 
-                mock_book1.set_focus_handler.assert_called_once_with(app._on_book_focused)
-                mock_book2.set_focus_handler.assert_called_once_with(app._on_book_focused)
-                
+                app.backend.warm_up_async.assert_called_once()
+                app.search_client.warm_up_async.assert_called_once()
                 mock_show.assert_called_once()
     
     def test_on_mount_with_auto_login(self):
         app = LibApp()
+        app.backend = Mock()
+        app.search_client = Mock()
         
         with patch.object(app, 'showMainContainer') as mock_show:
             with patch.object(app, 'has_saved_user') as mock_has_user:
@@ -65,7 +71,7 @@ class TestLibAppComposeAndMount:
 
 class TestLibAppSearchMethods:
     
-    def test_search_books_success(self):
+    def test_fetch_books_success(self):
         app = LibApp()
         
         test_query = "python programming"
@@ -82,48 +88,271 @@ class TestLibAppSearchMethods:
             ]
         }
         
-        with patch('LibApp.requests.get') as mock_get:
+        with patch.object(app.search_client, 'get') as mock_get:
             mock_response = Mock()
             mock_response.status_code = 200
             mock_response.json.return_value = mock_response_data
             mock_get.return_value = mock_response
             
-            with patch.object(app, 'display_books') as mock_display:
-                app.search_books(test_query)
-                
-                expected_url = f"{app.search_api}?q=python+programming"
-                mock_get.assert_called_once_with(expected_url)
-                
-                mock_display.assert_called_once_with(mock_response_data['docs'])
+            result = app.fetch_books(test_query)
+            
+            mock_get.assert_called_once_with(
+                app.search_endpoint,
+                params={
+                    "q": "python programming",
+                    "fields": "key,title,author_name,first_publish_year,cover_i,language",
+                    "limit": app.search_page_size,
+                    "page": 1
+                },
+                cancel_token=None
+            )
+            
+            assert result == {'docs': mock_response_data['docs'], 'numFound': 1}
     
-    def test_search_books_failure(self):
+    def test_fetch_books_drops_unused_fields(self):
         app = LibApp()
         
-        with patch('LibApp.requests.get') as mock_get:
+        with open(os.path.join(os.path.dirname(__file__), '../../books.json'), encoding="utf-8") as f:
+            mock_response_data = json.load(f)
+        
+        with patch.object(app.search_client, 'get') as mock_get:
+            mock_response = Mock()
+            mock_response.status_code = 200
+            mock_response.json.return_value = mock_response_data
+            mock_get.return_value = mock_response
+            
+            result = app.fetch_books("the lord of the rings", page=2)
+            
+            assert mock_get.call_args[1]['params']['page'] == 2
+            assert result['numFound'] == mock_response_data['numFound']
+            assert len(result['docs']) == len(mock_response_data['docs'])
+            for book in result['docs']:
+                assert set(book) <= set(app.search_fields)
+                assert 'ia' not in book
+            assert result['docs'][0]['key'] == mock_response_data['docs'][0]['key']
+    
+    def test_normalize_books_custom_fields(self):
+        app = LibApp()
+        app.search_fields = ["key", "title"]
+        
+        result = app.normalize_books([
+            {'key': '/works/OL1W', 'title': 'Book', 'ia': ['a', 'b'], 'cover_i': 1},
+            {'title': 'No key'}
+        ])
+        
+        assert result == [
+            {'key': '/works/OL1W', 'title': 'Book'},
+            {'title': 'No key'}
+        ]
+    
+    def test_fetch_books_failure(self):
+        app = LibApp()
+        
+        with patch.object(app.search_client, 'get') as mock_get:
             mock_get.side_effect = Exception("Network error")
             
-            with patch.object(app, 'display_books') as mock_display:
-                app.search_books("test query")
-                
-                mock_display.assert_not_called()
+            assert app.fetch_books("test query") is None
     
-    def test_search_books_bad_status(self):
+    def test_fetch_books_bad_status(self):
         app = LibApp()
         
-        with patch('LibApp.requests.get') as mock_get:
+        with patch.object(app.search_client, 'get') as mock_get:
             mock_response = Mock()
             mock_response.status_code = 500
             mock_get.return_value = mock_response
             
-            with patch.object(app, 'display_books') as mock_display:
+            assert app.fetch_books("test query") is None
+    
+    def test_search_books_runs_worker(self):
+        app = LibApp()
+        
+        with patch.object(app, 'run_worker') as mock_run_worker:
+            with patch.object(app, 'set_results_loading') as mock_loading:
                 app.search_books("test query")
                 
+                mock_loading.assert_called_once_with(True)
+                mock_run_worker.assert_called_once()
+                assert mock_run_worker.call_args[1]['group'] == "search"
+                mock_run_worker.call_args[0][0].close()
+    
+    def test_search_books_empty_query(self):
+        app = LibApp()
+        
+        with patch.object(app, 'run_worker') as mock_run_worker:
+            app.search_books("")
+            
+            mock_run_worker.assert_not_called()
+    
+    def test_search_cancels_previous_request(self):
+        app = LibApp()
+        
+        with patch.object(app, 'run_worker') as mock_run_worker:
+            with patch.object(app, 'set_results_loading'):
+                app.search_books("first")
+                first_token = app.search_cancel_token
+                app.search_books("second")
+                
+                assert first_token.cancelled is True
+                assert app.search_cancel_token is not first_token
+                assert app.search_cancel_token.cancelled is False
+                assert app.search_generation == 2
+                assert mock_run_worker.call_args[1]['exclusive'] is True
+                for worker_call in mock_run_worker.call_args_list:
+                    worker_call[0][0].close()
+    
+    def test_on_books_loaded_drops_stale_response(self):
+        app = LibApp()
+        app.search_generation = 3
+        
+        with patch.object(app, 'display_books') as mock_display:
+            with patch.object(app, 'set_results_loading') as mock_loading:
+                app.on_books_loaded(BooksLoaded([{'title': 'Old'}], generation=2))
+                
+                mock_display.assert_not_called()
+                mock_loading.assert_not_called()
+    
+    def test_on_books_loaded(self):
+        app = LibApp()
+        books = [{'title': 'Book 1'}]
+        
+        with patch.object(app, 'display_books') as mock_display:
+            with patch.object(app, 'set_results_loading') as mock_loading:
+                app.on_books_loaded(BooksLoaded(books))
+                
+                mock_loading.assert_called_once_with(False)
+                mock_display.assert_called_once_with(books)
+    
+    def test_on_books_loaded_failure(self):
+        app = LibApp()
+        
+        with patch.object(app, 'display_books') as mock_display:
+            with patch.object(app, 'set_results_loading') as mock_loading:
+                app.on_books_loaded(BooksLoaded(None))
+                
+                mock_loading.assert_called_once_with(False)
                 mock_display.assert_not_called()
     
-    def test_search_personal_library_success(self):
+    def test_search_books_task_fresh_cache_hit(self):
+        app = LibApp()
+        app.search_cache = Mock()
+        app.search_cache.get.return_value = ({'docs': [{'title': 'Cached'}], 'numFound': 1}, True)
+        
+        with patch.object(app, 'fetch_books') as mock_fetch:
+            with patch.object(app, 'post_message') as mock_post_message:
+                asyncio.run(app._search_books_task("dune", 1, Mock()))
+                
+                mock_fetch.assert_not_called()
+                app.search_cache.get.assert_called_once_with(
+                    "dune",
+                    1,
+                    app.search_fields,
+                    app.search_page_size
+                )
+                message = mock_post_message.call_args[0][0]
+                assert message.books == [{'title': 'Cached'}]
+                assert message.total == 1
+                assert message.page == 1
+                assert message.pending is False
+    
+    def test_search_books_task_stale_cache_revalidates(self):
+        app = LibApp()
+        app.search_cache = Mock()
+        app.search_cache.get.return_value = ({'docs': [{'title': 'Old'}], 'numFound': 1}, False)
+        token = Mock()
+        
+        with patch.object(app, 'fetch_books') as mock_fetch:
+            mock_fetch.return_value = {'docs': [{'title': 'New'}], 'numFound': 1}
+            with patch.object(app, 'post_message') as mock_post_message:
+                asyncio.run(app._search_books_task("dune", 1, token))
+                
+                mock_fetch.assert_called_once_with("dune", token, 1)
+                app.search_cache.put.assert_called_once_with(
+                    "dune",
+                    {'docs': [{'title': 'New'}], 'numFound': 1},
+                    1,
+                    app.search_fields,
+                    app.search_page_size
+                )
+                first, second = [c[0][0] for c in mock_post_message.call_args_list]
+                assert first.books == [{'title': 'Old'}]
+                assert first.pending is True
+                assert second.books == [{'title': 'New'}]
+                assert second.pending is False
+    
+    def test_search_books_task_unchanged_revalidation(self):
+        app = LibApp()
+        app.search_cache = Mock()
+        app.search_cache.get.return_value = ({'docs': [{'title': 'Same'}], 'numFound': 1}, False)
+        
+        with patch.object(app, 'fetch_books') as mock_fetch:
+            mock_fetch.return_value = {'docs': [{'title': 'Same'}], 'numFound': 1}
+            with patch.object(app, 'post_message') as mock_post_message:
+                asyncio.run(app._search_books_task("dune", 1, Mock()))
+                
+                assert mock_post_message.call_args[0][0].books is None
+    
+    def test_search_books_task_cache_miss(self):
+        app = LibApp()
+        app.search_cache = Mock()
+        app.search_cache.get.return_value = None
+        
+        with patch.object(app, 'fetch_books') as mock_fetch:
+            mock_fetch.return_value = {'docs': [{'title': 'Fetched'}], 'numFound': 1}
+            with patch.object(app, 'post_message') as mock_post_message:
+                asyncio.run(app._search_books_task("dune", 4, Mock()))
+                
+                app.search_cache.put.assert_called_once_with(
+                    "dune",
+                    {'docs': [{'title': 'Fetched'}], 'numFound': 1},
+                    1,
+                    app.search_fields,
+                    app.search_page_size
+                )
+                mock_post_message.assert_called_once()
+                message = mock_post_message.call_args[0][0]
+                assert message.books == [{'title': 'Fetched'}]
+                assert message.generation == 4
+    
+    def test_on_books_loaded_pending_keeps_request(self):
+        app = LibApp()
+        app.search_generation = 1
+        token = Mock()
+        app.search_cancel_token = token
+        
+        with patch.object(app, 'display_books') as mock_display:
+            with patch.object(app, 'set_results_loading') as mock_loading:
+                app.on_books_loaded(BooksLoaded([{'title': 'Old'}], 1, pending=True))
+                
+                mock_loading.assert_called_once_with(False)
+                mock_display.assert_called_once_with([{'title': 'Old'}])
+                assert app.search_cancel_token is token
+    
+    def test_load_books_page_uses_page(self):
+        app = LibApp()
+        app.search_cache = Mock()
+        app.search_cache.get.return_value = None
+        token = Mock()
+        
+        with patch.object(app, 'fetch_books') as mock_fetch:
+            mock_fetch.return_value = {'docs': [{'title': 'Page 3'}], 'numFound': 60}
+            with patch.object(app, 'post_message') as mock_post_message:
+                asyncio.run(app._load_books_page("dune", 3, 1, token))
+                
+                app.search_cache.get.assert_called_once_with(
+                    "dune",
+                    3,
+                    app.search_fields,
+                    app.search_page_size
+                )
+                mock_fetch.assert_called_once_with("dune", token, 3)
+                message = mock_post_message.call_args[0][0]
+                assert message.page == 3
+                assert message.total == 60
+    
+    def test_fetch_personal_library_success(self):
         app = LibApp()
         app.userid = "test_user"
-        app.password = "test_pass"
+        app.session_token = "test_token"
         
         test_query = "python"
         mock_response_data = {
@@ -138,44 +367,231 @@ class TestLibAppSearchMethods:
             ]
         }
         
-        with patch('LibApp.requests.post') as mock_post:
+        with patch.object(app.backend, 'post') as mock_post:
             mock_response = Mock()
             mock_response.status_code = 200
             mock_response.json.return_value = mock_response_data
             mock_post.return_value = mock_response
             
-            with patch.object(app, 'display_books') as mock_display:
-                app.search_personal_library(test_query)
-                
-                expected_url = f"{app.base_url}/lib"
-                expected_data = {
-                    "userid": "test_user",
-                    "password": "test_pass",
-                    "query": test_query
-                }
-                mock_post.assert_called_once_with(expected_url, json=expected_data)
-                
-                mock_display.assert_called_once_with(mock_response_data['books'])
+            result = app.fetch_personal_library(test_query)
+            
+            expected_data = {
+                "token": "test_token",
+                "query": test_query
+            }
+            mock_post.assert_called_once_with("/lib", expected_data, cancel_token=None, headers=None)
+            
+            assert result == mock_response_data['books']
+    
+    def test_fetch_personal_library_remembers_etag(self):
+        app = LibApp()
+        app.userid = "test_user"
+        app.session_token = "test_token"
+        
+        with patch.object(app.backend, 'post') as mock_post:
+            mock_response = Mock()
+            mock_response.status_code = 200
+            mock_response.headers = {"ETag": 'W/"1-2-3-abc"'}
+            mock_response.json.return_value = {'success': True, 'books': [{'key': 'k'}]}
+            mock_post.return_value = mock_response
+            
+            app.fetch_personal_library("dune")
+            
+            assert app.library_query_cache["dune"] == ('W/"1-2-3-abc"', [{'key': 'k'}])
+    
+    def test_fetch_personal_library_not_modified(self):
+        app = LibApp()
+        app.userid = "test_user"
+        app.session_token = "test_token"
+        app.library_query_cache["dune"] = ('W/"1-2-3-abc"', [{'key': 'k'}])
+        
+        with patch.object(app.backend, 'post') as mock_post:
+            mock_response = Mock()
+            mock_response.status_code = 304
+            mock_post.return_value = mock_response
+            
+            result = app.fetch_personal_library("dune")
+            
+            assert mock_post.call_args[1]['headers'] == {"If-None-Match": 'W/"1-2-3-abc"'}
+            assert result == [{'key': 'k'}]
+            mock_response.json.assert_not_called()
+    
+    def test_library_query_cache_is_bounded(self):
+        app = LibApp()
+        app.library_query_cache_size = 2
+        
+        app._remember_library_query("a", "tag-a", [])
+        app._remember_library_query("b", "tag-b", [])
+        app._remember_library_query("c", "tag-c", [])
+        
+        assert list(app.library_query_cache) == ["b", "c"]
     
     def test_search_personal_library_no_credentials(self):
         app = LibApp()
         app.userid = None
-        app.password = None
+        app.session_token = None
         
-        with patch('LibApp.requests.post') as mock_post:
+        with patch.object(app, 'run_worker') as mock_run_worker:
             app.search_personal_library("test query")
             
-            mock_post.assert_not_called()
+            mock_run_worker.assert_not_called()
     
-    def test_search_personal_library_failure(self):
+    def test_search_personal_library_runs_worker(self):
         app = LibApp()
         app.userid = "test_user"
-        app.password = "test_pass"
+        app.session_token = "test_token"
+        
+        with patch.object(app, 'run_worker') as mock_run_worker:
+            with patch.object(app, 'set_results_loading'):
+                app.search_personal_library("test query")
+                
+                mock_run_worker.assert_called_once()
+                mock_run_worker.call_args[0][0].close()
+    
+    def test_fetch_personal_library_failure(self):
+        app = LibApp()
+        app.userid = "test_user"
+        app.session_token = "test_token"
         
-        with patch('LibApp.requests.post') as mock_post:
+        with patch.object(app.backend, 'post') as mock_post:
             mock_post.side_effect = Exception("Network error")
             
-            app.search_personal_library("test query")
+            assert app.fetch_personal_library("test query") is None
+
+
+class TestLibAppPagination:
+    
+    def make_app(self, page=1, total=100):
+        app = LibApp()
+        app.search_generation = 1
+        app.search_query = "dune"
+        app.search_page = page
+        app.search_total = total
+        return app
+    
+    def test_first_page_displays_and_prefetches(self):
+        app = self.make_app(page=0, total=None)
+        
+        with patch.object(app, 'display_books') as mock_display:
+            with patch.object(app, 'prefetch_page') as mock_prefetch:
+                with patch.object(app, 'set_results_loading'):
+                    app.on_books_loaded(BooksLoaded([{'title': 'A'}], 1, page=1, total=100))
+                    
+                    mock_display.assert_called_once_with([{'title': 'A'}])
+                    mock_prefetch.assert_called_once_with(2)
+                    assert app.search_page == 1
+                    assert app.search_total == 100
+    
+    def test_has_more_pages(self):
+        app = self.make_app(page=2, total=41)
+        assert app.has_more_pages() is True
+        
+        app.search_page = 3
+        assert app.has_more_pages() is False
+        
+        app.search_total = None
+        assert app.has_more_pages() is False
+    
+    def test_prefetch_page_runs_worker(self):
+        app = self.make_app()
+        
+        with patch.object(app, 'run_worker') as mock_run_worker:
+            app.prefetch_page(2)
+            app.prefetch_page(2)
+            
+            mock_run_worker.assert_called_once()
+            assert mock_run_worker.call_args[1]['group'] == "pages"
+            assert app.pages_in_flight == {2}
+            mock_run_worker.call_args[0][0].close()
+    
+    def test_prefetch_page_past_end(self):
+        app = self.make_app(total=20)
+        
+        with patch.object(app, 'run_worker') as mock_run_worker:
+            app.prefetch_page(2)
+            
+            mock_run_worker.assert_not_called()
+    
+    def test_prefetched_page_waits_until_wanted(self):
+        app = self.make_app()
+        app.pages_in_flight.add(2)
+        
+        with patch.object(app, 'append_books') as mock_append:
+            app.on_books_loaded(BooksLoaded([{'title': 'B'}], 1, page=2, total=100))
+            
+            mock_append.assert_not_called()
+            assert app.prefetched_pages == {2: [{'title': 'B'}]}
+            assert app.pages_in_flight == set()
+    
+    def test_load_next_page_appends_prefetched(self):
+        app = self.make_app()
+        app.prefetched_pages[2] = [{'title': 'B'}]
+        
+        with patch.object(app, 'append_books') as mock_append:
+            with patch.object(app, 'prefetch_page') as mock_prefetch:
+                app.load_next_page()
+                
+                mock_append.assert_called_once_with([{'title': 'B'}])
+                mock_prefetch.assert_called_once_with(3)
+                assert app.search_page == 2
+                assert app.page_wanted is False
+    
+    def test_load_next_page_fetches_missing_page(self):
+        app = self.make_app()
+        
+        with patch.object(app, 'append_books') as mock_append:
+            with patch.object(app, 'prefetch_page') as mock_prefetch:
+                app.load_next_page()
+                
+                mock_append.assert_not_called()
+                mock_prefetch.assert_called_once_with(2)
+                assert app.page_wanted is True
+        
+        with patch.object(app, 'append_books') as mock_append:
+            with patch.object(app, 'prefetch_page'):
+                app.on_books_loaded(BooksLoaded([{'title': 'B'}], 1, page=2, total=100))
+                
+                mock_append.assert_called_once_with([{'title': 'B'}])
+                assert app.search_page == 2
+    
+    def test_load_next_page_without_more(self):
+        app = self.make_app(page=5, total=100)
+        
+        with patch.object(app, 'prefetch_page') as mock_prefetch:
+            app.load_next_page()
+            
+            mock_prefetch.assert_not_called()
+    
+    def test_stale_page_dropped(self):
+        app = self.make_app()
+        
+        app.on_books_loaded(BooksLoaded([{'title': 'B'}], 0, page=2, total=100))
+        
+        assert app.prefetched_pages == {}
+    
+    def test_new_search_resets_pages(self):
+        app = self.make_app(page=3)
+        app.prefetched_pages[4] = []
+        app.pages_in_flight.add(5)
+        
+        with patch.object(app, 'run_worker') as mock_run_worker:
+            with patch.object(app, 'set_results_loading'):
+                app.search_books("new query")
+                
+                assert app.search_query == "new query"
+                assert app.search_page == 0
+                assert app.search_total is None
+                assert app.prefetched_pages == {}
+                assert app.pages_in_flight == set()
+                mock_run_worker.call_args[0][0].close()
+    
+    def test_near_end_loads_next_page(self):
+        app = self.make_app()
+        
+        with patch.object(app, 'load_next_page') as mock_load:
+            app.on_results_pane_near_end(Mock())
+            
+            mock_load.assert_called_once()
 
 
 class TestLibAppDisplayBooks:
@@ -203,64 +619,40 @@ class TestLibAppDisplayBooks:
         ]
         
         mock_right_pane = Mock()
-        mock_right_pane.mount = Mock()
+        mock_right_pane.visible_rows.return_value = 4
         
         with patch.object(app, 'query_one') as mock_query:
             mock_query.return_value = mock_right_pane
             
-            with patch('LibApp.BookContainer') as MockBookContainer:
-                mock_container1 = Mock()
-                mock_container1.set_focus_handler = Mock()
-                mock_container2 = Mock()
-                mock_container2.set_focus_handler = Mock()
+            with patch.object(app, 'is_book_in_library') as mock_is_in_lib:
+                mock_is_in_lib.side_effect = [False, True]
                 
-                MockBookContainer.side_effect = [mock_container1, mock_container2]
+                app.display_books(books_data)
                 
-                with patch.object(app, 'is_book_in_library') as mock_is_in_lib:
-                    mock_is_in_lib.side_effect = [False, True]
-                    
-                    app.display_books(books_data)
-                    
-                    assert MockBookContainer.call_count == 2
-                    
-                    first_call_args = MockBookContainer.call_args_list[0]
-                    first_book_data = first_call_args[0][0]  # Первый аргумент - book
-                    
-                    assert first_book_data['title'] == 'Book 1'
-                    assert first_book_data['author'] == 'Author 1'
-                    assert first_book_data['year'] == 2000
-                    assert first_book_data['cover_i'] == 1001
-                    assert first_book_data['key'] == '/works/OL1001W'
-                    assert first_book_data['language'] == ['eng']
-                    
-                    second_call_kwargs = MockBookContainer.call_args_list[1][1]
-                    assert second_call_kwargs['is_added'] is True
-                    
-                    assert len(app.book_containers) == 2
-                    assert mock_container1 in app.book_containers
-                    assert mock_container2 in app.book_containers
-                    
-                    mock_container1.set_focus_handler.assert_called_once_with(app._on_book_focused)
-                    mock_container2.set_focus_handler.assert_called_once_with(app._on_book_focused)
-                    
-                    assert mock_right_pane.mount.call_count == 2
+                mock_right_pane.set_books.assert_called_once()
+                books, added = mock_right_pane.set_books.call_args[0]
+                
+                assert len(books) == 2
+                assert books[0]['title'] == 'Book 1'
+                assert books[0]['author'] == ['Author 1']
+                assert books[0]['year'] == 2000
+                assert books[0]['cover_i'] == 1001
+                assert books[0]['key'] == '/works/OL1001W'
+                assert books[0]['language'] == ['eng']
+                assert added == [False, True]
     
     def test_display_books_empty_data(self):
         app = LibApp()
         
-        mock_old_container = Mock()
-        mock_old_container.remove = Mock()
-        app.book_containers = [mock_old_container]
-        
         mock_right_pane = Mock()
+        mock_right_pane.visible_rows.return_value = 4
         
         with patch.object(app, 'query_one') as mock_query:
             mock_query.return_value = mock_right_pane
             
             app.display_books([])
             
-            mock_old_container.remove.assert_called_once()
-            assert len(app.book_containers) == 0
+            mock_right_pane.set_books.assert_called_once_with([], [])
     
     def test_display_books_missing_fields(self):
         app = LibApp()
@@ -272,25 +664,378 @@ class TestLibAppDisplayBooks:
         ]
         
         mock_right_pane = Mock()
+        mock_right_pane.visible_rows.return_value = 4
         
         with patch.object(app, 'query_one') as mock_query:
             mock_query.return_value = mock_right_pane
             
-            with patch('LibApp.BookContainer') as MockBookContainer:
-                mock_container = Mock()
-                mock_container.set_focus_handler = Mock()
-                MockBookContainer.return_value = mock_container
-                
-                app.display_books(books_data)
-                
-                call_args = MockBookContainer.call_args[0][0]  # book dict
+            app.display_books(books_data)
+            
+            book = mock_right_pane.set_books.call_args[0][0][0]
+            
+            assert book['title'] == 'Book with minimal data'
+            assert book['author'] == ['Неизвестен']
+            assert book['year'] == 'Неизвестен'
+            assert book['cover_i'] == 0
+            assert book['key'] == ''
+            assert book['language'] == ''
+    
+    def test_append_books(self):
+        app = LibApp()
+        
+        mock_right_pane = Mock()
+        mock_right_pane.visible_rows.return_value = 4
+        
+        with patch.object(app, 'query_one') as mock_query:
+            mock_query.return_value = mock_right_pane
+            
+            with patch.object(app, 'is_book_in_library', return_value=True):
+                app.append_books([{'title': 'Book 3', 'key': '/works/OL3W'}])
                 
-                assert call_args['title'] == 'Book with minimal data'
-                assert call_args['author'] == 'Неизвестен'
-                assert call_args['year'] == 'Неизвестен'
-                assert call_args['cover_i'] == 0
-                assert call_args['key'] == ''
-                assert call_args['language'] == ''
+                books, added = mock_right_pane.append_books.call_args[0]
+                assert books[0]['key'] == '/works/OL3W'
+                assert added == [True]
+    
+    def make_books_data(self, count):
+        return [{'title': f'Book {i}', 'key': f'/works/OL{i}W'} for i in range(count)]
+    
+    def test_display_books_renders_first_screen_immediately(self):
+        app = LibApp()
+        mock_right_pane = Mock()
+        mock_right_pane.visible_rows.return_value = 4
+        
+        with patch.object(app, 'query_one', return_value=mock_right_pane), \
+                patch.object(app, 'set_timer') as mock_set_timer:
+            app.display_books(self.make_books_data(1000))
+            
+            books, added = mock_right_pane.set_books.call_args[0]
+            assert len(books) == 4 + 2 * ResultsPane.OVERSCAN
+            assert len(app.display_queue) == 1000 - len(books)
+            mock_set_timer.assert_called_once_with(app.display_frame_interval, app._display_next_chunk)
+    
+    def test_display_next_chunk_appends_rest(self):
+        app = LibApp()
+        mock_right_pane = Mock()
+        mock_right_pane.visible_rows.return_value = 4
+        
+        with patch.object(app, 'query_one', return_value=mock_right_pane), \
+                patch.object(app, 'set_timer') as mock_set_timer:
+            app.display_books(self.make_books_data(20))
+            app.display_frame_budget = 10
+            app._display_next_chunk()
+            
+            books, added = mock_right_pane.append_books.call_args[0]
+            assert [book['key'] for book in books] == [f'/works/OL{i}W' for i in range(8, 20)]
+            assert app.display_queue == deque()
+            assert app.display_timer is None
+            assert mock_set_timer.call_count == 1
+    
+    def test_display_next_chunk_respects_budget(self):
+        app = LibApp()
+        app.display_queue.extend(self.make_books_data(5))
+        app.display_frame_budget = 0
+        mock_right_pane = Mock()
+        
+        with patch.object(app, 'query_one', return_value=mock_right_pane), \
+                patch.object(app, 'set_timer') as mock_set_timer:
+            app._display_next_chunk()
+            
+            books, added = mock_right_pane.append_books.call_args[0]
+            assert len(books) == 1
+            assert len(app.display_queue) == 4
+            mock_set_timer.assert_called_once()
+    
+    def test_append_books_waits_for_pending_display(self):
+        app = LibApp()
+        app.display_queue.extend(self.make_books_data(2))
+        mock_right_pane = Mock()
+        
+        with patch.object(app, 'query_one', return_value=mock_right_pane):
+            app.append_books([{'title': 'Book 3', 'key': '/works/OL3W'}])
+            
+            mock_right_pane.append_books.assert_not_called()
+            assert app.display_queue[-1]['key'] == '/works/OL3W'
+    
+    def test_new_search_cancels_pending_display(self):
+        app = LibApp()
+        app.display_queue.extend(self.make_books_data(2))
+        timer = Mock()
+        app.display_timer = timer
+        
+        with patch.object(app, 'run_worker') as mock_run_worker, \
+                patch.object(app, 'set_results_loading'), \
+                patch.object(app.workers, 'cancel_group'):
+            app.search_books("python")
+            mock_run_worker.call_args[0][0].close()
+        
+        timer.stop.assert_called_once()
+        assert app.display_timer is None
+        assert len(app.display_queue) == 0
+    
+    def test_search_results_check_membership_of_all_books(self):
+        app = LibApp()
+        app.search_source = "search"
+        mock_right_pane = Mock()
+        mock_right_pane.visible_rows.return_value = 4
+        books_data = self.make_books_data(100)
+        
+        with patch.object(app, 'query_one', return_value=mock_right_pane), \
+                patch.object(app, 'set_timer'), \
+                patch.object(app, 'check_results_membership') as mock_check:
+            app.display_books(books_data)
+            app.append_books(self.make_books_data(1))
+            
+            assert mock_check.call_args_list[0] == call(books_data)
+            assert mock_check.call_count == 2
+    
+    def test_known_library_keys_skip_membership_check(self):
+        app = LibApp()
+        app.search_source = "search"
+        app.library_keys_known = True
+        mock_right_pane = Mock()
+        mock_right_pane.visible_rows.return_value = 4
+        
+        with patch.object(app, 'query_one', return_value=mock_right_pane), \
+                patch.object(app, 'set_timer'), \
+                patch.object(app, 'check_results_membership') as mock_check:
+            app.display_books(self.make_books_data(2))
+            app.append_books(self.make_books_data(1))
+            
+            mock_check.assert_not_called()
+    
+    def test_library_results_skip_membership_check(self):
+        app = LibApp()
+        app.search_source = "library"
+        mock_right_pane = Mock()
+        mock_right_pane.visible_rows.return_value = 4
+        
+        with patch.object(app, 'query_one', return_value=mock_right_pane), \
+                patch.object(app, 'check_results_membership') as mock_check:
+            app.display_books(self.make_books_data(2))
+            
+            mock_check.assert_not_called()
+
+
+class TestLibAppCovers:
+    
+    def test_request_cover_starts_single_load(self):
+        app = LibApp()
+        
+        with patch.object(app, 'run_worker') as mock_run_worker:
+            assert app.request_cover(42) is None
+            assert app.request_cover(42) is None
+            
+            mock_run_worker.assert_called_once()
+            assert mock_run_worker.call_args[1]['group'] == "covers"
+            mock_run_worker.call_args[0][0].close()
+    
+    def test_request_cover_returns_loaded_cover(self):
+        app = LibApp()
+        cover = Mock()
+        app.covers[42] = cover
+        
+        with patch.object(app, 'run_worker') as mock_run_worker:
+            assert app.request_cover(42) is cover
+            mock_run_worker.assert_not_called()
+    
+    def test_cover_loaded_updates_results(self):
+        app = LibApp()
+        app.covers_in_flight.add(42)
+        cover = Mock()
+        mock_right_pane = Mock()
+        
+        with patch.object(app, 'query_one', return_value=mock_right_pane):
+            app.on_cover_loaded(CoverLoaded(42, cover))
+            
+            assert app.covers[42] is cover
+            assert 42 not in app.covers_in_flight
+            mock_right_pane.set_cover.assert_called_once_with(42, cover)
+    
+    def test_failed_cover_is_not_retried(self):
+        app = LibApp()
+        
+        with patch.object(app, 'query_one') as mock_query:
+            app.on_cover_loaded(CoverLoaded(42, None))
+            
+            mock_query.assert_not_called()
+        with patch.object(app, 'run_worker') as mock_run_worker:
+            assert app.request_cover(42) is None
+            mock_run_worker.assert_not_called()
+    
+    def test_cover_memory_is_bounded(self):
+        app = LibApp()
+        app.covers_size = 2
+        
+        with patch.object(app, 'query_one'):
+            for cover_i in range(3):
+                app.on_cover_loaded(CoverLoaded(cover_i, Mock()))
+        
+        assert list(app.covers) == [1, 2]
+    
+    def test_cover_decoder_uses_spawned_processes(self):
+        app = LibApp()
+        
+        try:
+            app.get_cover_loader()
+            
+            assert app.cover_executor._mp_context.get_start_method() == "spawn"
+        finally:
+            app.cover_io_executor.shutdown(wait=False)
+            app.cover_executor.shutdown(wait=False)
+            app.cover_loader.client.close()
+
+
+class TestLibAppSnapshot:
+    
+    def make_app(self, tmp_path, username="bob"):
+        app = LibApp()
+        app.session_snapshot = SessionSnapshot(str(tmp_path / "session_snapshot.json"))
+        app.mutation_queue = MutationQueue(str(tmp_path / "pending.json"))
+        app.get_saved_credentials = Mock(return_value=(username, "secret") if username else None)
+        return app
+    
+    def test_save_snapshot(self, tmp_path):
+        app = self.make_app(tmp_path)
+        app.userid = 7
+        app.current_user = "bob"
+        app.search_source = "search"
+        app.search_query = "dune"
+        app.library_keys = {'a': True}
+        app.user_books_count = 1
+        app.results_pane = Mock(books=[{'key': 'a'}])
+        
+        app.save_snapshot()
+        
+        data = app.session_snapshot.load()
+        assert data['username'] == "bob"
+        assert data['books'] == [{'key': 'a'}]
+        assert data['library_keys'] == ['a']
+    
+    def test_guest_snapshot_has_no_library(self, tmp_path):
+        app = self.make_app(tmp_path)
+        app.library_keys = {'a': True}
+        
+        app.save_snapshot()
+        
+        data = app.session_snapshot.load()
+        assert data['username'] is None
+        assert data['library_keys'] == []
+        assert data['books'] == []
+    
+    def test_snapshot_keeps_restored_owner_while_login_pending(self, tmp_path):
+        app = self.make_app(tmp_path)
+        app.session_snapshot.save("bob", 7, "search", "dune", [{'key': 'a'}], ['a'], 1)
+        
+        with patch.object(app, 'query_one', return_value=Mock()), \
+                patch.object(app, 'search_books'):
+            app.restore_snapshot()
+        app.results_pane = Mock(books=[{'key': 'a'}])
+        
+        app.save_snapshot()
+        
+        data = app.session_snapshot.load()
+        assert data['username'] == "bob"
+        assert data['userid'] == 7
+        assert data['library_keys'] == ['a']
+    
+    def test_snapshot_after_failed_login_has_no_owner(self, tmp_path):
+        app = self.make_app(tmp_path)
+        app.session_snapshot.save("bob", 7, "search", "dune", [], ['a'], 1)
+        
+        with patch.object(app, 'query_one', return_value=Mock()):
+            app.restore_snapshot()
+            app.on_auto_login_finished(AutoLoginFinished(False))
+        
+        app.save_snapshot()
+        
+        data = app.session_snapshot.load()
+        assert data['username'] is None
+        assert data['library_keys'] == []
+    
+    def test_restore_snapshot_paints_and_revalidates(self, tmp_path):
+        app = self.make_app(tmp_path)
+        app.session_snapshot.save("bob", 7, "search", "dune", [{'key': 'a'}, {'key': 'b'}], ['a'], 1)
+        mock_right_pane = Mock()
+        
+        with patch.object(app, 'query_one', return_value=mock_right_pane), \
+                patch.object(app, 'search_books') as mock_search:
+            app.restore_snapshot()
+            
+            mock_right_pane.set_books.assert_called_once_with([{'key': 'a'}, {'key': 'b'}], [True, False])
+            mock_search.assert_called_once_with("dune", show_loading=False)
+        
+        assert app.current_user == "bob"
+        assert app.library_owner == 7
+        assert app.user_books_count == 1
+    
+    def test_restore_snapshot_of_other_user_is_ignored(self, tmp_path):
+        app = self.make_app(tmp_path, username="alice")
+        app.session_snapshot.save("bob", 7, "search", "dune", [{'key': 'a'}], ['a'], 1)
+        
+        with patch.object(app, 'query_one') as mock_query:
+            app.restore_snapshot()
+            
+            mock_query.assert_not_called()
+        assert app.library_keys == {}
+    
+    def test_library_snapshot_revalidates_after_login(self, tmp_path):
+        app = self.make_app(tmp_path)
+        app.session_snapshot.save("bob", 7, "library", "dune", [{'key': 'a'}], ['a'], 1)
+        
+        with patch.object(app, 'query_one', return_value=Mock()):
+            app.restore_snapshot()
+        
+        with patch.object(app, '_update_library_keys_full'), \
+                patch.object(app, 'showMainContainer'), \
+                patch.object(app, 'update_user_info_display'), \
+                patch.object(app, 'search_personal_library') as mock_search:
+            app.on_auto_login_finished(AutoLoginFinished(True))
+            
+            mock_search.assert_called_once_with("dune", show_loading=False)
+    
+    def test_failed_login_drops_restored_library(self, tmp_path):
+        app = self.make_app(tmp_path)
+        app.session_snapshot.save("bob", 7, "library", "dune", [], ['a'], 1)
+        
+        with patch.object(app, 'query_one', return_value=Mock()):
+            app.restore_snapshot()
+            app.on_auto_login_finished(AutoLoginFinished(False))
+        
+        assert app.current_user == "Гость"
+        assert app.library_keys == {}
+        assert app.library_owner is None
+        assert app.user_books_count == 0
+    
+    def test_quiet_search_skips_loading_indicator(self):
+        app = LibApp()
+        
+        with patch.object(app, 'run_worker') as mock_run_worker, \
+                patch.object(app, 'set_results_loading') as mock_loading, \
+                patch.object(app.workers, 'cancel_group'):
+            app.search_books("dune", show_loading=False)
+            mock_run_worker.call_args[0][0].close()
+            
+            mock_loading.assert_not_called()
+            assert app.revalidating_generation == app.search_generation
+    
+    def test_unchanged_revalidated_results_are_not_redisplayed(self):
+        app = LibApp()
+        app.search_generation = 3
+        app.revalidating_generation = 3
+        books_data = [{'title': 'Dune', 'key': 'a'}]
+        mock_right_pane = Mock()
+        mock_right_pane.books = [app.make_book(book_data) for book_data in books_data]
+        
+        with patch.object(app, 'query_one', return_value=mock_right_pane), \
+                patch.object(app, 'display_books') as mock_display, \
+                patch.object(app, 'prefetch_page'):
+            app.on_books_loaded(BooksLoaded(books_data, 3))
+            
+            mock_display.assert_not_called()
+            
+            app.on_books_loaded(BooksLoaded([{'title': 'Dune 2', 'key': 'b'}], 3))
+            
+            mock_display.assert_called_once()
 
 
 class TestLibAppBookFocusNavigation:
@@ -304,221 +1049,378 @@ class TestLibAppBookFocusNavigation:
         
         assert app.last_focused_book == mock_book_container
     
-    def test_action_focus_next_book_with_focus(self):
+    def test_action_focus_next_book(self):
+        app = LibApp()
+        
+        mock_right_pane = Mock()
+        
+        with patch.object(app, 'query_one', return_value=mock_right_pane):
+            with patch.object(app, 'is_focus_on_books', return_value=True):
+                app.action_focus_next_book()
+                
+                mock_right_pane.focus_step.assert_called_once_with(1, True)
+    
+    def test_action_focus_previous_book(self):
+        app = LibApp()
+        
+        mock_right_pane = Mock()
+        
+        with patch.object(app, 'query_one', return_value=mock_right_pane):
+            with patch.object(app, 'is_focus_on_books', return_value=False):
+                app.action_focus_previous_book()
+                
+                mock_right_pane.focus_step.assert_called_once_with(-1, False)
+
+
+class TestLibAppNetworkAPIMethods:
+    
+    def make_logged_in_app(self, tmp_path):
         app = LibApp()
+        app.userid = "test_user"
+        app.session_token = "test_token"
+        app.mutation_queue = MutationQueue(str(tmp_path / "pending.json"))
+        return app
+    
+    def test_add_book_to_library_queues_mutation(self, tmp_path):
+        app = self.make_logged_in_app(tmp_path)
         
-        mock_book1 = Mock()
-        mock_book2 = Mock()
-        mock_book3 = Mock()
-        app.book_containers = [mock_book1, mock_book2, mock_book3]
+        with patch.object(app, 'schedule_mutation_flush') as mock_schedule:
+            with patch.object(app, 'update_user_info_display'):
+                assert app.add_book_to_library(make_stored_book('/works/OL12345W')) is True
+                
+                mock_schedule.assert_called_once()
+                assert app.mutation_queue.effective()['/works/OL12345W'][0] is True
+    
+    def test_add_book_to_library_no_credentials_skips_queue(self, tmp_path):
+        app = LibApp()
+        app.mutation_queue = MutationQueue(str(tmp_path / "pending.json"))
         
-        with patch.object(app, 'is_focus_on_books') as mock_is_focus:
-            mock_is_focus.return_value = True
+        with patch.object(app, 'schedule_mutation_flush') as mock_schedule:
+            app.add_book_to_library({'key': '/works/OL12345W'})
             
-            with patch.object(app, 'get_current_book_index') as mock_get_index:
-                mock_get_index.return_value = 1
+            mock_schedule.assert_not_called()
+            assert len(app.mutation_queue) == 0
+    
+    def test_add_book_to_library_is_optimistic(self, tmp_path):
+        app = self.make_logged_in_app(tmp_path)
+        
+        with patch.object(app, 'schedule_mutation_flush'):
+            with patch.object(app, 'update_user_info_display'):
+                app.add_book_to_library(make_stored_book('/works/OL12345W'))
                 
-                app.action_focus_next_book()
+                assert '/works/OL12345W' in app.library_keys
+                assert app.user_books_count == 1
+                assert app.library_version == 1
+    
+    def test_add_book_to_library_rejects_incomplete_book(self, tmp_path):
+        app = self.make_logged_in_app(tmp_path)
+        book = dict(make_stored_book('/works/OL1W'), cover_i=0, year='Неизвестен')
+        
+        with patch.object(app, 'schedule_mutation_flush') as mock_schedule, \
+                patch.object(app, 'notify') as mock_notify:
+            assert app.add_book_to_library(book) is False
+            
+            mock_schedule.assert_not_called()
+            mock_notify.assert_called_once()
+            assert len(app.mutation_queue) == 0
+            assert app.library_keys == {}
+    
+    def test_remove_book_from_library_is_optimistic(self, tmp_path):
+        app = self.make_logged_in_app(tmp_path)
+        app.library_keys = {'/works/OL12345W': True, '/works/OL2W': True}
+        app.user_books_count = 2
+        
+        with patch.object(app, 'schedule_mutation_flush'):
+            with patch.object(app, 'update_user_info_display'):
+                app.remove_book_from_library({'key': '/works/OL12345W'})
+                
+                assert app.library_keys == {'/works/OL2W': True}
+                assert app.user_books_count == 1
+    
+    def test_rapid_toggle_coalesces_to_nothing(self, tmp_path):
+        app = self.make_logged_in_app(tmp_path)
+        book = make_stored_book('/works/OL12345W')
+        
+        with patch.object(app, 'schedule_mutation_flush'):
+            with patch.object(app, 'update_user_info_display'):
+                for i in range(5):
+                    app.add_book_to_library(book)
+                    app.remove_book_from_library(book)
+                
+                with patch.object(app, 'run_worker') as mock_run_worker:
+                    app.flush_mutations()
+                    
+                    mock_run_worker.assert_not_called()
+    
+    def test_flush_mutations_sends_one_batch(self, tmp_path):
+        app = self.make_logged_in_app(tmp_path)
+        
+        with patch.object(app, 'schedule_mutation_flush'):
+            with patch.object(app, 'update_user_info_display'):
+                app.add_book_to_library(make_stored_book('a'))
+                app.add_book_to_library(make_stored_book('b'))
+                app.remove_book_from_library({'key': 'c'})
+        
+        with patch.object(app, 'request_batch', return_value=True) as mock_request:
+            with patch.object(app, 'post_message') as mock_post:
+                with patch.object(app, 'run_worker') as mock_run_worker:
+                    app.flush_mutations()
+                    
+                    mock_run_worker.assert_called_once()
+                    asyncio.run(mock_run_worker.call_args[0][0])
+                    
+                    mock_request.assert_called_once_with([make_stored_book('a'), make_stored_book('b')], [{'key': 'c'}])
+                    assert isinstance(mock_post.call_args[0][0], LibraryBatchMutated)
+    
+    def test_batch_success_completes_queue(self, tmp_path):
+        app = self.make_logged_in_app(tmp_path)
+        app.mutation_queue.enqueue({'key': 'k'}, True)
+        app.mutation_queue.take()
+        
+        with patch.object(app, '_update_library_keys_full') as mock_update:
+            app.on_library_batch_mutated(LibraryBatchMutated([{'key': 'k'}], [], True, app.mutation_queue.batch))
+            
+            mock_update.assert_not_called()
+            assert len(app.mutation_queue) == 0
+            assert app.mutations_since_sync == 1
+    
+    def test_batch_success_reconciles_periodically(self, tmp_path):
+        app = self.make_logged_in_app(tmp_path)
+        app.mutations_since_sync = app.library_sync_interval - 1
+        app.mutation_queue.enqueue({'key': 'k'}, True)
+        app.mutation_queue.take()
+        
+        with patch.object(app, '_update_library_keys_full') as mock_update:
+            app.on_library_batch_mutated(LibraryBatchMutated([{'key': 'k'}], [], True, app.mutation_queue.batch))
+            
+            mock_update.assert_called_once()
+    
+    def test_batch_success_checks_shown_results_without_local_library(self, tmp_path):
+        app = self.make_logged_in_app(tmp_path)
+        app.mutations_since_sync = app.library_sync_interval - 1
+        app.mutation_queue.enqueue({'key': 'k'}, True)
+        app.mutation_queue.take()
+        app.results_pane = Mock()
+        app.results_pane.books = [{'key': 'a'}, {'key': 'b'}]
+        
+        with patch.object(app, '_update_library_keys_full') as mock_update, \
+                patch.object(app, 'check_results_membership') as mock_check:
+            app.on_library_batch_mutated(LibraryBatchMutated([{'key': 'k'}], [], True, app.mutation_queue.batch))
+            
+            mock_update.assert_not_called()
+            mock_check.assert_called_once_with([{'key': 'a'}, {'key': 'b'}])
+    
+    def test_batch_failure_retries_later(self, tmp_path):
+        app = self.make_logged_in_app(tmp_path)
+        app.mutation_queue.enqueue({'key': 'k'}, True)
+        app.mutation_queue.take()
+        
+        with patch.object(app, 'schedule_mutation_flush') as mock_schedule:
+            with patch.object(app, '_set_results_membership') as mock_set_added:
+                app.on_library_batch_mutated(LibraryBatchMutated([{'key': 'k'}], [], False, app.mutation_queue.batch))
+                
+                mock_schedule.assert_called_once_with(app.mutation_retry_delay)
+                mock_set_added.assert_not_called()
+                assert len(app.mutation_queue) == 1
+    
+    def test_batch_failure_rolls_back_after_retries(self, tmp_path):
+        app = self.make_logged_in_app(tmp_path)
+        app.mutation_queue.max_attempts = 1
+        app.library_keys = {'k': True}
+        app.user_books_count = 1
+        app.mutation_queue.enqueue({'key': 'k'}, True)
+        app.mutation_queue.take()
+        
+        with patch.object(app, 'update_user_info_display'):
+            with patch.object(app, '_set_results_membership') as mock_set_added:
+                app.on_library_batch_mutated(LibraryBatchMutated([{'key': 'k'}], [], False, app.mutation_queue.batch))
                 
-                mock_book2.focus.assert_not_called()  # Текущая
-                mock_book3.focus.assert_called_once()  # Следующая
+                assert app.library_keys == {}
+                assert app.user_books_count == 0
+                mock_set_added.assert_called_once_with({'k': False})
+    
+    def test_stale_batch_result_is_ignored(self, tmp_path):
+        app = self.make_logged_in_app(tmp_path)
+        app.mutation_queue.enqueue({'key': 'k'}, True)
+        app.mutation_queue.take()
+        stale = app.mutation_queue.batch - 1
+        
+        with patch.object(app, 'schedule_mutation_flush') as mock_schedule:
+            app.on_library_batch_mutated(LibraryBatchMutated([{'key': 'k'}], [], False, stale))
+            
+            mock_schedule.assert_not_called()
+            assert list(app.mutation_queue.in_flight) == ['k']
     
-    def test_action_focus_next_book_without_focus(self):
-        app = LibApp()
-        
-        mock_book1 = Mock()
-        mock_book2 = Mock()
-        app.book_containers = [mock_book1, mock_book2]
-        app.last_focused_book = mock_book2
+    def test_flush_without_session_keeps_queue(self, tmp_path):
+        app = self.make_logged_in_app(tmp_path)
+        app.mutation_queue.enqueue({'key': 'k'}, True)
+        app.session_token = None
         
-        with patch.object(app, 'is_focus_on_books') as mock_is_focus:
-            mock_is_focus.return_value = False
+        with patch.object(app, 'run_worker') as mock_run_worker:
+            app.flush_mutations()
             
-            app.action_focus_next_book()
+            mock_run_worker.assert_not_called()
+            assert list(app.mutation_queue.pending) == ['k']
+    
+    def test_logout_keeps_pending_mutations_for_owner(self, tmp_path):
+        app = self.make_logged_in_app(tmp_path)
+        app.mutation_queue.load("test_user")
+        timer = Mock()
+        app.mutation_flush_timer = timer
+        app.mutation_queue.enqueue(make_stored_book('a'), True)
+        app.mutation_queue.take()
+        app.mutation_queue.enqueue(make_stored_book('b'), True)
+        batch = app.mutation_queue.batch
+        
+        with patch.object(app, 'clear_config'), \
+                patch.object(app, 'hideMainContainer'), \
+                patch.object(app, 'show_login_screen'), \
+                patch.object(app, 'update_user_info_display'), \
+                patch.object(app.io_executor, 'submit'):
+            app.logout()
+        
+        timer.stop.assert_called_once()
+        assert len(app.mutation_queue) == 0
+        app.on_library_batch_mutated(LibraryBatchMutated([make_stored_book('a')], [], False, batch))
+        
+        restored = MutationQueue(app.mutation_queue.path)
+        restored.load("test_user")
+        assert set(restored.pending) == {'a', 'b'}
+        assert all(entry["attempts"] == 0 for entry in restored.pending.values())
+    
+    def test_flush_mutations_now_on_exit(self, tmp_path):
+        app = self.make_logged_in_app(tmp_path)
+        app.mutation_queue.enqueue({'key': 'k'}, False)
+        
+        with patch.object(app, 'request_batch', return_value=True) as mock_request:
+            app.flush_mutations_now()
             
-            mock_book2.focus.assert_called_once()
+            mock_request.assert_called_once_with([], [{'key': 'k'}])
+            assert len(app.mutation_queue) == 0
     
-    def test_action_focus_next_book_without_focus_no_last(self):
-        app = LibApp()
+    def test_pending_mutations_restored_for_owner(self, tmp_path):
+        path = str(tmp_path / "pending.json")
+        queue = MutationQueue(path)
+        queue.load("test_user")
+        queue.enqueue({'key': 'k', 'title': 'T'}, True)
         
-        mock_book1 = Mock()
-        mock_book2 = Mock()
-        app.book_containers = [mock_book1, mock_book2]
-        app.last_focused_book = None
+        app = self.make_logged_in_app(tmp_path)
+        app.mutation_queue = MutationQueue(path)
         
-        with patch.object(app, 'is_focus_on_books') as mock_is_focus:
-            mock_is_focus.return_value = False
+        with patch.object(app, 'schedule_mutation_flush') as mock_schedule:
+            app._reset_library_copy_if_needed()
             
-            app.action_focus_next_book()
+            mock_schedule.assert_called_once()
+            assert app.library_keys == {'k': True}
+            assert 'k' in app.library_index.books
+    
+    def test_pending_mutations_survive_delta_sync(self, tmp_path):
+        app = self.make_logged_in_app(tmp_path)
+        app.mutation_queue.enqueue({'key': 'k'}, False)
+        
+        with patch.object(app, 'update_user_info_display'):
+            app._apply_library_changes({'version': 1, 'added': [{'key': 'k'}, {'key': 'j'}], 'removed': []})
             
-            mock_book1.focus.assert_called_once()
+            assert app.library_keys == {'j': True}
     
-    def test_action_focus_previous_book_wrap_around(self):
+    def test_stale_library_snapshot_is_ignored(self):
         app = LibApp()
+        app.library_keys = {'k': True}
+        app.library_version = 3
         
-        mock_book1 = Mock()
-        mock_book2 = Mock()
-        mock_book3 = Mock()
-        app.book_containers = [mock_book1, mock_book2, mock_book3]
-        
-        with patch.object(app, 'is_focus_on_books') as mock_is_focus:
-            mock_is_focus.return_value = True
+        with patch.object(app, 'update_user_info_display'):
+            app.on_library_changed(LibraryChanged({'version': 9, 'reset': True}, version=2))
             
-            with patch.object(app, 'get_current_book_index') as mock_get_index:
-                mock_get_index.return_value = 0  # Первая книга
-                
-                app.action_focus_previous_book()
-                
-                mock_book3.focus.assert_called_once()
+            assert app.library_keys == {'k': True}
 
 
-class TestLibAppNetworkAPIMethods:
+class TestLibAppBatchMethods:
     
-    def test_add_book_to_library_success(self):
+    def make_app(self):
         app = LibApp()
         app.userid = "test_user"
-        app.password = "test_pass"
-        
-        book = {
-            'title': 'Test Book',
-            'author': 'Test Author',
-            'year': 2023,
-            'cover_i': 12345,
-            'key': '/works/OL12345W',
-            'language': 'eng'
-        }
-        
-        mock_response_data = {
-            'success': True,
-            'message': 'Book added'
-        }
-        
-        with patch('LibApp.requests.post') as mock_post:
-            mock_response = Mock()
-            mock_response.status_code = 200
-            mock_response.json.return_value = mock_response_data
-            mock_post.return_value = mock_response
-            
-            with patch.object(app, '_update_library_keys_full') as mock_update:
-                with patch.object(app, 'update_user_info_display') as mock_update_display:
-                    result = app.add_book_to_library(book)
-                    
-                    expected_url = f"{app.base_url}/lib/addbook"
-                    expected_data = {
-                        "userid": "test_user",
-                        "password": "test_pass",
-                        "cover_i": 12345,
-                        "first_year_publish": 2023,
-                        "key": '/works/OL12345W',
-                        "language": 'eng',
-                        "title": 'Test Book'
-                    }
-                    mock_post.assert_called_once_with(expected_url, json=expected_data, timeout=10)
-                    
-                    mock_update.assert_called_once()
-                    mock_update_display.assert_called_once()
-                    
-                    assert result is True
+        app.session_token = "test_token"
+        return app
     
-    def test_add_book_to_library_failure(self):
-        app = LibApp()
-        app.userid = "test_user"
-        app.password = "test_pass"
-        
-        book = {
-            'title': 'Test Book',
-            'key': '/works/OL12345W'
-        }
-        
-        mock_response_data = {
-            'success': False,
-            'message': 'Error'
-        }
+    def test_request_batch_success(self):
+        app = self.make_app()
+        book = {'key': '/works/OL1W', 'title': 'Book', 'author': ['A'], 'year': 2000, 'cover_i': 1, 'language': ['eng']}
         
-        with patch('LibApp.requests.post') as mock_post:
+        with patch.object(app.backend, 'post') as mock_post:
             mock_response = Mock()
             mock_response.status_code = 200
-            mock_response.json.return_value = mock_response_data
+            mock_response.json.return_value = {'success': True}
             mock_post.return_value = mock_response
             
-            result = app.add_book_to_library(book)
+            result = app.request_batch([book], [{'key': '/works/OL2W'}])
             
-            assert result is False
+            assert result is True
+            endpoint, data = mock_post.call_args[0]
+            assert endpoint == "/lib/batch"
+            assert data['token'] == "test_token"
+            assert 'password' not in data
+            assert data['add'] == [app.library_entry(book)]
+            assert data['remove'] == ['/works/OL2W']
     
-    def test_add_book_to_library_no_credentials(self):
+    def test_request_batch_no_credentials(self):
         app = LibApp()
-        app.userid = None
-        app.password = None
-        
-        book = {'title': 'Test Book'}
-        
-        result = app.add_book_to_library(book)
         
-        assert result is False
+        with patch.object(app.backend, 'post') as mock_post:
+            assert app.request_batch([{'key': 'k'}], []) is False
+            mock_post.assert_not_called()
     
-    def test_add_book_to_library_network_error(self):
-        app = LibApp()
-        app.userid = "test_user"
-        app.password = "test_pass"
+    def test_request_batch_network_error(self):
+        app = self.make_app()
         
-        with patch('LibApp.requests.post') as mock_post:
-            mock_post.side_effect = Exception("Network error")
-            
-            result = app.add_book_to_library({'title': 'Test Book'})
-            
-            assert result is False
+        with patch.object(app.backend, 'post', side_effect=Exception("Network error")):
+            assert app.request_batch([], [{'key': 'k'}]) is False
     
-    def test_remove_book_from_library_success(self):
-        app = LibApp()
-        app.userid = "test_user"
-        app.password = "test_pass"
-        
-        book = {
-            'key': '/works/OL12345W',
-            'title': 'Test Book'
-        }
-        
-        mock_response_data = {
-            'success': True,
-            'message': 'Book removed'
-        }
+    def test_commit_selection_sends_one_batch(self, tmp_path):
+        app = self.make_app()
+        app.mutation_queue = MutationQueue(str(tmp_path / "pending.json"))
+        app.library_keys = {'in_lib': True}
+        mock_right_pane = Mock()
+        mock_right_pane.take_selection.return_value = [make_stored_book('new'), {'key': 'in_lib'}]
         
-        with patch('LibApp.requests.post') as mock_post:
-            mock_response = Mock()
-            mock_response.status_code = 200
-            mock_response.json.return_value = mock_response_data
-            mock_post.return_value = mock_response
-            
-            with patch.object(app, '_update_library_keys_full') as mock_update:
-                with patch.object(app, 'update_user_info_display') as mock_update_display:
-                    result = app.remove_book_from_library(book)
-                    
-                    expected_url = f"{app.base_url}/lib/removebook"
-                    expected_data = {
-                        "userid": "test_user",
-                        "password": "test_pass",
-                        "key": '/works/OL12345W'
-                    }
-                    mock_post.assert_called_once_with(expected_url, json=expected_data, timeout=10)
-                    
-                    mock_update.assert_called_once()
-                    mock_update_display.assert_called_once()
+        with patch.object(app, 'query_one', return_value=mock_right_pane):
+            with patch.object(app, 'update_user_info_display'):
+                with patch.object(app, 'run_worker') as mock_run_worker:
+                    app.action_commit_selection()
                     
-                    assert result is True
+                    mock_run_worker.assert_called_once()
+                    mock_run_worker.call_args[0][0].close()
+                    assert app.library_keys == {'new': True}
+                    assert set(app.mutation_queue.in_flight) == {'new', 'in_lib'}
+                    mock_right_pane.set_added.assert_any_call('new', True)
+                    mock_right_pane.set_added.assert_any_call('in_lib', False)
     
-    def test_remove_book_from_library_failure(self):
-        app = LibApp()
-        
-        book = {'key': '/works/OL12345W'}
-        
-        with patch('LibApp.requests.post') as mock_post:
-            mock_response = Mock()
-            mock_response.status_code = 500
-            mock_post.return_value = mock_response
-            
-            result = app.remove_book_from_library(book)
+    def test_commit_selection_skips_incomplete_books(self, tmp_path):
+        app = self.make_app()
+        app.mutation_queue = MutationQueue(str(tmp_path / "pending.json"))
+        mock_right_pane = Mock()
+        mock_right_pane.take_selection.return_value = [make_stored_book('new'), {'key': 'no_cover'}]
+        
+        with patch.object(app, 'query_one', return_value=mock_right_pane), \
+                patch.object(app, 'update_user_info_display'), \
+                patch.object(app, 'notify') as mock_notify, \
+                patch.object(app, 'run_worker') as mock_run_worker:
+            app.action_commit_selection()
+            mock_run_worker.call_args[0][0].close()
             
-            assert result is False
+            assert app.library_keys == {'new': True}
+            assert set(app.mutation_queue.in_flight) == {'new'}
+            mock_notify.assert_called_once()
+    
+    def test_commit_selection_empty(self):
+        app = self.make_app()
+        mock_right_pane = Mock()
+        mock_right_pane.take_selection.return_value = []
+        
+        with patch.object(app, 'query_one', return_value=mock_right_pane):
+            with patch.object(app, 'run_worker') as mock_run_worker:
+                app.action_commit_selection()
+                
+                mock_run_worker.assert_not_called()
 
 
 class TestLibAppLoginMethods:
@@ -532,10 +1434,11 @@ class TestLibAppLoginMethods:
         mock_response_data = {
             'success': True,
             'userid': 'user123',
+            'token': 'token123',
             'message': 'Login successful'
         }
         
-        with patch('LibApp.requests.post') as mock_post:
+        with patch.object(app.backend, 'post') as mock_post:
             mock_response = Mock()
             mock_response.status_code = 200
             mock_response.json.return_value = mock_response_data
@@ -543,16 +1446,16 @@ class TestLibAppLoginMethods:
             
             result = app._handle_login_backend(username, password)
             
-            expected_url = f"{app.base_url}/login"
             expected_data = {
                 "username": username,
                 "password": password
             }
-            mock_post.assert_called_once_with(expected_url, json=expected_data)
+            mock_post.assert_called_once_with("/login", expected_data)
             
             assert app.current_user == username
             assert app.userid == 'user123'
             assert app.password == password
+            assert app.session_token == 'token123'
             
             assert result is True
     
@@ -564,7 +1467,7 @@ class TestLibAppLoginMethods:
             'message': 'Invalid credentials'
         }
         
-        with patch('LibApp.requests.post') as mock_post:
+        with patch.object(app.backend, 'post') as mock_post:
             mock_response = Mock()
             mock_response.status_code = 200
             mock_response.json.return_value = mock_response_data
@@ -578,7 +1481,7 @@ class TestLibAppLoginMethods:
     def test_handle_login_backend_network_error(self):
         app = LibApp()
         
-        with patch('LibApp.requests.post') as mock_post:
+        with patch.object(app.backend, 'post') as mock_post:
             mock_post.side_effect = Exception("Network error")
             
             result = app._handle_login_backend("user", "pass")
@@ -594,10 +1497,11 @@ class TestLibAppLoginMethods:
         mock_response_data = {
             'success': True,
             'userid': 'newuser123',
+            'token': 'newtoken123',
             'message': 'Registration successful'
         }
         
-        with patch('LibApp.requests.post') as mock_post:
+        with patch.object(app.backend, 'post') as mock_post:
             mock_response = Mock()
             mock_response.status_code = 200
             mock_response.json.return_value = mock_response_data
@@ -608,9 +1512,159 @@ class TestLibAppLoginMethods:
             assert app.current_user == username
             assert app.userid == 'newuser123'
             assert app.password == password
+            assert app.session_token == 'newtoken123'
             
             assert result is True
     
+    def test_handle_login_backend_keeps_bootstrap(self):
+        app = LibApp()
+        
+        with patch.object(app.backend, 'post') as mock_post:
+            mock_response = Mock()
+            mock_response.status_code = 200
+            mock_response.json.return_value = {
+                'success': True,
+                'userid': 'user123',
+                'token': 'token123',
+                'book_count': 2,
+                'keys': ['/works/OL1W', '/works/OL2W']
+            }
+            mock_post.return_value = mock_response
+            
+            assert app._handle_login_backend("test_user", "test_pass") is True
+            assert app.login_bootstrap == {'keys': ['/works/OL1W', '/works/OL2W'], 'book_count': 2}
+    
+    def test_apply_login_bootstrap_sets_keys_without_fetching_library(self, tmp_path):
+        app = LibApp()
+        app.userid = "user123"
+        app.mutation_queue = MutationQueue(str(tmp_path / "pending.json"))
+        app.login_bootstrap = {'keys': ['/works/OL1W', '/works/OL2W'], 'book_count': 2}
+        
+        with patch.object(app, 'run_worker') as mock_run_worker, \
+                patch.object(app, 'update_user_info_display'):
+            app._apply_login_bootstrap()
+            
+            mock_run_worker.assert_not_called()
+            assert app.library_keys == {'/works/OL1W': True, '/works/OL2W': True}
+            assert app.user_books_count == 2
+            assert app.library_owner == "user123"
+            assert app.library_loaded is False
+            assert app.library_keys_known is True
+            assert app.login_bootstrap is None
+    
+    def test_apply_login_bootstrap_overlays_pending_mutations(self, tmp_path):
+        app = LibApp()
+        app.userid = "user123"
+        app.mutation_queue = MutationQueue(str(tmp_path / "pending.json"))
+        app.mutation_queue.load("user123")
+        app.mutation_queue.enqueue({'key': '/works/OL3W'}, True)
+        app.mutation_queue.enqueue({'key': '/works/OL1W'}, False)
+        app.login_bootstrap = {'keys': ['/works/OL1W', '/works/OL2W'], 'book_count': 2}
+        
+        with patch.object(app, 'schedule_mutation_flush') as mock_schedule, \
+                patch.object(app, 'update_user_info_display'):
+            app._apply_login_bootstrap()
+            
+            mock_schedule.assert_called_once()
+            assert app.library_keys == {'/works/OL2W': True, '/works/OL3W': True}
+            assert app.user_books_count == 2
+    
+    def test_apply_login_bootstrap_falls_back_to_full_sync(self):
+        app = LibApp()
+        app.login_bootstrap = None
+        
+        with patch.object(app, '_update_library_keys_full') as mock_update:
+            app._apply_login_bootstrap()
+            
+            mock_update.assert_called_once()
+    
+    def test_post_session_sends_token(self):
+        app = LibApp()
+        app.session_token = "test_token"
+        
+        with patch.object(app.backend, 'post') as mock_post:
+            mock_post.return_value = Mock(status_code=200)
+            
+            app.post_session("/lib", {"query": "dune"}, headers=None)
+            
+            mock_post.assert_called_once_with("/lib", {"token": "test_token", "query": "dune"}, headers=None)
+    
+    def test_post_session_renews_expired_token(self):
+        app = LibApp()
+        app.current_user = "test_user"
+        app.userid = "user123"
+        app.password = "test_pass"
+        app.session_token = "old_token"
+        
+        login_response = Mock(status_code=200)
+        login_response.json.return_value = {'success': True, 'userid': 'user123', 'token': 'new_token'}
+        with patch.object(app.backend, 'post') as mock_post:
+            mock_post.side_effect = [Mock(status_code=401), login_response, Mock(status_code=200)]
+            
+            response = app.post_session("/lib/changes", {"since": 0})
+            
+            assert response.status_code == 200
+            assert app.session_token == "new_token"
+            assert mock_post.call_args_list[1] == call("/login", {"username": "test_user", "password": "test_pass"})
+            assert mock_post.call_args_list[2] == call("/lib/changes", {"token": "new_token", "since": 0})
+    
+    def test_post_session_gives_up_when_renewal_fails(self):
+        app = LibApp()
+        app.session_token = "old_token"
+        
+        with patch.object(app.backend, 'post') as mock_post:
+            mock_post.return_value = Mock(status_code=401)
+            
+            response = app.post_session("/lib", {"query": ""})
+            
+            assert response.status_code == 401
+            mock_post.assert_called_once()
+    
+    def test_post_session_renews_once_for_concurrent_requests(self):
+        app = LibApp()
+        app.current_user = "test_user"
+        app.userid = "user123"
+        app.password = "test_pass"
+        app.session_token = "old_token"
+        barrier = threading.Barrier(2)
+        logins = []
+        
+        def post(endpoint, data, **kwargs):
+            if endpoint == "/login":
+                logins.append(data)
+                response = Mock(status_code=200)
+                response.json.return_value = {'success': True, 'userid': 'user123', 'token': 'new_token'}
+                return response
+            if data["token"] == "old_token":
+                barrier.wait(timeout=5)
+                return Mock(status_code=401)
+            return Mock(status_code=200)
+        
+        with patch.object(app.backend, 'post', side_effect=post):
+            responses = []
+            threads = [threading.Thread(target=lambda: responses.append(app.post_session("/lib", {}))) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(timeout=5)
+        
+        assert [response.status_code for response in responses] == [200, 200]
+        assert len(logins) == 1
+    
+    def test_logout_ends_session(self):
+        app = LibApp()
+        app.userid = "user123"
+        app.session_token = "test_token"
+        
+        with patch.object(app.io_executor, 'submit') as mock_submit, \
+                patch.object(app, 'clear_config'), \
+                patch.object(app, 'show_login_screen'):
+            app.logout()
+            
+            mock_submit.assert_called_once_with(app.end_session, "test_token")
+            assert app.session_token is None
+            assert app.userid is None
+    
     def test_attempt_auto_login_success(self):
         app = LibApp()
         
@@ -620,18 +1674,29 @@ class TestLibAppLoginMethods:
             with patch.object(app, '_handle_login_backend') as mock_login:
                 mock_login.return_value = True
                 
+                with patch.object(app, 'run_worker') as mock_run_worker, \
+                        patch.object(app, 'post_message') as mock_post:
+                    app.attempt_auto_login()
+                    
+                    mock_get_creds.assert_called_once()
+                    mock_login.assert_not_called()
+                    assert mock_run_worker.call_args[1]['group'] == "login"
+                    asyncio.run(mock_run_worker.call_args[0][0])
+                    
+                    mock_login.assert_called_once_with("saved_user", "saved_pass")
+                    message = mock_post.call_args[0][0]
+                    assert isinstance(message, AutoLoginFinished)
+                    assert message.success is True
+                    assert app.auto_login_attempted is True
+                
                 with patch.object(app, '_update_library_keys_full') as mock_update:
                     with patch.object(app, 'showMainContainer') as mock_show:
                         with patch.object(app, 'update_user_info_display') as mock_update_display:
-                            app.attempt_auto_login()
+                            app.on_auto_login_finished(message)
                             
-                            mock_get_creds.assert_called_once()
-                            mock_login.assert_called_once_with("saved_user", "saved_pass")
                             mock_update.assert_called_once()
                             mock_show.assert_called_once()
                             mock_update_display.assert_called_once()
-                            
-                            assert app.auto_login_attempted is True
     
     def test_attempt_auto_login_no_credentials(self):
         app = LibApp()
@@ -657,12 +1722,21 @@ class TestLibAppLoginMethods:
             with patch.object(app, '_handle_login_backend') as mock_login:
                 mock_login.return_value = False
                 
-                with patch.object(app, 'showMainContainer') as mock_show:
-                    with patch.object(app, 'update_user_info_display') as mock_update_display:
-                        app.attempt_auto_login()
-                        
-                        mock_show.assert_called_once()
-                        mock_update_display.assert_called_once()
+                with patch.object(app, 'run_worker') as mock_run_worker, \
+                        patch.object(app, 'post_message') as mock_post:
+                    app.attempt_auto_login()
+                    asyncio.run(mock_run_worker.call_args[0][0])
+                    
+                    assert mock_post.call_args[0][0].success is False
+                
+                with patch.object(app, '_update_library_keys_full') as mock_update:
+                    with patch.object(app, 'showMainContainer') as mock_show:
+                        with patch.object(app, 'update_user_info_display') as mock_update_display:
+                            app.on_auto_login_finished(AutoLoginFinished(False))
+                            
+                            mock_update.assert_not_called()
+                            mock_show.assert_called_once()
+                            mock_update_display.assert_called_once()
 
 
 class TestLibAppScreenMethods:
@@ -670,8 +1744,8 @@ class TestLibAppScreenMethods:
     def test_show_login_screen(self):
         app = LibApp()
         
-        with patch('LibApp.LoginForm') as MockLoginForm:
-            with patch('LibApp.ScreenPop') as MockScreenPop:
+        with patch('LoginForm.LoginForm') as MockLoginForm:
+            with patch('ScreenPop.ScreenPop') as MockScreenPop:
                 mock_login_form = Mock()
                 mock_screen_pop = Mock()
                 
@@ -725,44 +1799,299 @@ class TestLibAppLibraryKeyMethods:
     def test_update_library_keys_full_success(self):
         app = LibApp()
         app.userid = "test_user"
-        app.password = "test_pass"
+        app.session_token = "test_token"
         
         mock_response_data = {
             'success': True,
-            'books': [
+            'version': 2,
+            'reset': False,
+            'added': [
                 {'key': 'key1', 'title': 'Book 1'},
                 {'key': 'key2', 'title': 'Book 2'}
-            ]
+            ],
+            'removed': []
         }
         
-        with patch('LibApp.requests.post') as mock_post:
+        with patch.object(app.backend, 'post') as mock_post:
             mock_response = Mock()
             mock_response.status_code = 200
             mock_response.json.return_value = mock_response_data
             mock_post.return_value = mock_response
             
-            with patch.object(app, '_update_library_keys') as mock_update:
-                with patch.object(app, 'update_user_info_display') as mock_update_display:
-                    app._update_library_keys_full()
-                    
-                    expected_url = f"{app.base_url}/lib"
-                    expected_data = {
-                        "userid": "test_user",
-                        "password": "test_pass",
-                        "query": ""
-                    }
-                    mock_post.assert_called_once_with(expected_url, json=expected_data)
-                    
-                    mock_update.assert_called_once_with(mock_response_data['books'])
-                    mock_update_display.assert_called_once()
+            changes = app.fetch_library_changes(0)
+            
+            expected_data = {
+                "token": "test_token",
+                "since": 0
+            }
+            mock_post.assert_called_once_with("/lib/changes", expected_data, cancel_token=None)
+            
+            with patch.object(app, 'update_user_info_display') as mock_update_display:
+                app.on_library_changed(LibraryChanged(changes))
+                
+                assert app.library_keys == {'key1': True, 'key2': True}
+                assert app.library_synced_version == 2
+                assert app.user_books_count == 2
+                mock_update_display.assert_called()
     
     def test_update_library_keys_full_failure(self):
         app = LibApp()
         
-        with patch('LibApp.requests.post') as mock_post:
+        with patch.object(app.backend, 'post') as mock_post:
             mock_post.side_effect = Exception("Network error")
             
+            changes = app.fetch_library_changes(0)
+            
+            with patch.object(app, '_apply_library_changes') as mock_apply:
+                app.on_library_changed(LibraryChanged(changes))
+                
+                mock_apply.assert_not_called()
+    
+    def test_apply_library_changes_delta(self):
+        app = LibApp()
+        app.library_index.add({'key': 'key1'})
+        app.library_index.add({'key': 'key2'})
+        app.library_synced_version = 4
+        
+        with patch.object(app, 'update_user_info_display'):
+            app._apply_library_changes({
+                'version': 6,
+                'added': [{'key': 'key3'}],
+                'removed': ['key1']
+            })
+            
+            assert set(app.library_index.books) == {'key2', 'key3'}
+            assert app.library_keys == {'key2': True, 'key3': True}
+            assert app.library_synced_version == 6
+    
+    def test_apply_library_changes_reset(self):
+        app = LibApp()
+        app.library_index.add({'key': 'key1'})
+        
+        with patch.object(app, 'update_user_info_display'):
+            app._apply_library_changes({
+                'version': 1,
+                'reset': True,
+                'added': [{'key': 'key2'}],
+                'removed': []
+            })
+            
+            assert set(app.library_index.books) == {'key2'}
+    
+    def test_library_copy_reset_for_other_user(self):
+        app = LibApp()
+        app.library_owner = "old_user"
+        app.library_index.add({'key': 'key1'})
+        app.library_synced_version = 5
+        app.userid = "new_user"
+        
+        with patch.object(app, 'run_worker') as mock_run_worker:
+            app._update_library_keys_full()
+            
+            assert len(app.library_index) == 0
+            assert app.library_synced_version == 0
+            assert app.library_owner == "new_user"
+            mock_run_worker.call_args[0][0].close()
+    
+    def test_refresh_library_task_sends_synced_version(self):
+        app = LibApp()
+        app.library_synced_version = 7
+        
+        with patch.object(app, 'fetch_library_changes', return_value=None) as mock_fetch:
+            with patch.object(app, 'post_message') as mock_post:
+                asyncio.run(app._refresh_library_task())
+                
+                mock_fetch.assert_called_once_with(7)
+                assert isinstance(mock_post.call_args[0][0], LibraryChanged)
+    
+    def test_search_library_task_first_search_syncs_once(self):
+        app = LibApp()
+        app.userid = "test_user"
+        app.library_owner = "test_user"
+        changes = {'version': 3, 'added': [{'key': 'b', 'title': 'B'}, {'key': 'a', 'title': 'A'}], 'removed': []}
+        
+        with patch.object(app, 'fetch_library_changes', return_value=changes) as mock_changes:
+            with patch.object(app, 'fetch_personal_library') as mock_full:
+                with patch.object(app, 'update_user_info_display'):
+                    with patch.object(app, 'post_message') as mock_post:
+                        asyncio.run(app._search_library_task("", 1, Mock()))
+                        
+                        mock_changes.assert_called_once()
+                        mock_full.assert_not_called()
+                        message = mock_post.call_args[0][0]
+                        assert [book['key'] for book in message.books] == ['a', 'b']
+    
+    def test_search_library_task_answers_from_index(self):
+        app = LibApp()
+        app.userid = "test_user"
+        app.library_owner = "test_user"
+        app.library_loaded = True
+        app.library_index.add({'key': 'a', 'title': 'Dune Messiah', 'author_name': ['Frank Herbert']})
+        app.library_index.add({'key': 'b', 'title': 'Dune', 'author_name': ['Frank Herbert']})
+        app.library_index.add({'key': 'c', 'title': 'Solaris', 'author_name': ['Stanislaw Lem']})
+        
+        with patch.object(app, 'fetch_library_changes') as mock_changes:
+            with patch.object(app, 'fetch_personal_library') as mock_full:
+                with patch.object(app, 'post_message') as mock_post:
+                    asyncio.run(app._search_library_task("dune", 1, Mock()))
+                    
+                    mock_changes.assert_not_called()
+                    mock_full.assert_not_called()
+                    message = mock_post.call_args[0][0]
+                    assert [book['key'] for book in message.books] == ['b', 'a']
+    
+    def test_search_library_task_falls_back_to_server(self):
+        app = LibApp()
+        app.userid = "test_user"
+        app.library_owner = "test_user"
+        
+        with patch.object(app, 'fetch_library_changes', return_value=None):
+            with patch.object(app, 'fetch_personal_library', return_value=[{'key': 'a'}]) as mock_full:
+                with patch.object(app, 'post_message') as mock_post:
+                    asyncio.run(app._search_library_task("dune", 1, Mock()))
+                    
+                    assert mock_full.call_args[0][0] == "dune"
+                    assert mock_post.call_args[0][0].books == [{'key': 'a'}]
+    
+    def test_optimistic_add_updates_local_copy(self):
+        app = LibApp()
+        
+        with patch.object(app, 'update_user_info_display'):
+            app._apply_library_mutation({'key': 'k', 'title': 'T', 'author': ['A'], 'year': 2000}, True)
+            
+            assert app.library_index.books['k']['title'] == 'T'
+            assert app.library_index.books['k']['author_name'] == ['A']
+            
+            app._apply_library_mutation({'key': 'k'}, False)
+            
+            assert 'k' not in app.library_index.books
+    
+    def test_update_library_keys_full_runs_worker(self):
+        app = LibApp()
+        
+        with patch.object(app, 'run_worker') as mock_run_worker:
             app._update_library_keys_full()
+            
+            mock_run_worker.assert_called_once()
+            mock_run_worker.call_args[0][0].close()
+    
+    def test_update_library_keys_refreshes_only_changed_rows(self):
+        app = LibApp()
+        app.library_keys = {'a': True, 'b': True}
+        mock_right_pane = Mock()
+        
+        with patch.object(app, 'query_one', return_value=mock_right_pane):
+            app._update_library_keys([{'key': 'b'}, {'key': 'c'}])
+            
+            assert app.library_keys == {'b': True, 'c': True}
+            mock_right_pane.update_membership.assert_called_once_with({'a': False, 'c': True})
+    
+    def test_update_library_keys_without_changes_skips_results(self):
+        app = LibApp()
+        app.library_keys = {'a': True}
+        mock_right_pane = Mock()
+        
+        with patch.object(app, 'query_one', return_value=mock_right_pane):
+            app._update_library_keys([{'key': 'a'}])
+            
+            mock_right_pane.update_membership.assert_not_called()
+    
+    def test_clear_library_copy_marks_results_not_added(self):
+        app = LibApp()
+        app.library_keys = {'a': True}
+        mock_right_pane = Mock()
+        
+        with patch.object(app, 'query_one', return_value=mock_right_pane):
+            app._clear_library_copy()
+            
+            assert app.library_keys == {}
+            mock_right_pane.update_membership.assert_called_once_with({'a': False})
+
+    
+    def test_fetch_library_membership(self):
+        app = LibApp()
+        app.session_token = "test_token"
+        
+        with patch.object(app.backend, 'post') as mock_post:
+            mock_response = Mock()
+            mock_response.status_code = 200
+            mock_response.json.return_value = {'success': True, 'keys': ['b']}
+            mock_post.return_value = mock_response
+            
+            assert app.fetch_library_membership(['a', 'b']) == ['b']
+            mock_post.assert_called_once_with("/lib/contains", {"token": "test_token", "keys": ['a', 'b']}, cancel_token=None)
+    
+    def test_fetch_library_membership_failure(self):
+        app = LibApp()
+        app.session_token = "test_token"
+        
+        with patch.object(app.backend, 'post') as mock_post:
+            mock_post.side_effect = Exception("Network error")
+            
+            assert app.fetch_library_membership(['a']) is None
+    
+    def test_check_results_membership_skips_loaded_library(self):
+        app = LibApp()
+        app.userid = "test_user"
+        app.session_token = "test_token"
+        app.library_loaded = True
+        
+        with patch.object(app, 'run_worker') as mock_run_worker:
+            app.check_results_membership([{'key': 'a'}])
+            
+            mock_run_worker.assert_not_called()
+    
+    def test_check_results_membership_sends_unique_keys_in_batches(self):
+        app = LibApp()
+        app.userid = "test_user"
+        app.session_token = "test_token"
+        app.membership_batch_limit = 2
+        
+        with patch.object(app, 'run_worker') as mock_run_worker, \
+                patch.object(app, 'fetch_library_membership', return_value=['a']) as mock_fetch, \
+                patch.object(app, 'post_message') as mock_post:
+            app.check_results_membership([{'key': 'a'}, {'key': 'b'}, {'key': 'a'}, {'key': ''}, {'key': 'c'}])
+            
+            assert mock_run_worker.call_count == 2
+            for worker_call in mock_run_worker.call_args_list:
+                assert worker_call[1]['group'] == "membership"
+                asyncio.run(worker_call[0][0])
+            
+            assert mock_fetch.call_args_list == [call(['a', 'b']), call(['c'])]
+            assert isinstance(mock_post.call_args[0][0], LibraryMembershipChecked)
+    
+    def test_membership_checked_updates_shown_keys(self, tmp_path):
+        app = LibApp()
+        app.mutation_queue = MutationQueue(str(tmp_path / "pending.json"))
+        app.library_keys = {'a': True, 'c': True}
+        mock_right_pane = Mock()
+        
+        with patch.object(app, 'query_one', return_value=mock_right_pane):
+            app.on_library_membership_checked(LibraryMembershipChecked(['a', 'b'], ['b'], app.library_version))
+            
+            assert app.library_keys == {'c': True, 'b': True}
+            assert app.user_books_count == 2
+    
+    def test_membership_checked_keeps_pending_mutations(self, tmp_path):
+        app = LibApp()
+        app.mutation_queue = MutationQueue(str(tmp_path / "pending.json"))
+        app.mutation_queue.enqueue({'key': 'a'}, True)
+        app.library_keys = {'a': True}
+        
+        with patch.object(app, 'query_one', return_value=Mock()):
+            app.on_library_membership_checked(LibraryMembershipChecked(['a'], [], app.library_version))
+            
+            assert app.library_keys == {'a': True}
+    
+    def test_membership_checked_drops_stale_answer(self, tmp_path):
+        app = LibApp()
+        app.library_keys = {'a': True}
+        app.library_version = 3
+        
+        app.on_library_membership_checked(LibraryMembershipChecked(['a'], [], 2))
+        app.on_library_membership_checked(LibraryMembershipChecked(['a'], None, 3))
+        
+        assert app.library_keys == {'a': True}
 
 
 if __name__ == "__main__":
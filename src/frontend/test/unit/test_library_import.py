@@ -0,0 +1,250 @@
+import pytest
+import io
+import json
+import sys
+import os
+
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+try:
+    from libraryImport import LibraryImporter, ImportProgress, login, logout, main
+except ImportError as e:
+    print(f"Ошибка импорта: {e}")
+    raise
+
+
+def make_doc(index):
+    return {
+        'key': f'/works/OL{index}W',
+        'title': f'Book {index}',
+        'author_name': ['Author'],
+        'first_publish_year': 2000,
+        'cover_i': index + 1,
+        'language': ['eng']
+    }
+
+
+def make_response(status_code=200, data=None):
+    response = Mock()
+    response.status_code = status_code
+    response.json.return_value = data if data is not None else {}
+    return response
+
+
+def write_jsonl(path, docs):
+    with open(path, "w", encoding="utf-8") as f:
+        for doc in docs:
+            f.write(json.dumps(doc) + "\n")
+
+
+@pytest.fixture
+def backend():
+    backend = Mock()
+    backend.post.return_value = make_response(data={'success': True})
+    return backend
+
+
+@pytest.fixture
+def search_client():
+    search_client = Mock()
+    search_client.get.return_value = make_response(data={'docs': [make_doc(99)]})
+    return search_client
+
+
+def make_importer(backend, search_client, tmp_path, **kwargs):
+    kwargs.setdefault('batch_size', 2)
+    kwargs.setdefault('concurrency', 2)
+    kwargs.setdefault('retry_delay', 0)
+    kwargs.setdefault('state_path', str(tmp_path / "state.json"))
+    return LibraryImporter(backend, search_client, 1, 'token', **kwargs)
+
+
+class TestLibraryImporterRows:
+
+    def test_read_jsonl_skips_blank_and_keeps_broken_lines(self, tmp_path):
+        path = tmp_path / "books.jsonl"
+        path.write_text('{"key": "/works/OL1W"}\n\nnot json\n', encoding="utf-8")
+
+        rows = list(LibraryImporter.read_rows(str(path)))
+
+        assert rows == [{'key': '/works/OL1W'}, {}]
+
+    def test_read_books_json(self, tmp_path):
+        path = tmp_path / "books.json"
+        path.write_text(json.dumps({'docs': [make_doc(1), make_doc(2)]}), encoding="utf-8")
+
+        rows = list(LibraryImporter.read_rows(str(path)))
+
+        assert [row['key'] for row in rows] == ['/works/OL1W', '/works/OL2W']
+
+    def test_read_json_docs_across_chunks(self):
+        text = json.dumps({'numFound': 12345, 'q': {'nested': [1, ']']}, 'docs': [make_doc(1), 7, make_doc(2)], 'tail': 1})
+
+        docs = list(LibraryImporter.read_json_docs(io.StringIO(text), chunk_size=3))
+
+        assert docs == [make_doc(1), 7, make_doc(2)]
+
+    def test_read_json_top_level_list(self):
+        docs = list(LibraryImporter.read_json_docs(io.StringIO('[{"key": "/works/OL1W"}, 12345]'), chunk_size=4))
+
+        assert docs == [{'key': '/works/OL1W'}, 12345]
+
+    def test_read_json_without_docs(self):
+        assert list(LibraryImporter.read_json_docs(io.StringIO('{"numFound": 0}'))) == []
+
+    def test_read_json_is_incremental(self):
+        docs = [make_doc(index) for index in range(1000)]
+        f = io.StringIO(json.dumps({'docs': docs}))
+
+        first = next(LibraryImporter.read_json_docs(f, chunk_size=1024))
+
+        assert first == docs[0]
+        assert f.tell() <= 2048
+
+    def test_read_broken_json_raises(self):
+        with pytest.raises(ValueError):
+            list(LibraryImporter.read_json_docs(io.StringIO('{"docs": [{"key": '), chunk_size=4))
+
+    def test_read_csv(self, tmp_path):
+        path = tmp_path / "goodreads.csv"
+        path.write_text('Title,Author,ISBN13\nBook,Author,"=""9780000000001"""\n', encoding="utf-8")
+
+        rows = list(LibraryImporter.read_rows(str(path)))
+
+        assert rows[0]['Title'] == 'Book'
+
+    def test_lookup_params_prefers_isbn(self, backend, search_client, tmp_path):
+        importer = make_importer(backend, search_client, tmp_path)
+
+        params = importer.lookup_params({'Title': 'Book', 'Author': 'A', 'ISBN13': '="978-0000000001"'})
+
+        assert params == {'isbn': '9780000000001'}
+
+    def test_lookup_params_by_title(self, backend, search_client, tmp_path):
+        importer = make_importer(backend, search_client, tmp_path)
+
+        assert importer.lookup_params({'Title': 'Book', 'Author': 'A', 'ISBN13': '=""'}) == {'title': 'Book', 'author': 'A'}
+        assert importer.lookup_params({'Author': 'A'}) is None
+
+    def test_complete_doc_resolves_without_search(self, backend, search_client, tmp_path):
+        importer = make_importer(backend, search_client, tmp_path)
+
+        entry = importer.make_entry(dict(make_doc(1), ratings_count=5))
+
+        assert entry == make_doc(1)
+        search_client.get.assert_not_called()
+
+    def test_incomplete_doc_is_looked_up_by_key(self, backend, search_client, tmp_path):
+        importer = make_importer(backend, search_client, tmp_path)
+
+        entry = importer.make_entry({'key': '/works/OL1W', 'title': 'Book 1'})
+
+        assert entry['key'] == '/works/OL99W'
+        params = search_client.get.call_args[1]['params']
+        assert params['q'] == 'key:/works/OL1W'
+        assert params['limit'] == 1
+
+    def test_unresolved_row_is_skipped(self, backend, search_client, tmp_path):
+        search_client.get.return_value = make_response(data={'docs': []})
+        importer = make_importer(backend, search_client, tmp_path)
+
+        assert importer.make_entry({'Title': 'Missing'}) is None
+
+
+class TestLibraryImporterRun:
+
+    def test_run_sends_batches(self, backend, search_client, tmp_path):
+        path = tmp_path / "books.jsonl"
+        write_jsonl(path, [make_doc(i) for i in range(5)])
+        reports = []
+        importer = make_importer(backend, search_client, tmp_path, progress_handler=reports.append)
+
+        progress = importer.run(str(path))
+
+        assert progress.rows == 5
+        assert progress.imported == 5
+        assert progress.failed == 0
+        assert backend.post.call_count == 3
+        assert all(call[0][1]['token'] == 'token' for call in backend.post.call_args_list)
+        sent = [entry['key'] for call in backend.post.call_args_list for entry in call[0][1]['add']]
+        assert sorted(sent) == sorted(f'/works/OL{i}W' for i in range(5))
+        assert len(reports) == 3
+        assert not os.path.exists(tmp_path / "state.json")
+
+    def test_run_counts_skipped_rows(self, backend, search_client, tmp_path):
+        search_client.get.return_value = make_response(data={'docs': []})
+        path = tmp_path / "books.jsonl"
+        write_jsonl(path, [make_doc(1), {'title': 'No key'}])
+        importer = make_importer(backend, search_client, tmp_path)
+
+        progress = importer.run(str(path))
+
+        assert progress.imported == 1
+        assert progress.skipped == 1
+
+    def test_failed_batch_keeps_resume_state(self, backend, search_client, tmp_path):
+        path = tmp_path / "books.jsonl"
+        write_jsonl(path, [make_doc(i) for i in range(4)])
+        backend.post.side_effect = [
+            make_response(data={'success': True}),
+            make_response(500),
+            make_response(500),
+            make_response(500),
+        ]
+        importer = make_importer(backend, search_client, tmp_path, concurrency=1)
+
+        progress = importer.run(str(path))
+
+        assert progress.imported == 2
+        assert progress.failed == 2
+        assert importer.load_state(str(path)) == 2
+
+    def test_run_resumes_from_state(self, backend, search_client, tmp_path):
+        path = tmp_path / "books.jsonl"
+        write_jsonl(path, [make_doc(i) for i in range(4)])
+        importer = make_importer(backend, search_client, tmp_path)
+        importer.save_state(str(path), 3)
+
+        progress = importer.run(str(path))
+
+        assert progress.rows == 4
+        assert progress.imported == 1
+        assert backend.post.call_args[0][1]['add'][0]['key'] == '/works/OL3W'
+
+    def test_state_for_other_file_is_ignored(self, backend, search_client, tmp_path):
+        importer = make_importer(backend, search_client, tmp_path)
+        importer.save_state(str(tmp_path / "other.jsonl"), 3)
+
+        assert importer.load_state(str(tmp_path / "books.jsonl")) == 0
+
+    def test_progress_text(self):
+        progress = ImportProgress(3)
+
+        assert "Обработано строк: 3" in str(progress)
+
+
+class TestLibraryImportCli:
+
+    def test_login(self, backend):
+        backend.post.return_value = make_response(data={'success': True, 'userid': 7, 'token': 'abc'})
+
+        assert login(backend, 'user', 'secret') == (7, 'abc')
+
+    def test_login_failure(self, backend):
+        backend.post.side_effect = Exception("offline")
+
+        assert login(backend, 'user', 'secret') is None
+
+    def test_logout_ignores_errors(self, backend):
+        backend.post.side_effect = Exception("offline")
+
+        logout(backend, 'abc')
+
+        backend.post.assert_called_once_with("/logout", {'token': 'abc'})
+
+    def test_main_requires_credentials(self, tmp_path):
+        code = main([str(tmp_path / "books.jsonl"), "--config", str(tmp_path / "missing.json")])
+
+        assert code == 2
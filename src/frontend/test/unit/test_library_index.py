@@ -0,0 +1,139 @@
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+try:
+    from libraryIndex import LibraryIndex
+except ImportError as e:
+    print(f"Ошибка импорта: {e}")
+    raise
+
+
+def make_index():
+    index = LibraryIndex()
+    index.add({'key': '/works/1', 'title': 'Dune', 'author_name': ['Frank Herbert']})
+    index.add({'key': '/works/2', 'title': 'Dune Messiah', 'author_name': ['Frank Herbert']})
+    index.add({'key': '/works/3', 'title': 'Children of Dune', 'author_name': ['Frank Herbert']})
+    index.add({'key': '/works/4', 'title': 'Solaris', 'author_name': ['Stanisław Lem']})
+    index.add({'key': '/works/5', 'title': 'Мастер и Маргарита', 'author_name': ['Михаил Булгаков']})
+    return index
+
+
+def keys(books):
+    return [book['key'] for book in books]
+
+
+class TestLibraryIndexTokens:
+
+    def test_tokenize(self):
+        assert LibraryIndex.tokenize("Children of Dune!") == ['children', 'of', 'dune']
+        assert LibraryIndex.tokenize("Мастер и Маргарита") == ['мастер', 'и', 'маргарита']
+
+    def test_grams(self):
+        assert LibraryIndex.grams("dune") == {'dun', 'une'}
+        assert LibraryIndex.grams("of") == set()
+
+
+class TestLibraryIndexSearch:
+
+    def test_empty_query_returns_all_by_title(self):
+        index = make_index()
+
+        assert keys(index.search("")) == ['/works/3', '/works/1', '/works/2', '/works/4', '/works/5']
+
+    def test_ranks_exact_then_prefix_then_substring(self):
+        index = make_index()
+
+        assert keys(index.search("dune")) == ['/works/1', '/works/2', '/works/3']
+
+    def test_case_insensitive(self):
+        index = make_index()
+
+        assert keys(index.search("SOLARIS")) == ['/works/4']
+
+    def test_prefix_and_infix_match(self):
+        index = make_index()
+
+        assert keys(index.search("sol")) == ['/works/4']
+        assert keys(index.search("lari")) == ['/works/4']
+        assert keys(index.search("марг")) == ['/works/5']
+
+    def test_short_words_scan_vocabulary(self):
+        index = make_index()
+
+        assert '/works/3' in keys(index.search("of"))
+
+    def test_author_match(self):
+        index = make_index()
+
+        assert keys(index.search("lem")) == ['/works/4']
+        assert keys(index.search("булгаков")) == ['/works/5']
+
+    def test_any_word_matches(self):
+        index = make_index()
+
+        assert keys(index.search("solaris messiah")) == ['/works/2', '/works/4']
+
+    def test_no_match(self):
+        index = make_index()
+
+        assert index.search("neuromancer") == []
+
+
+class TestLibraryIndexUpdates:
+
+    def test_add_and_remove(self):
+        index = make_index()
+
+        index.remove('/works/4')
+
+        assert len(index) == 4
+        assert index.search("solaris") == []
+        assert 'solaris' not in index.token_keys
+        assert 'sol' not in index.gram_tokens
+
+    def test_remove_keeps_shared_tokens(self):
+        index = make_index()
+
+        index.remove('/works/1')
+
+        assert keys(index.search("dune")) == ['/works/2', '/works/3']
+
+    def test_re_adding_key_replaces_book(self):
+        index = make_index()
+
+        index.add({'key': '/works/4', 'title': 'Fiasco', 'author_name': ['Stanisław Lem']})
+
+        assert index.search("solaris") == []
+        assert keys(index.search("fiasco")) == ['/works/4']
+        assert len(index) == 5
+
+    def test_remove_unknown_key(self):
+        index = make_index()
+
+        index.remove('/works/missing')
+
+        assert len(index) == 5
+
+    def test_book_without_key_is_ignored(self):
+        index = LibraryIndex()
+
+        index.add({'title': 'No key'})
+
+        assert len(index) == 0
+
+    def test_clear(self):
+        index = make_index()
+
+        index.clear()
+
+        assert len(index) == 0
+        assert index.token_keys == {}
+        assert index.gram_tokens == {}
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,97 @@
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+try:
+    from lruStore import LruStore
+except ImportError as e:
+    print(f"Ошибка импорта: {e}")
+    raise
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LruStore(str(tmp_path / "cache.db"), "test_cache", 1024)
+
+
+class TestLruStore:
+
+    def test_init_does_not_touch_disk(self, tmp_path):
+        path = tmp_path / "cache.db"
+        LruStore(str(path), "test_cache", 1024)
+
+        assert not path.exists()
+
+    def test_get_missing(self, store):
+        assert store.get("a") is None
+
+    def test_put_and_get(self, store):
+        store.put("a", b"\x01\x02")
+
+        data, stored_at = store.get("a")
+        assert data == b"\x01\x02"
+        assert stored_at > 0
+
+    def test_delete(self, store):
+        store.put("a", b"a")
+        store.delete("a")
+
+        assert store.get("a") is None
+
+    def test_lru_eviction(self, tmp_path):
+        store = LruStore(str(tmp_path / "cache.db"), "test_cache", 20)
+        store.put("a", b"a" * 10)
+        store.put("b", b"b" * 10)
+        store.get("a")
+        store.put("c", b"c" * 10)
+
+        assert store.get("a") is not None
+        assert store.get("b") is None
+        assert store.get("c") is not None
+
+    def test_newest_entry_is_kept_over_limit(self, tmp_path):
+        store = LruStore(str(tmp_path / "cache.db"), "test_cache", 1)
+        store.put("a", b"a" * 10)
+        store.put("b", b"b" * 10)
+
+        assert store.get("a") is None
+        assert store.get("b") is not None
+
+    def test_shared_between_instances(self, tmp_path):
+        path = str(tmp_path / "cache.db")
+        LruStore(path, "test_cache", 1024).put("a", b"a")
+
+        assert LruStore(path, "test_cache", 1024).get("a")[0] == b"a"
+
+    def test_clear(self, store):
+        store.put("a", b"a")
+        store.clear()
+
+        assert store.get("a") is None
+
+    def test_table_with_old_columns_is_recreated(self, tmp_path):
+        import sqlite3
+        path = str(tmp_path / "cache.db")
+        connection = sqlite3.connect(path)
+        connection.execute("CREATE TABLE test_cache (key TEXT PRIMARY KEY, data BLOB NOT NULL)")
+        connection.close()
+
+        store = LruStore(path, "test_cache", 1024)
+        store.put("a", b"a")
+
+        assert store.get("a")[0] == b"a"
+
+    def test_broken_path_is_ignored(self, tmp_path):
+        store = LruStore(str(tmp_path / "missing" / "cache.db"), "test_cache", 1024)
+
+        store.put("a", b"a")
+        assert store.get("a") is None
+        store.delete("a")
+        store.clear()
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-v"]))
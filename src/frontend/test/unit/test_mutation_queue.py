@@ -0,0 +1,198 @@
+import pytest
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+try:
+    from mutationQueue import MutationQueue
+except ImportError as e:
+    print(f"Ошибка импорта: {e}")
+    raise
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = MutationQueue(str(tmp_path / "pending.json"))
+    queue.load("user")
+    return queue
+
+
+class TestMutationQueueCoalescing:
+
+    def test_enqueue(self, queue):
+        queue.enqueue({'key': 'a'}, True)
+
+        assert len(queue) == 1
+        assert queue.effective() == {'a': (True, {'key': 'a'})}
+
+    def test_opposite_operations_cancel(self, queue):
+        queue.enqueue({'key': 'a'}, True)
+        queue.enqueue({'key': 'a'}, False)
+
+        assert len(queue) == 0
+
+    def test_repeated_operation_keeps_latest_book(self, queue):
+        queue.enqueue({'key': 'a', 'title': 'Old'}, True)
+        queue.enqueue({'key': 'a', 'title': 'New'}, True)
+
+        assert len(queue) == 1
+        assert queue.effective()['a'][1]['title'] == 'New'
+
+    def test_book_without_key_is_ignored(self, queue):
+        queue.enqueue({'title': 'No key'}, True)
+
+        assert len(queue) == 0
+
+
+class TestMutationQueueFlushing:
+
+    def test_take_splits_operations(self, queue):
+        queue.enqueue({'key': 'a'}, True)
+        queue.enqueue({'key': 'b'}, False)
+
+        added, removed = queue.take()
+
+        assert added == [{'key': 'a'}]
+        assert removed == [{'key': 'b'}]
+        assert queue.pending == {}
+        assert set(queue.in_flight) == {'a', 'b'}
+
+    def test_take_respects_limit(self, queue):
+        for key in "abc":
+            queue.enqueue({'key': key}, True)
+
+        added, removed = queue.take(2)
+
+        assert [book['key'] for book in added] == ['a', 'b']
+        assert list(queue.pending) == ['c']
+
+    def test_take_waits_for_in_flight(self, queue):
+        queue.enqueue({'key': 'a'}, True)
+        queue.take()
+        queue.enqueue({'key': 'b'}, True)
+
+        assert queue.take() == ([], [])
+
+    def test_toggle_during_flight_is_sent_next(self, queue):
+        queue.enqueue({'key': 'a'}, True)
+        queue.take()
+        queue.enqueue({'key': 'a'}, False)
+
+        queue.complete()
+
+        assert queue.take() == ([], [{'key': 'a'}])
+
+    def test_complete(self, queue):
+        queue.enqueue({'key': 'a'}, True)
+        queue.take()
+
+        queue.complete()
+
+        assert len(queue) == 0
+        assert not os.path.exists(queue.path)
+
+    def test_fail_requeues(self, queue):
+        queue.enqueue({'key': 'a'}, True)
+        queue.take()
+
+        dropped = queue.fail()
+
+        assert dropped == []
+        assert queue.pending['a']['attempts'] == 1
+
+    def test_fail_drops_after_max_attempts(self, queue):
+        queue.max_attempts = 2
+        queue.enqueue({'key': 'a'}, True)
+
+        queue.take()
+        queue.fail()
+        queue.take()
+        dropped = queue.fail()
+
+        assert [entry['book'] for entry in dropped] == [{'key': 'a'}]
+        assert len(queue) == 0
+
+    def test_fail_with_opposite_pending_is_noop(self, queue):
+        queue.enqueue({'key': 'a'}, True)
+        queue.take()
+        queue.enqueue({'key': 'a'}, False)
+
+        dropped = queue.fail()
+
+        assert dropped == []
+        assert len(queue) == 0
+
+
+class TestMutationQueuePersistence:
+
+    def test_pending_survive_restart(self, queue):
+        queue.enqueue({'key': 'a'}, True)
+        queue.enqueue({'key': 'b'}, False)
+        queue.take()
+        queue.enqueue({'key': 'c'}, True)
+
+        restored = MutationQueue(queue.path)
+        restored.load("user")
+
+        assert restored.effective() == {
+            'a': (True, {'key': 'a'}),
+            'b': (False, {'key': 'b'}),
+            'c': (True, {'key': 'c'})
+        }
+
+    def test_other_owner_is_ignored(self, queue):
+        queue.enqueue({'key': 'a'}, True)
+
+        restored = MutationQueue(queue.path)
+        restored.load("other")
+
+        assert len(restored) == 0
+
+    def test_detach_persists_in_flight_and_pending(self, queue):
+        queue.enqueue({'key': 'a'}, True)
+        queue.take()
+        queue.enqueue({'key': 'a'}, False)
+        queue.enqueue({'key': 'b'}, True)
+
+        queue.detach()
+
+        assert len(queue) == 0
+        assert queue.owner is None
+        restored = MutationQueue(queue.path)
+        restored.load("user")
+        assert restored.effective() == {
+            'a': (False, {'key': 'a'}),
+            'b': (True, {'key': 'b'})
+        }
+
+    def test_take_starts_new_batch(self, queue):
+        queue.enqueue({'key': 'a'}, True)
+        batch = queue.batch
+
+        queue.take()
+
+        assert queue.batch == batch + 1
+
+    def test_corrupted_file(self, tmp_path):
+        path = tmp_path / "pending.json"
+        path.write_text("{not json")
+
+        queue = MutationQueue(str(path))
+        queue.load("user")
+
+        assert len(queue) == 0
+
+    def test_file_contents(self, queue):
+        queue.enqueue({'key': 'a'}, True)
+
+        with open(queue.path, encoding="utf-8") as f:
+            data = json.load(f)
+
+        assert data == {"owner": "user", "pending": [{"added": True, "book": {"key": "a"}, "attempts": 0}]}
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,414 @@
+import pytest
+from unittest.mock import Mock, patch, PropertyMock
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+try:
+    from resultsPane import ResultsPane
+except ImportError as e:
+    print(f"Ошибка импорта: {e}")
+    raise
+
+
+def make_books(count):
+    return [{'title': f'Book {i}', 'key': f'/works/OL{i}W'} for i in range(count)]
+
+
+class TestResultsPane:
+
+    def test_init(self):
+        rows = []
+        pane = ResultsPane(rows=rows, near_end_margin=10, id="right-pane")
+
+        assert pane.near_end_margin == 10
+        assert pane.id == "right-pane"
+        assert pane.rows is rows
+        assert pane.books == []
+        assert pane.focused_index is None
+
+    def test_is_near_end(self):
+        pane = ResultsPane(near_end_margin=10)
+
+        with patch.object(ResultsPane, 'max_scroll_y', new_callable=PropertyMock) as mock_max:
+            mock_max.return_value = 100
+            with patch.object(ResultsPane, 'scroll_y', new_callable=PropertyMock) as mock_scroll:
+                mock_scroll.return_value = 95
+                assert pane.is_near_end() is True
+
+                mock_scroll.return_value = 50
+                assert pane.is_near_end() is False
+
+    def test_scrolling_down_near_end_posts_message(self):
+        pane = ResultsPane()
+
+        with patch('resultsPane.VerticalScroll.watch_scroll_y'):
+            with patch.object(pane, 'refresh_window'):
+                with patch.object(pane, 'is_near_end', return_value=True):
+                    with patch.object(pane, 'post_message') as mock_post:
+                        pane.watch_scroll_y(10, 20)
+
+                        mock_post.assert_called_once()
+                        assert isinstance(mock_post.call_args[0][0], ResultsPane.NearEnd)
+
+    def test_scrolling_up_posts_nothing(self):
+        pane = ResultsPane()
+
+        with patch('resultsPane.VerticalScroll.watch_scroll_y'):
+            with patch.object(pane, 'refresh_window') as mock_refresh:
+                with patch.object(pane, 'is_near_end', return_value=True):
+                    with patch.object(pane, 'post_message') as mock_post:
+                        pane.watch_scroll_y(20, 10)
+
+                        mock_post.assert_not_called()
+                        mock_refresh.assert_called_once()
+
+
+class TestResultsPaneVirtualization:
+
+    def test_window_at_top(self):
+        pane = ResultsPane()
+        pane.books = make_books(1000)
+
+        with patch.object(pane, 'visible_rows', return_value=4):
+            with patch.object(ResultsPane, 'scroll_y', new_callable=PropertyMock) as mock_scroll:
+                mock_scroll.return_value = 0
+
+                window = pane.window()
+
+                assert window.start == 0
+                assert len(window) == 4 + 2 * ResultsPane.OVERSCAN
+
+    def test_window_follows_scroll(self):
+        pane = ResultsPane()
+        pane.books = make_books(1000)
+
+        with patch.object(pane, 'visible_rows', return_value=4):
+            with patch.object(ResultsPane, 'scroll_y', new_callable=PropertyMock) as mock_scroll:
+                mock_scroll.return_value = 500 * ResultsPane.ROW_HEIGHT
+
+                window = pane.window()
+
+                assert window.start == 500 - ResultsPane.OVERSCAN
+                assert 500 in window
+                assert len(window) == 4 + 2 * ResultsPane.OVERSCAN
+
+    def test_window_size_does_not_depend_on_results(self):
+        pane = ResultsPane()
+
+        with patch.object(pane, 'visible_rows', return_value=4):
+            pane.books = make_books(3)
+            assert len(pane.window()) == 3
+
+            pane.books = make_books(100000)
+            assert len(pane.window()) == 4 + 2 * ResultsPane.OVERSCAN
+
+    def test_refresh_window_binds_rows(self):
+        rows = [Mock(), Mock()]
+        pane = ResultsPane(rows=rows)
+        pane.books = make_books(10)
+        pane.added = [False] * 10
+
+        with patch.object(pane, 'window', return_value=range(3, 5)):
+            with patch.object(pane, '_resize_pool'):
+                pane.refresh_window(force=True)
+
+                assert pane.first_index == 3
+                rows[0].bind.assert_called_once_with(pane.books[3], False, 3, False)
+                rows[1].bind.assert_called_once_with(pane.books[4], False, 4, False)
+                assert pane.top_spacer.styles.height.value == 3 * ResultsPane.ROW_HEIGHT
+                assert pane.bottom_spacer.styles.height.value == 5 * ResultsPane.ROW_HEIGHT
+
+    def test_refresh_window_skips_unchanged_window(self):
+        rows = [Mock(), Mock()]
+        pane = ResultsPane(rows=rows)
+        pane.books = make_books(10)
+        pane.added = [False] * 10
+        pane.first_index = 3
+
+        with patch.object(pane, 'window', return_value=range(3, 5)):
+            pane.refresh_window()
+
+            rows[0].bind.assert_not_called()
+
+    def test_row_for_index(self):
+        rows = [Mock(), Mock()]
+        pane = ResultsPane(rows=rows)
+        pane.first_index = 10
+
+        assert pane.row_for_index(10) is rows[0]
+        assert pane.row_for_index(11) is rows[1]
+        assert pane.row_for_index(12) is None
+        assert pane.row_for_index(None) is None
+
+    def test_row_status_change_updates_model(self):
+        pane = ResultsPane()
+        pane.added = [False, False]
+        row = Mock(index=1, is_added=True)
+
+        pane._on_row_status_changed(row)
+
+        assert pane.added == [False, True]
+
+    def test_row_focus_records_index(self):
+        mock_handler = Mock()
+        pane = ResultsPane(focus_handler=mock_handler)
+        row = Mock(index=7)
+
+        pane._on_row_focused(row)
+
+        assert pane.focused_index == 7
+        mock_handler.assert_called_once_with(row)
+
+
+class TestResultsPaneReconciliation:
+
+    def make_row(self, book):
+        row = Mock()
+        row.book = book
+        return row
+
+    def test_rows_keep_their_book_key(self):
+        books = make_books(4)
+        rows = [self.make_row(books[0]), self.make_row(books[1]), self.make_row(books[2])]
+        pane = ResultsPane(rows=list(rows))
+        pane.books = books[1:]
+        pane.added = [False] * 3
+
+        with patch.object(pane, 'move_child') as mock_move:
+            pane._reconcile_rows(range(0, 3))
+
+            assert pane.rows == [rows[1], rows[2], rows[0]]
+            assert mock_move.call_count == 3
+            rows[1].bind.assert_called_once_with(books[1], False, 0, False)
+            rows[2].bind.assert_called_once_with(books[2], False, 1, False)
+            rows[0].bind.assert_called_once_with(books[3], False, 2, False)
+
+    def test_unchanged_order_moves_nothing(self):
+        books = make_books(2)
+        rows = [self.make_row(books[0]), self.make_row(books[1])]
+        pane = ResultsPane(rows=list(rows))
+        pane.books = books
+        pane.added = [True, False]
+
+        with patch.object(pane, 'move_child') as mock_move:
+            pane._reconcile_rows(range(0, 2))
+
+            mock_move.assert_not_called()
+            assert pane.rows == rows
+
+    def test_duplicate_keys_use_spare_rows(self):
+        books = [{'key': '/works/OL1W'}, {'key': '/works/OL1W'}]
+        rows = [self.make_row(books[0]), self.make_row({})]
+        pane = ResultsPane(rows=list(rows))
+        pane.books = books
+        pane.added = [False, False]
+
+        with patch.object(pane, 'move_child'):
+            pane._reconcile_rows(range(0, 2))
+
+            assert pane.rows == rows
+
+
+class TestResultsPaneCovers:
+
+    def make_row(self, book):
+        row = Mock()
+        row.book = book
+        row.cover = None
+        return row
+
+    def test_visible_rows_request_covers(self):
+        books = [{'key': '/works/OL1W', 'cover_i': 11}, {'key': '/works/OL2W', 'cover_i': 0}]
+        rows = [self.make_row(books[0]), self.make_row(books[1])]
+        cover = Mock()
+        cover_handler = Mock(return_value=cover)
+        pane = ResultsPane(rows=list(rows), cover_handler=cover_handler)
+        pane.books = books
+        pane.added = [False, False]
+
+        pane._reconcile_rows(range(0, 2))
+
+        cover_handler.assert_called_once_with(11)
+        rows[0].set_cover.assert_called_once_with(cover)
+        rows[1].set_cover.assert_not_called()
+
+    def test_rows_without_cover_handler_skip_covers(self):
+        book = {'key': '/works/OL1W', 'cover_i': 11}
+        row = self.make_row(book)
+        pane = ResultsPane(rows=[row])
+        pane.books = [book]
+        pane.added = [False]
+
+        pane._reconcile_rows(range(0, 1))
+
+        row.set_cover.assert_not_called()
+
+    def test_set_cover_updates_matching_rows(self):
+        rows = [self.make_row({'cover_i': 11}), self.make_row({'cover_i': 12})]
+        pane = ResultsPane(rows=rows)
+        cover = Mock()
+
+        pane.set_cover(12, cover)
+
+        rows[0].set_cover.assert_not_called()
+        rows[1].set_cover.assert_called_once_with(cover)
+
+
+class TestResultsPaneStatus:
+
+    def test_set_added_updates_model_and_visible_row(self):
+        row = Mock()
+        pane = ResultsPane(rows=[row])
+        pane.books = make_books(3)
+        pane.added = [False, False, False]
+        pane._index_books(0)
+        pane.first_index = 1
+
+        pane.set_added('/works/OL1W', True)
+
+        assert pane.added == [False, True, False]
+        row.bind.assert_called_once_with(pane.books[1], True, 1, False)
+
+    def test_set_added_offscreen_row(self):
+        row = Mock()
+        pane = ResultsPane(rows=[row])
+        pane.books = make_books(3)
+        pane.added = [False, False, False]
+        pane._index_books(0)
+
+        pane.set_added('/works/OL2W', True)
+
+        assert pane.added == [False, False, True]
+        row.bind.assert_not_called()
+
+    def test_set_added_unchanged_skips_row(self):
+        row = Mock()
+        pane = ResultsPane(rows=[row])
+        pane.books = make_books(1)
+        pane.added = [True]
+        pane._index_books(0)
+
+        pane.set_added('/works/OL0W', True)
+
+        row.bind.assert_not_called()
+
+    def test_index_tracks_duplicate_keys(self):
+        pane = ResultsPane()
+        pane.books = make_books(2) + make_books(1)
+        pane.added = [False, False, False]
+        pane._index_books(0)
+
+        assert pane.book_indexes['/works/OL0W'] == [0, 2]
+
+        pane.set_added('/works/OL0W', True)
+
+        assert pane.added == [True, False, True]
+
+    def test_append_books_extends_index(self):
+        pane = ResultsPane()
+        pane.books = make_books(2)
+        pane.added = [False, False]
+        pane._index_books(0)
+
+        with patch.object(pane, 'refresh_window'):
+            pane.append_books([{'key': '/works/OL9W'}], [False])
+
+        assert pane.book_indexes['/works/OL9W'] == [2]
+
+    def test_update_membership(self):
+        pane = ResultsPane()
+        pane.books = make_books(3)
+        pane.added = [False, True, False]
+        pane._index_books(0)
+
+        pane.update_membership({'/works/OL1W': False, '/works/OL2W': True, '/works/OL7W': True})
+
+        assert pane.added == [False, False, True]
+
+
+class TestResultsPaneSelection:
+
+    def test_row_selection_is_tracked_by_key(self):
+        pane = ResultsPane()
+        book = {'key': '/works/OL1W'}
+        row = Mock(book=book, is_selected=True)
+
+        pane._on_row_selection_changed(row)
+
+        assert pane.selected == {'/works/OL1W': book}
+        assert pane.is_selected(book) is True
+
+        row.is_selected = False
+        pane._on_row_selection_changed(row)
+
+        assert pane.selected == {}
+
+    def test_take_selection_clears_rows(self):
+        books = make_books(2)
+        row = Mock(book=books[0], is_added=False, index=0)
+        pane = ResultsPane(rows=[row])
+        pane.books = books
+        pane.selected = {books[0]['key']: books[0], books[1]['key']: books[1]}
+
+        taken = pane.take_selection()
+
+        assert taken == books
+        assert pane.selected == {}
+        row.bind.assert_called_once_with(books[0], False, 0, False)
+
+
+class TestResultsPaneFocus:
+
+    def test_focus_step_without_focus_starts_at_first(self):
+        pane = ResultsPane()
+        pane.books = make_books(5)
+
+        with patch.object(pane, 'focus_index') as mock_focus:
+            pane.focus_step(1, False)
+
+            mock_focus.assert_called_once_with(0)
+
+    def test_focus_step_without_focus_restores_last(self):
+        pane = ResultsPane()
+        pane.books = make_books(5)
+        pane.focused_index = 3
+
+        with patch.object(pane, 'focus_index') as mock_focus:
+            pane.focus_step(1, False)
+
+            mock_focus.assert_called_once_with(3)
+
+    def test_focus_step_next(self):
+        pane = ResultsPane()
+        pane.books = make_books(5)
+        pane.focused_index = 1
+
+        with patch.object(pane, 'focus_index') as mock_focus:
+            pane.focus_step(1, True)
+
+            mock_focus.assert_called_once_with(2)
+
+    def test_focus_step_wraps_around(self):
+        pane = ResultsPane()
+        pane.books = make_books(5)
+        pane.focused_index = 0
+
+        with patch.object(pane, 'focus_index') as mock_focus:
+            pane.focus_step(-1, True)
+
+            mock_focus.assert_called_once_with(4)
+
+    def test_focus_step_empty(self):
+        pane = ResultsPane()
+
+        with patch.object(pane, 'focus_index') as mock_focus:
+            pane.focus_step(1, True)
+
+            mock_focus.assert_not_called()
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-v"]))
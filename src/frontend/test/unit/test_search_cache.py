@@ -0,0 +1,100 @@
+import pytest
+from unittest.mock import patch
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+try:
+    from searchCache import SearchCache
+except ImportError as e:
+    print(f"Ошибка импорта: {e}")
+    raise
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SearchCache(str(tmp_path / "search_cache.db"), ttl=60, stale_ttl=600)
+
+
+class TestSearchCacheKeys:
+
+    def test_make_key_normalizes_query(self):
+        assert SearchCache.make_key("  The   Lord of the RINGS ") == SearchCache.make_key("the lord of the rings")
+
+    def test_make_key_includes_page(self):
+        assert SearchCache.make_key("dune", 2) != SearchCache.make_key("dune", 1)
+
+    def test_make_key_includes_fields_and_page_size(self):
+        key = SearchCache.make_key("dune", 1, ["title", "key"], 20)
+
+        assert key == SearchCache.make_key("dune", 1, ["key", "title"], 20)
+        assert key != SearchCache.make_key("dune", 1, ["title"], 20)
+        assert key != SearchCache.make_key("dune", 1, ["title", "key"], 50)
+
+
+class TestSearchCacheStorage:
+
+    def test_get_missing(self, cache):
+        assert cache.get("dune") is None
+
+    def test_get_with_other_fields_misses(self, cache):
+        cache.put("dune", [{'title': 'Dune'}], 1, ["title"], 20)
+
+        assert cache.get("dune", 1, ["title"], 20) == ([{'title': 'Dune'}], True)
+        assert cache.get("dune", 1, ["title", "key"], 20) is None
+        assert cache.get("dune", 1, ["title"], 50) is None
+
+    def test_put_and_get_fresh(self, cache):
+        docs = [{'title': 'Dune', 'key': '/works/OL1W'}]
+        cache.put("Dune", docs)
+
+        assert cache.get("  dune ") == (docs, True)
+
+    def test_entries_are_compressed(self, cache):
+        docs = [{'title': 'Dune', 'key': '/works/OL1W'}] * 200
+        cache.put("dune", docs)
+
+        data, stored_at = cache.store.get(SearchCache.make_key("dune"))
+
+        assert len(data) < len(str(docs)) / 10
+
+    def test_stale_entry(self, cache):
+        cache.put("dune", [])
+
+        with patch('searchCache.time.time', return_value=cache_time() + 120):
+            assert cache.get("dune") == ([], False)
+
+    def test_expired_entry_removed(self, cache):
+        cache.put("dune", [])
+
+        with patch('searchCache.time.time', return_value=cache_time() + 1200):
+            assert cache.get("dune") is None
+        assert cache.get("dune") is None
+
+    def test_shared_between_instances(self, tmp_path):
+        path = str(tmp_path / "search_cache.db")
+        SearchCache(path).put("dune", [{'title': 'Dune'}])
+
+        assert SearchCache(path).get("dune") == ([{'title': 'Dune'}], True)
+
+    def test_corrupted_entry_is_a_miss(self, cache):
+        cache.store.put(SearchCache.make_key("dune"), b"not zlib")
+
+        assert cache.get("dune") is None
+
+    def test_clear(self, cache):
+        cache.put("dune", [])
+        cache.clear()
+
+        assert cache.get("dune") is None
+
+
+def cache_time():
+    import time
+    return time.time()
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-v"]))
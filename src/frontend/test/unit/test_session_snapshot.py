@@ -0,0 +1,59 @@
+import pytest
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+try:
+    from sessionSnapshot import SessionSnapshot
+except ImportError as e:
+    print(f"Ошибка импорта: {e}")
+    raise
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    return SessionSnapshot(str(tmp_path / "session_snapshot.json"), max_books=2)
+
+
+class TestSessionSnapshot:
+
+    def test_load_missing(self, snapshot):
+        assert snapshot.load() is None
+
+    def test_save_and_load(self, snapshot):
+        snapshot.save("bob", 7, "search", "dune", [{'key': 'a'}], ['a'], 1)
+
+        data = snapshot.load()
+
+        assert data['username'] == "bob"
+        assert data['userid'] == 7
+        assert data['source'] == "search"
+        assert data['query'] == "dune"
+        assert data['books'] == [{'key': 'a'}]
+        assert data['library_keys'] == ['a']
+        assert data['books_count'] == 1
+
+    def test_books_are_capped(self, snapshot):
+        snapshot.save(None, None, "search", "dune", [{'key': 'a'}, {'key': 'b'}, {'key': 'c'}], [], 0)
+
+        assert len(snapshot.load()['books']) == 2
+
+    def test_other_version_is_ignored(self, snapshot):
+        with open(snapshot.path, "w", encoding="utf-8") as f:
+            json.dump({'version': 0, 'books': []}, f)
+
+        assert snapshot.load() is None
+
+    def test_broken_file_is_ignored(self, snapshot):
+        with open(snapshot.path, "w", encoding="utf-8") as f:
+            f.write("{")
+
+        assert snapshot.load() is None
+
+    def test_clear(self, snapshot):
+        snapshot.save(None, None, "", "", [], [], 0)
+        snapshot.clear()
+
+        assert not os.path.exists(snapshot.path)
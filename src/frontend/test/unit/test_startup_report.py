@@ -0,0 +1,52 @@
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+try:
+    from startupReport import parse_import_times, format_report, measure_first_frame
+except ImportError as e:
+    print(f"Ошибка импорта: {e}")
+    raise
+
+
+IMPORTTIME_OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      2000 |       5000 |   textual.app
+import time:      1500 |       9000 | LibApp
+not an import line
+"""
+
+
+class TestStartupReport:
+
+    def test_parse_import_times(self):
+        rows = parse_import_times(IMPORTTIME_OUTPUT)
+
+        assert rows == [('_io', 120, 120), ('textual.app', 2000, 5000), ('LibApp', 1500, 9000)]
+
+    def test_format_report_sorts_by_cumulative(self):
+        report = format_report(parse_import_times(IMPORTTIME_OUTPUT), 0.25, 0.4, top=2)
+        lines = report.splitlines()
+
+        assert lines[0] == "Импорт LibApp: 250 мс"
+        assert lines[1] == "Первый кадр: 400 мс"
+        assert lines[-2].endswith("LibApp")
+        assert lines[-1].endswith("textual.app")
+        assert "_io" not in report
+
+    def test_lib_app_import_is_lazy(self):
+        import LibApp
+
+        assert 'LoginForm' not in vars(LibApp)
+        assert 'ScreenPop' not in vars(LibApp)
+
+    def test_measure_first_frame_leaves_no_files(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+
+        import_time, first_frame = measure_first_frame()
+
+        assert 0 <= import_time <= first_frame
+        assert os.getcwd() == str(tmp_path)
+        assert list(tmp_path.iterdir()) == []